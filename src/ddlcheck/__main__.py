@@ -0,0 +1,6 @@
+"""Run the ddlcheck command line interface with ``python -m ddlcheck``."""
+
+from ddlcheck.cli import app
+
+if __name__ == "__main__":
+    app()
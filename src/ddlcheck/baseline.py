@@ -0,0 +1,257 @@
+"""Baselines of known issues, so only new issues are reported.
+
+A baseline records a fingerprint for every issue found when it was created.
+The fingerprint combines the check ID, the file path and pglast's fingerprint
+of the offending statement, which ignores formatting, comments and literal
+values, so it survives edits that only move a statement to another line.
+
+Later runs load the fingerprints into a hash table and drop matching issues
+in constant time. Identical statements in one file share a fingerprint, so
+the baseline counts them: adding another copy of a known statement is still
+reported. Files whose contents are unchanged since the baseline was
+created are not checked at all.
+
+Paths are recorded relative to the directory of the baseline file, so a
+baseline matches whether files are given by relative or absolute path and
+from whichever working directory ddlcheck runs in.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from pglast.parser import ParseError, fingerprint
+
+from ddlcheck.core.archives import MemberPath
+from ddlcheck.models import Issue
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Version of the baseline file format
+BASELINE_VERSION = 1
+
+# Default name of the baseline file
+DEFAULT_BASELINE = Path(".ddlcheck-baseline.json")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_fingerprint(statement: str) -> str:
+    """Fingerprint a SQL statement independently of its formatting.
+
+    Args:
+        statement: Source text of the statement
+
+    Returns:
+        pglast's fingerprint of the statement, or its whitespace-normalized
+        text if it cannot be parsed on its own
+    """
+    try:
+        return fingerprint(statement)
+    except ParseError:
+        return _WHITESPACE.sub(" ", statement).strip().lower()
+
+
+def baseline_path(file_path: Path, root: Optional[Path]) -> str:
+    """Return the path a baseline records for a file.
+
+    Args:
+        file_path: Path of the file, relative to the working directory or absolute
+        root: Directory of the baseline file, or None to record paths as given
+
+    Returns:
+        The path relative to `root`, in POSIX form; archive members keep
+        their path inside the archive
+    """
+    if root is None or isinstance(file_path, MemberPath):
+        return file_path.as_posix()
+    try:
+        return Path(os.path.relpath(os.path.abspath(file_path), root)).as_posix()
+    except ValueError:
+        # On another drive than the baseline
+        return file_path.as_posix()
+
+
+def issue_fingerprint(check_id: str, statement: str, file_path: str) -> str:
+    """Build the fingerprint of an issue.
+
+    Args:
+        check_id: ID of the check that found the issue
+        statement: Statement fingerprint, see :func:`statement_fingerprint`
+        file_path: Path of the file the issue was found in, as recorded in
+            the baseline, see :func:`baseline_path`
+
+    Returns:
+        Hex digest identifying the issue
+    """
+    key = "\0".join((check_id, statement, file_path))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class Baseline:
+    """Fingerprints of known issues, and content hashes of the files checked for them."""
+
+    def __init__(
+        self,
+        fingerprints: Iterable[str] = (),
+        file_hashes: Optional[Dict[str, str]] = None,
+        signature: Optional[str] = None,
+        identity: Optional[str] = None,
+        root: Optional[Path] = None,
+    ):
+        """Initialize a Baseline.
+
+        Args:
+            fingerprints: Fingerprints of the known issues, repeated for
+                issues that occur more than once
+            file_hashes: Content hash of each file checked for the baseline,
+                by path
+            signature: Engine fingerprint the baseline was created with; files
+                are only skipped by hash when the engine matches
+            identity: Identifies the baseline's contents, e.g. its path and
+                content hash; computed from the contents if not given
+            root: Directory the recorded paths are relative to, or None if
+                they are recorded as given
+        """
+        self.fingerprints = Counter(fingerprints)
+        self.file_hashes: Dict[str, str] = dict(file_hashes or {})
+        self.signature = signature
+        self._identity = identity
+        self.root = root
+
+    @property
+    def identity(self) -> str:
+        """Return a string that changes whenever the known issues change."""
+        if self._identity is None:
+            data = [sorted(self.fingerprints.items()), sorted(self.file_hashes.items())]
+            encoded = json.dumps(data).encode("utf-8")
+            self._identity = hashlib.sha256(encoded).hexdigest()
+        return self._identity
+
+    def count(self, issue_fingerprint: str) -> int:
+        """Return how many issues with a fingerprint are known.
+
+        Args:
+            issue_fingerprint: Fingerprint of an issue
+
+        Returns:
+            Number of known occurrences, 0 for a new issue
+        """
+        return self.fingerprints.get(issue_fingerprint, 0)
+
+    def __len__(self) -> int:
+        """Return the number of known issues."""
+        return sum(self.fingerprints.values())
+
+    @classmethod
+    def load(cls, path: Path) -> "Baseline":
+        """Load a baseline file.
+
+        Args:
+            path: Path to the baseline file
+
+        Returns:
+            The baseline
+
+        Raises:
+            ValueError: If the file is not a baseline of a supported version
+        """
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw.decode("utf-8"))
+        if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+            raise ValueError(f"{path} is not a version {BASELINE_VERSION} ddlcheck baseline")
+
+        baseline = cls(
+            (entry["fingerprint"] for entry in data.get("issues", [])),
+            data.get("files", {}),
+            data.get("signature"),
+            f"{path.resolve().as_posix()}@{hashlib.sha256(raw).hexdigest()}",
+            Path(os.path.abspath(path)).parent,
+        )
+        logger.debug("Loaded %d known issues from %s", len(baseline), path)
+        return baseline
+
+
+class BaselineBuilder:
+    """Collect the fingerprinted issues of a run into a baseline file.
+
+    The builder is a result store for :class:`ddlcheck.core.pipeline.Pipeline`,
+    so it sees every checked file, including the ones without issues.
+    """
+
+    def __init__(self, signature: str, root: Optional[Path] = None):
+        """Initialize a BaselineBuilder.
+
+        Args:
+            signature: Fingerprint of the engine used for the run
+            root: Directory the baseline file is written to; paths are
+                recorded relative to it, or as given if None
+        """
+        self.signature = signature
+        self.root = root
+        self.file_hashes: Dict[str, str] = {}
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def lookup(self, file_hash: str) -> Optional[List[Issue]]:
+        """Never reuse results; every file is checked.
+
+        Args:
+            file_hash: Hash of the file contents
+
+        Returns:
+            None
+        """
+        return None
+
+    def record(self, path: Path, file_hash: str, issues: Sequence[Issue]) -> None:
+        """Add a checked file and its issues to the baseline.
+
+        Args:
+            path: Path of the file
+            file_hash: Hash of the file contents
+            issues: Issues found in the file
+        """
+        file = baseline_path(path, self.root)
+        entries = [
+            {
+                "fingerprint": issue.fingerprint,
+                "file": file,
+                "check_id": issue.check_id,
+                "message": issue.message,
+            }
+            for issue in issues
+            if issue.fingerprint is not None
+        ]
+        # Files with unfingerprinted issues (e.g. read errors) must be checked again
+        with self._lock:
+            if len(entries) == len(issues):
+                self.file_hashes[file] = file_hash
+            self.entries.extend(entries)
+
+    def save(self, path: Path) -> None:
+        """Write the baseline file.
+
+        Entries are sorted so that regenerating an unchanged baseline produces
+        an identical file.
+
+        Args:
+            path: Path to write the baseline to
+        """
+        data = {
+            "version": BASELINE_VERSION,
+            "signature": self.signature,
+            "files": dict(sorted(self.file_hashes.items())),
+            "issues": sorted(self.entries, key=lambda entry: (entry["file"], entry["fingerprint"])),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
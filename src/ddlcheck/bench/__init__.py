@@ -0,0 +1,11 @@
+"""Benchmarks of ddlcheck over synthetic migration corpora.
+
+:mod:`ddlcheck.bench.corpus` generates corpora, :mod:`ddlcheck.bench.runner`
+runs the benchmark scenarios over them, :mod:`ddlcheck.bench.compare`
+saves results and compares them against a baseline and
+:mod:`ddlcheck.bench.report` renders both as tables.
+"""
+
+from ddlcheck.bench.corpus import CorpusSpec, iter_corpus, parse_mix, write_corpus
+
+__all__ = ["CorpusSpec", "iter_corpus", "parse_mix", "write_corpus"]
@@ -0,0 +1,292 @@
+"""Benchmark results files and comparisons against a saved baseline.
+
+A results file records the corpus spec, the environment the benchmark ran in
+and every sample of every scenario. Comparing against a baseline regenerates
+the baseline's corpus, so both runs measure byte-identical inputs.
+
+Timings are noisy, so each scenario is run several times and compared by its
+median. A change is only a regression when it is beyond its threshold *and*
+beyond the noise seen between the samples of either run; changes that exceed
+the threshold but not the noise are reported as noise instead.
+"""
+
+import json
+import os
+import platform
+import statistics
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pglast
+
+import ddlcheck
+from ddlcheck.bench.corpus import CorpusSpec
+from ddlcheck.bench.runner import ScenarioResult
+
+# Version of the results file format
+RESULTS_VERSION = 1
+
+# Default thresholds, as fractions
+DEFAULT_MAX_SLOWDOWN = 0.10
+DEFAULT_MAX_MEMORY_GROWTH = 0.10
+
+# A change must be this many times the relative median absolute deviation of
+# the samples to count as a regression
+NOISE_FACTOR = 3.0
+
+# Environment keys that describe the machine, as opposed to the software
+MACHINE_KEYS = ("system", "machine", "cpu", "cpus")
+
+
+def _cpu_model() -> str:
+    """Return the CPU model name, where the platform reports it."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment() -> Dict[str, object]:
+    """Describe the machine and software a benchmark runs on.
+
+    Returns:
+        Machine fingerprint and Python, pglast and ddlcheck versions
+    """
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "pglast": pglast.__version__,
+        "ddlcheck": ddlcheck.__version__,
+    }
+
+
+@dataclass
+class BenchmarkRun:
+    """Every sample of a benchmark run, with what it ran on."""
+
+    spec: CorpusSpec
+    environment: Dict[str, object]
+    # Samples of each scenario, in the order they were run
+    samples: Dict[str, List[ScenarioResult]]
+    created: Optional[str] = None
+
+    def median(self, scenario: str, metric: str) -> Optional[float]:
+        """Return the median of a metric over the samples of a scenario.
+
+        Args:
+            scenario: Name of the scenario
+            metric: Attribute of :class:`ScenarioResult`
+
+        Returns:
+            The median, or None if no sample has the metric
+        """
+        values = _values(self.samples.get(scenario, []), metric)
+        return statistics.median(values) if values else None
+
+    def representative(self, scenario: str) -> ScenarioResult:
+        """Return the sample of a scenario with the median throughput.
+
+        Args:
+            scenario: Name of the scenario
+
+        Returns:
+            The sample, whose latencies and slowest files go with its throughput
+        """
+        samples = sorted(self.samples[scenario], key=lambda sample: sample.statements_per_second)
+        return samples[(len(samples) - 1) // 2]
+
+    def save(self, path: Path) -> None:
+        """Write the run to a results file.
+
+        Args:
+            path: Path to write the results to
+        """
+        data = {
+            "version": RESULTS_VERSION,
+            "created": self.created or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": self.environment,
+            "spec": asdict(self.spec),
+            "scenarios": {
+                scenario: [sample.to_dict() for sample in samples]
+                for scenario, samples in self.samples.items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    @classmethod
+    def load(cls, path: Path) -> "BenchmarkRun":
+        """Load a results file.
+
+        Args:
+            path: Path to the results file
+
+        Returns:
+            The benchmark run
+
+        Raises:
+            ValueError: If the file is not a results file of a supported version
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != RESULTS_VERSION:
+            raise ValueError(
+                f"{path} is not a version {RESULTS_VERSION} ddlcheck benchmark results file"
+            )
+        try:
+            return cls(
+                spec=CorpusSpec(**data["spec"]),
+                environment=data.get("environment", {}),
+                samples={
+                    scenario: [ScenarioResult(**sample) for sample in samples]
+                    for scenario, samples in data["scenarios"].items()
+                },
+                created=data.get("created"),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{path} is not a valid benchmark results file: {e}")
+
+
+@dataclass
+class Comparison:
+    """Change of one metric of one scenario between two runs."""
+
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+    # Relative change in the bad direction: slowdown or memory growth
+    change: float
+    # Relative median absolute deviation of the noisier of the two runs
+    noise: float
+    threshold: float
+
+    @property
+    def status(self) -> str:
+        """Return ``"regression"``, ``"noise"``, ``"improvement"`` or ``"ok"``."""
+        limit = NOISE_FACTOR * self.noise
+        if self.change > self.threshold:
+            return "regression" if self.change > limit else "noise"
+        if -self.change > self.threshold and -self.change > limit:
+            return "improvement"
+        return "ok"
+
+    @property
+    def regressed(self) -> bool:
+        """Return True if the change is a regression."""
+        return self.status == "regression"
+
+
+def _values(samples: Sequence[ScenarioResult], metric: str) -> List[float]:
+    """Return the values of a metric, skipping samples that lack it."""
+    values = [getattr(sample, metric) for sample in samples]
+    return [float(value) for value in values if value is not None]
+
+
+def relative_mad(values: Sequence[float]) -> float:
+    """Return the median absolute deviation of values, relative to their median.
+
+    Args:
+        values: Samples of a metric
+
+    Returns:
+        The relative deviation; 0 for fewer than two samples
+    """
+    if len(values) < 2:
+        return 0.0
+    median = statistics.median(values)
+    if not median:
+        return 0.0
+    return statistics.median(abs(value - median) for value in values) / abs(median)
+
+
+def compare(
+    baseline: BenchmarkRun,
+    current: BenchmarkRun,
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+) -> List[Comparison]:
+    """Compare the throughput and memory of the scenarios of two runs.
+
+    Args:
+        baseline: The saved run
+        current: The new run
+        max_slowdown: Largest acceptable drop in statements per second, as a
+            fraction of the baseline
+        max_memory_growth: Largest acceptable growth of peak RSS, as a fraction
+            of the baseline
+
+    Returns:
+        One comparison per metric of each scenario in both runs
+    """
+    # Throughput is better when higher, memory when lower
+    metrics = (
+        ("statements_per_second", max_slowdown, -1),
+        ("peak_rss_mb", max_memory_growth, 1),
+    )
+    comparisons = []
+    for scenario, samples in current.samples.items():
+        base_samples = baseline.samples.get(scenario)
+        if not base_samples:
+            continue
+        for metric, threshold, direction in metrics:
+            base_values, values = _values(base_samples, metric), _values(samples, metric)
+            if not base_values or not values:
+                continue
+            base, value = statistics.median(base_values), statistics.median(values)
+            if not base:
+                continue
+            comparisons.append(
+                Comparison(
+                    scenario=scenario,
+                    metric=metric,
+                    baseline=base,
+                    current=value,
+                    change=direction * (value - base) / base,
+                    noise=max(relative_mad(base_values), relative_mad(values)),
+                    threshold=threshold,
+                )
+            )
+    return comparisons
+
+
+def rerun_scenarios(baseline: BenchmarkRun, scenarios: Optional[Sequence[str]] = None) -> List[str]:
+    """Return the scenarios to run again to compare against a baseline.
+
+    Args:
+        baseline: The saved run
+        scenarios: Scenarios to narrow the comparison down to, or None for all
+
+    Returns:
+        The baseline's scenarios, in its order, that are in `scenarios`
+    """
+    return [scenario for scenario in baseline.samples if not scenarios or scenario in scenarios]
+
+
+def environment_differences(baseline: BenchmarkRun, current: BenchmarkRun) -> List[str]:
+    """List the machine properties that differ between two runs.
+
+    Software versions are expected to differ and are not listed.
+
+    Args:
+        baseline: The saved run
+        current: The new run
+
+    Returns:
+        Descriptions of the differences, empty if the machines match
+    """
+    return [
+        f"{key}: {baseline.environment.get(key)} -> {current.environment.get(key)}"
+        for key in MACHINE_KEYS
+        if baseline.environment.get(key) != current.environment.get(key)
+    ]
@@ -0,0 +1,405 @@
+"""Deterministic generator of synthetic migration corpora.
+
+A corpus is described by a :class:`CorpusSpec`: a number of migration files
+with a number of statements each, drawn from a weighted mix of statement
+kinds, plus a few huge single files and ``pg_dump``-style files whose
+``COPY ... FROM stdin`` data sections dominate their size.
+
+Every file is generated from its own random generator seeded with the spec's
+seed and the file's name, so the same spec always produces byte-identical
+files, on any machine and whatever order they are generated in.
+"""
+
+import json
+import random
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Name of the manifest written next to a generated corpus
+MANIFEST = "corpus.json"
+
+_TABLES = [
+    "users",
+    "accounts",
+    "orders",
+    "order_items",
+    "payments",
+    "invoices",
+    "events",
+    "sessions",
+    "audit_log",
+    "products",
+    "inventory",
+    "shipments",
+]
+_COLUMNS = [
+    "status",
+    "email",
+    "created_at",
+    "updated_at",
+    "amount",
+    "currency",
+    "external_id",
+    "notes",
+    "deleted_at",
+    "priority",
+    "region",
+    "version",
+]
+_TYPES = ["text", "integer", "bigint", "boolean", "timestamptz", "numeric(12, 2)", "jsonb", "uuid"]
+_DEFAULTS = {
+    "text": "''",
+    "integer": "0",
+    "bigint": "0",
+    "boolean": "false",
+    "timestamptz": "now()",
+    "numeric(12, 2)": "0",
+    "jsonb": "'{}'::jsonb",
+    "uuid": "gen_random_uuid()",
+}
+
+
+def _table(rng: random.Random) -> str:
+    return f"{rng.choice(_TABLES)}_{rng.randrange(50)}"
+
+
+def _column(rng: random.Random) -> str:
+    return f"{rng.choice(_COLUMNS)}_{rng.randrange(20)}"
+
+
+def _create_table(rng: random.Random) -> str:
+    columns = ["    id bigserial PRIMARY KEY"]
+    for _ in range(rng.randint(2, 8)):
+        column_type = rng.choice(_TYPES)
+        not_null = " NOT NULL" if rng.random() < 0.4 else ""
+        columns.append(f"    {_column(rng)} {column_type}{not_null}")
+    return f"CREATE TABLE IF NOT EXISTS {_table(rng)} (\n" + ",\n".join(columns) + "\n);"
+
+
+def _add_column(rng: random.Random) -> str:
+    column_type = rng.choice(_TYPES)
+    suffix = ""
+    if rng.random() < 0.3:
+        suffix = f" NOT NULL DEFAULT {_DEFAULTS[column_type]}"
+    elif rng.random() < 0.3:
+        suffix = f" DEFAULT {_DEFAULTS[column_type]}"
+    return f"ALTER TABLE {_table(rng)} ADD COLUMN {_column(rng)} {column_type}{suffix};"
+
+
+def _create_index(rng: random.Random) -> str:
+    table = _table(rng)
+    columns = ", ".join(_column(rng) for _ in range(rng.randint(1, 3)))
+    concurrently = "CONCURRENTLY " if rng.random() < 0.5 else ""
+    unique = "UNIQUE " if rng.random() < 0.2 else ""
+    return (
+        f"CREATE {unique}INDEX {concurrently}idx_{table}_{rng.randrange(10**6)}\n"
+        f"    ON {table} ({columns});"
+    )
+
+
+def _alter_column_type(rng: random.Random) -> str:
+    return f"ALTER TABLE {_table(rng)} ALTER COLUMN {_column(rng)} TYPE {rng.choice(_TYPES)};"
+
+
+def _set_not_null(rng: random.Random) -> str:
+    return f"ALTER TABLE {_table(rng)} ALTER COLUMN {_column(rng)} SET NOT NULL;"
+
+
+def _rename_column(rng: random.Random) -> str:
+    return f"ALTER TABLE {_table(rng)} RENAME COLUMN {_column(rng)} TO {_column(rng)};"
+
+
+def _drop_column(rng: random.Random) -> str:
+    return f"ALTER TABLE {_table(rng)} DROP COLUMN IF EXISTS {_column(rng)};"
+
+
+def _drop_table(rng: random.Random) -> str:
+    return f"DROP TABLE IF EXISTS {_table(rng)};"
+
+
+def _truncate(rng: random.Random) -> str:
+    return f"TRUNCATE {_table(rng)};"
+
+
+def _update(rng: random.Random) -> str:
+    where = f"\nWHERE {_column(rng)} IS NULL" if rng.random() < 0.7 else ""
+    return f"UPDATE {_table(rng)}\nSET {_column(rng)} = {rng.randrange(1000)}{where};"
+
+
+def _insert(rng: random.Random) -> str:
+    rows = ",\n".join(
+        f"    ({rng.randrange(10**6)}, 'value {rng.randrange(10**6)}', now())"
+        for _ in range(rng.randint(1, 5))
+    )
+    return f"INSERT INTO {_table(rng)} (id, {_column(rng)}, created_at)\nVALUES\n{rows};"
+
+
+def _select(rng: random.Random) -> str:
+    return (
+        f"SELECT count(*)\nFROM {_table(rng)}\n"
+        f"WHERE {_column(rng)} > {rng.randrange(100)}\nGROUP BY 1;"
+    )
+
+
+def _comment(rng: random.Random) -> str:
+    return f"COMMENT ON TABLE {_table(rng)} IS 'Owned by team {rng.randrange(20)}';"
+
+
+# Statement generators by kind
+STATEMENT_KINDS: Dict[str, Callable[[random.Random], str]] = {
+    "create_table": _create_table,
+    "add_column": _add_column,
+    "create_index": _create_index,
+    "alter_column_type": _alter_column_type,
+    "set_not_null": _set_not_null,
+    "rename_column": _rename_column,
+    "drop_column": _drop_column,
+    "drop_table": _drop_table,
+    "truncate": _truncate,
+    "update": _update,
+    "insert": _insert,
+    "select": _select,
+    "comment": _comment,
+}
+
+# Relative weight of each statement kind in a typical migration history
+DEFAULT_MIX: Dict[str, float] = {
+    "create_table": 10,
+    "add_column": 15,
+    "create_index": 15,
+    "alter_column_type": 4,
+    "set_not_null": 4,
+    "rename_column": 3,
+    "drop_column": 4,
+    "drop_table": 2,
+    "truncate": 1,
+    "update": 10,
+    "insert": 20,
+    "select": 6,
+    "comment": 6,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse a statement mix written as ``kind=weight,kind=weight``.
+
+    Args:
+        text: The mix
+
+    Returns:
+        Weight of each statement kind
+
+    Raises:
+        ValueError: If a kind is unknown or a weight is not a positive number
+    """
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in STATEMENT_KINDS:
+            known = ", ".join(sorted(STATEMENT_KINDS))
+            raise ValueError(f"Unknown statement kind {kind!r}; expected one of {known}")
+        mix[kind] = float(weight) if weight.strip() else 1.0
+        if mix[kind] <= 0:
+            raise ValueError(f"Weight of {kind!r} must be positive")
+    return mix
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+
+    # Number of regular migration files
+    files: int = 200
+    # Statements per regular migration file
+    statements: int = 40
+    # Relative weight of each statement kind
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    # Number of huge single files, and statements in each
+    huge_files: int = 1
+    huge_statements: int = 20000
+    # Number of pg_dump-style files, and data rows per table in each
+    dump_files: int = 1
+    dump_tables: int = 10
+    dump_rows: int = 2000
+    seed: int = 0
+
+
+class CorpusFile(NamedTuple):
+    """A generated file."""
+
+    # Path relative to the corpus directory
+    name: str
+    sql: str
+    # Number of SQL statements in the file
+    statements: int
+
+
+def generate_migration(rng: random.Random, statements: int, mix: Dict[str, float]) -> str:
+    """Generate a migration file.
+
+    Args:
+        rng: Random generator to draw from
+        statements: Number of statements
+        mix: Relative weight of each statement kind
+
+    Returns:
+        The SQL of the file
+    """
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = [f"-- Migration {rng.randrange(10**8):08d}\n-- Generated by ddlcheck bench\n"]
+    for kind in rng.choices(kinds, weights, k=statements):
+        if rng.random() < 0.1:
+            parts.append(f"-- {kind.replace('_', ' ')}\n")
+        parts.append(STATEMENT_KINDS[kind](rng))
+        parts.append("\n\n")
+    return "".join(parts)
+
+
+def generate_dump(rng: random.Random, tables: int, rows: int) -> str:
+    """Generate a ``pg_dump`` plain-format file with data sections.
+
+    Args:
+        rng: Random generator to draw from
+        tables: Number of tables
+        rows: Data rows per table
+
+    Returns:
+        The SQL of the file
+    """
+    parts = [
+        "--\n-- PostgreSQL database dump\n--\n\n"
+        "SET statement_timeout = 0;\n"
+        "SET lock_timeout = 0;\n"
+        "SET client_encoding = 'UTF8';\n"
+        "SET standard_conforming_strings = on;\n"
+        "SELECT pg_catalog.set_config('search_path', '', false);\n\n"
+    ]
+    names = [f"{rng.choice(_TABLES)}_{index}" for index in range(tables)]
+    for name in names:
+        table = f"public.{name}"
+        parts.append(
+            f"--\n-- Name: {table}; Type: TABLE; Schema: public; Owner: app\n--\n\n"
+            f"CREATE TABLE {table} (\n    id bigint NOT NULL,\n    name text,\n"
+            f"    amount numeric(12,2),\n    created_at timestamp with time zone\n);\n\n"
+            f"ALTER TABLE {table} OWNER TO app;\n\n"
+            f"COPY {table} (id, name, amount, created_at) FROM stdin;\n"
+        )
+        parts.extend(
+            (
+                f"{row}\tname {rng.randrange(10**6)}"
+                f"\t{rng.randrange(10**5)}.{rng.randrange(100):02d}"
+                f"\t2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} 12:00:00+00\n"
+                if rng.random() < 0.95
+                else f"{row}\t\\N\t\\N\t\\N\n"
+            )
+            for row in range(rows)
+        )
+        parts.append("\\.\n\n")
+    for name in names:
+        parts.append(
+            f"ALTER TABLE ONLY public.{name}\n    ADD CONSTRAINT {name}_pkey PRIMARY KEY (id);\n\n"
+            f"CREATE INDEX {name}_created_at_idx ON public.{name} USING btree (created_at);\n\n"
+        )
+    parts.append("--\n-- PostgreSQL database dump complete\n--\n")
+    return "".join(parts)
+
+
+def _dump_statements(tables: int) -> int:
+    """Return the number of statements in a generated dump."""
+    # SETs and set_config, then CREATE, ALTER OWNER and COPY, then PK and index
+    return 5 + 3 * tables + 2 * tables
+
+
+def iter_corpus(spec: CorpusSpec) -> Iterator[CorpusFile]:
+    """Generate the files of a corpus in memory.
+
+    Args:
+        spec: Shape of the corpus
+
+    Yields:
+        Each file, regular migrations first
+    """
+    for index in range(spec.files):
+        name = f"migrations/{index + 1:05d}_migration.sql"
+        rng = random.Random(f"{spec.seed}:{name}")
+        yield CorpusFile(name, generate_migration(rng, spec.statements, spec.mix), spec.statements)
+    for index in range(spec.huge_files):
+        name = f"huge/{index + 1:03d}_huge.sql"
+        rng = random.Random(f"{spec.seed}:{name}")
+        yield CorpusFile(
+            name, generate_migration(rng, spec.huge_statements, spec.mix), spec.huge_statements
+        )
+    for index in range(spec.dump_files):
+        name = f"dumps/{index + 1:03d}_dump.sql"
+        rng = random.Random(f"{spec.seed}:{name}")
+        yield CorpusFile(
+            name,
+            generate_dump(rng, spec.dump_tables, spec.dump_rows),
+            _dump_statements(spec.dump_tables),
+        )
+
+
+def write_corpus(spec: CorpusSpec, directory: Path) -> List[CorpusFile]:
+    """Generate a corpus on disk, with a manifest describing it.
+
+    Args:
+        spec: Shape of the corpus
+        directory: Directory to write the corpus to
+
+    Returns:
+        The generated files, without their SQL to keep memory low
+    """
+    files = []
+    for corpus_file in iter_corpus(spec):
+        path = directory / corpus_file.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(corpus_file.sql, encoding="utf-8")
+        files.append(corpus_file._replace(sql=""))
+
+    manifest = {
+        "spec": asdict(spec),
+        "files": {corpus_file.name: corpus_file.statements for corpus_file in files},
+    }
+    with open(directory / MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return files
+
+
+@contextmanager
+def prepared_corpus(
+    spec: CorpusSpec, directory: Optional[Path] = None
+) -> Iterator[Tuple[Path, List[CorpusFile]]]:
+    """Generate a corpus for the duration of a ``with`` block.
+
+    Args:
+        spec: Shape of the corpus
+        directory: Directory to write the corpus to and keep it in, or None
+            for a temporary directory removed afterwards
+
+    Yields:
+        The corpus directory and the generated files, see :func:`write_corpus`
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir), write_corpus(spec, Path(temp_dir))
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    yield directory, write_corpus(spec, directory)
+
+
+def read_manifest(directory: Path) -> Dict[str, int]:
+    """Read the statement count of each file of a generated corpus.
+
+    Args:
+        directory: Directory the corpus was written to
+
+    Returns:
+        Statement count by path relative to the directory
+    """
+    with open(directory / MANIFEST, encoding="utf-8") as f:
+        return json.load(f)["files"]
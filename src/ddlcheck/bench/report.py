@@ -0,0 +1,88 @@
+"""Tables of benchmark results and comparisons, as printed by ``ddlcheck bench``."""
+
+from typing import Optional, Sequence
+
+from rich.table import Table
+
+from ddlcheck.bench.compare import Comparison
+from ddlcheck.bench.runner import ScenarioResult
+
+# Column headers of each compared metric
+_METRICS = {"statements_per_second": "Statements/s", "peak_rss_mb": "Peak RSS MB"}
+
+# Style of each comparison status
+_STATUS_STYLES = {"regression": "bold red", "noise": "yellow", "improvement": "green", "ok": "dim"}
+
+
+def _cell(value: Optional[float], digits: int = 1) -> str:
+    """Format a measurement, or a dash if it is missing."""
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+def results_table(results: Sequence[ScenarioResult]) -> Table:
+    """Build the table of the measurements of each scenario.
+
+    Args:
+        results: One representative sample per scenario
+
+    Returns:
+        Table with one row per scenario
+    """
+    table = Table(title="Benchmark", show_header=True, header_style="bold")
+    for column in ("Scenario", "Seconds", "Statements/s", "p50 ms", "p95 ms", "Max ms"):
+        table.add_column(column, justify="left" if column == "Scenario" else "right")
+    table.add_column("Peak RSS MB", justify="right")
+
+    for result in results:
+        table.add_row(
+            result.scenario,
+            _cell(result.seconds, 2),
+            _cell(result.statements_per_second, 0),
+            _cell(result.latency_p50_ms, 2),
+            _cell(result.latency_p95_ms, 2),
+            _cell(result.latency_max_ms),
+            _cell(result.peak_rss_mb),
+        )
+    return table
+
+
+def slowest_files(result: ScenarioResult) -> Optional[str]:
+    """Describe the slowest files of a scenario.
+
+    Args:
+        result: Sample of the scenario
+
+    Returns:
+        The files with their latencies, or None if the scenario has none
+    """
+    if not result.slowest:
+        return None
+    return ", ".join(f"{path} ({millis:,.0f} ms)" for path, millis in result.slowest)
+
+
+def comparison_table(comparisons: Sequence[Comparison], title: str) -> Table:
+    """Build the table comparing a run with a baseline.
+
+    Args:
+        comparisons: Comparisons returned by :func:`ddlcheck.bench.compare.compare`
+        title: Title of the table
+
+    Returns:
+        Table with one row per metric of each scenario
+    """
+    table = Table(title=title, show_header=True, header_style="bold")
+    for column in ("Scenario", "Metric", "Baseline", "Current", "Change", "Noise", "Status"):
+        table.add_column(column, justify="right" if column in ("Baseline", "Current") else "left")
+
+    for comparison in comparisons:
+        style = _STATUS_STYLES[comparison.status]
+        table.add_row(
+            comparison.scenario,
+            _METRICS[comparison.metric],
+            _cell(comparison.baseline),
+            _cell(comparison.current),
+            f"{comparison.current / comparison.baseline - 1:+.1%}",
+            f"±{comparison.noise:.1%}",
+            f"[{style}]{comparison.status}[/{style}]",
+        )
+    return table
@@ -0,0 +1,266 @@
+"""Benchmark scenarios run over a generated corpus.
+
+Each scenario runs in a fresh Python process, so its peak resident set size
+is its own and not that of whatever ran before it:
+
+* ``check_file``: every check's :meth:`Check.check_file` on every file, the
+  way checks were run before the engine existed,
+* ``engine``: :meth:`Engine.check_file` on every file, one parse per file,
+* ``cli``: ``ddlcheck check`` on the corpus directory, end to end.
+
+In-process scenarios time each file with :func:`time.perf_counter`; the CLI
+scenario only has a total time.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+import ddlcheck
+from ddlcheck.bench.corpus import read_manifest
+
+# Scenarios, in the order they are run by default
+SCENARIOS = ("check_file", "engine", "cli")
+
+# Number of slowest files reported per scenario
+SLOWEST_FILES = 5
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements of one benchmark scenario."""
+
+    scenario: str
+    files: int
+    statements: int
+    bytes: int
+    seconds: float
+    statements_per_second: float
+    # Per-file latency in milliseconds; None for the CLI scenario
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_max_ms: Optional[float] = None
+    # Peak resident set size of the scenario's process, if the platform reports it
+    peak_rss_mb: Optional[float] = None
+    # Slowest files as [path, milliseconds]
+    slowest: Optional[List[List[object]]] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return the result as a JSON-serializable dict."""
+        return asdict(self)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Return a percentile of a list of values, by the nearest-rank method.
+
+    Args:
+        values: The values, in any order
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The value below which `fraction` of the values fall, 0 without values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(fraction * len(ordered) + 0.999999)))
+    return ordered[rank - 1]
+
+
+def corpus_paths(directory: Path) -> List[Path]:
+    """Return the files of a generated corpus, in manifest order.
+
+    Args:
+        directory: Directory the corpus was written to
+
+    Returns:
+        Paths of the corpus files
+    """
+    return [directory / name for name in read_manifest(directory)]
+
+
+def measure(scenario: str, directory: Path) -> Dict[str, object]:
+    """Run an in-process scenario and time every file.
+
+    Args:
+        scenario: ``"check_file"`` or ``"engine"``
+        directory: Directory of a generated corpus
+
+    Returns:
+        Total seconds and per-file latency statistics
+
+    Raises:
+        ValueError: If the scenario is not an in-process scenario
+    """
+    from ddlcheck.checks import ALL_CHECKS
+    from ddlcheck.core.engine import Engine
+
+    checks = [check_class() for check_class in ALL_CHECKS]
+    if scenario == "check_file":
+
+        def run(path: Path) -> None:
+            for check in checks:
+                check.check_file(path)
+
+    elif scenario == "engine":
+        engine = Engine(checks)
+
+        def run(path: Path) -> None:
+            engine.check_file(path)
+
+    else:
+        raise ValueError(f"{scenario!r} is not an in-process scenario")
+
+    latencies = []
+    start = time.perf_counter()
+    for path in corpus_paths(directory):
+        file_start = time.perf_counter()
+        run(path)
+        latencies.append((time.perf_counter() - file_start, path))
+    seconds = time.perf_counter() - start
+
+    millis = [latency * 1000 for latency, _ in latencies]
+    slowest = sorted(latencies, key=lambda item: item[0], reverse=True)[:SLOWEST_FILES]
+    return {
+        "seconds": seconds,
+        "latency_p50_ms": percentile(millis, 0.5),
+        "latency_p95_ms": percentile(millis, 0.95),
+        "latency_max_ms": max(millis, default=0.0),
+        "slowest": [
+            [path.relative_to(directory).as_posix(), latency * 1000] for latency, path in slowest
+        ],
+    }
+
+
+def _run_process(command: List[str], cwd: Path) -> Tuple[int, str, str, Optional[float]]:
+    """Run a command and measure the peak RSS of its process.
+
+    Args:
+        command: Command to run
+        cwd: Working directory
+
+    Returns:
+        Exit code, stdout, stderr and peak RSS in megabytes (None where the
+        platform cannot report it)
+    """
+    # Make the child import the same ddlcheck as this process
+    env = dict(os.environ)
+    package_root = str(Path(ddlcheck.__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=stdout, stderr=stderr)
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+            peak_rss_mb = usage.ru_maxrss / scale
+        else:
+            process.wait()
+        stdout.seek(0)
+        stderr.seek(0)
+        return (
+            process.returncode,
+            stdout.read().decode("utf-8", "replace"),
+            stderr.read().decode("utf-8", "replace"),
+            peak_rss_mb,
+        )
+
+
+def run_scenario(scenario: str, directory: Path, jobs: Optional[int] = None) -> ScenarioResult:
+    """Run a scenario in its own process.
+
+    Args:
+        scenario: One of :data:`SCENARIOS`
+        directory: Directory of a generated corpus
+        jobs: Worker threads for the CLI scenario (default: number of CPUs)
+
+    Returns:
+        The scenario's measurements
+
+    Raises:
+        ValueError: If the scenario is unknown
+        RuntimeError: If the scenario's process fails
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario {scenario!r}; expected one of {', '.join(SCENARIOS)}")
+
+    manifest = read_manifest(directory)
+    statements = sum(manifest.values())
+    size = sum((directory / name).stat().st_size for name in manifest)
+
+    if scenario == "cli":
+        command = [sys.executable, "-m", "ddlcheck", "check", str(directory)]
+        command += ["--format", "jsonl", "--output", os.devnull]
+        if jobs:
+            command += ["--jobs", str(jobs)]
+        start = time.perf_counter()
+        code, _, stderr, peak_rss_mb = _run_process(command, directory)
+        measured: Dict[str, object] = {"seconds": time.perf_counter() - start}
+        # ddlcheck exits with 1 when it finds issues, which a corpus always has
+        if code not in (0, 1):
+            raise RuntimeError(f"ddlcheck check failed with exit code {code}: {stderr}")
+    else:
+        command = [sys.executable, "-m", "ddlcheck.bench.runner", scenario, str(directory)]
+        code, stdout, stderr, peak_rss_mb = _run_process(command, directory)
+        if code != 0:
+            raise RuntimeError(f"Scenario {scenario} failed with exit code {code}: {stderr}")
+        measured = json.loads(stdout)
+
+    seconds = float(measured.pop("seconds"))  # type: ignore[arg-type]
+    return ScenarioResult(
+        scenario=scenario,
+        files=len(manifest),
+        statements=statements,
+        bytes=size,
+        seconds=seconds,
+        statements_per_second=statements / seconds if seconds else 0.0,
+        peak_rss_mb=peak_rss_mb,
+        **measured,  # type: ignore[arg-type]
+    )
+
+
+def run_scenarios(
+    scenarios: Sequence[str],
+    directory: Path,
+    jobs: Optional[int] = None,
+    repeat: int = 1,
+    status: Callable[[str], ContextManager[Any]] = lambda message: nullcontext(),
+) -> Dict[str, List[ScenarioResult]]:
+    """Run scenarios one after the other, each several times.
+
+    Args:
+        scenarios: Scenarios to run, see :data:`SCENARIOS`
+        directory: Directory of a generated corpus
+        jobs: Worker threads for the CLI scenario (default: number of CPUs)
+        repeat: Runs of each scenario
+        status: Called with a description of each run, returning a context
+            manager that is open while it runs, e.g. :meth:`rich.console.Console.status`
+
+    Returns:
+        The samples of each scenario, in the order they were run
+
+    Raises:
+        ValueError: If a scenario is unknown
+        RuntimeError: If a scenario's process fails
+    """
+    samples: Dict[str, List[ScenarioResult]] = {}
+    for scenario in scenarios:
+        for attempt in range(1, repeat + 1):
+            progress = f" ({attempt}/{repeat})" if repeat > 1 else ""
+            with status(f"Running {scenario}{progress}..."):
+                samples.setdefault(scenario, []).append(run_scenario(scenario, directory, jobs))
+    return samples
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure(sys.argv[1], Path(sys.argv[2]))))
@@ -16,6 +16,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class AddColumnCheck(Check):
     """Check for columns added with NOT NULL and DEFAULT."""
 
+    statement_types = frozenset({"AlterTableStmt"})
+    keywords = frozenset({"ALTER"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -82,13 +85,13 @@ class AddColumnCheck(Check):
                             check_id=self.id,
                             message=f"Column '{col_name}' added to table '{table_name}' with NOT NULL and DEFAULT",
                             line=line,
-                            severity=self.severity,
+                            severity=self.effective_severity,
                             suggestion=(
                                 "Consider using two separate migrations:\n"
                                 "1. First add the column with a DEFAULT but as nullable\n"
                                 "2. After data has been populated, add the NOT NULL constraint"
                             ),
-                            context=f"ALTER TABLE {table_name} ADD COLUMN {col_name} ... NOT NULL DEFAULT ...",
+                            context={"table_name": table_name, "column_name": col_name},
                         )
                     )
 
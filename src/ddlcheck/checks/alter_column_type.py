@@ -16,6 +16,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class AlterColumnTypeCheck(Check):
     """Check for ALTER COLUMN TYPE operations."""
 
+    statement_types = frozenset({"AlterTableStmt"})
+    keywords = frozenset({"ALTER"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -77,7 +80,7 @@ class AlterColumnTypeCheck(Check):
                             + (f" to '{target_type}'" if target_type else "")
                         ),
                         line=line,
-                        severity=self.severity,
+                        severity=self.effective_severity,
                         suggestion=(
                             "Altering column types requires a table rewrite and locks the table.\n"
                             "Consider using a multi-step approach:\n"
@@ -86,7 +89,7 @@ class AlterColumnTypeCheck(Check):
                             "3. Drop the old column\n"
                             "4. Rename the new column to the original name"
                         ),
-                        context=f"ALTER TABLE {table_name} ALTER COLUMN {col_name} TYPE ...",
+                        context={"table_name": table_name, "column_name": col_name},
                     )
                 )
 
@@ -9,6 +9,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class CreateIndexCheck(Check):
     """Check for non-concurrent index creation."""
 
+    statement_types = frozenset({"IndexStmt"})
+    keywords = frozenset({"INDEX"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -75,9 +78,10 @@ class CreateIndexCheck(Check):
         if index_size_threshold > 0:
             # We don't know the actual size, so include a note
             suggestion = (
-                f"Consider using CREATE INDEX CONCURRENTLY to avoid blocking writes\n"
-                f"Note: CONCURRENTLY cannot be used inside a transaction block\n"
-                f"This check is configured to warn only for tables likely larger than {index_size_threshold} rows"
+                "Consider using CREATE INDEX CONCURRENTLY to avoid blocking writes\n"
+                "Note: CONCURRENTLY cannot be used inside a transaction block\n"
+                "This check is configured to warn only for tables likely larger than "
+                f"{index_size_threshold} rows"
             )
         else:
             suggestion = (
@@ -16,6 +16,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class DropColumnCheck(Check):
     """Check for DROP COLUMN operations."""
 
+    statement_types = frozenset({"AlterTableStmt"})
+    keywords = frozenset({"ALTER"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -61,7 +64,7 @@ class DropColumnCheck(Check):
                         check_id=self.id,
                         message=f"DROP COLUMN '{col_name}' from table '{table_name}'",
                         line=line,
-                        severity=self.severity,
+                        severity=self.effective_severity,
                         suggestion=(
                             "Dropping columns requires a table rewrite in PostgreSQL.\n"
                             "For large tables, consider these options:\n"
@@ -69,7 +72,7 @@ class DropColumnCheck(Check):
                             "2. Mark the column as unused instead (ALTER TABLE ... ALTER COLUMN ... SET UNUSED)\n"
                             "3. Perform the drop during maintenance windows"
                         ),
-                        context=f"ALTER TABLE {table_name} DROP COLUMN {col_name}",
+                        context={"table_name": table_name, "column_name": col_name},
                     )
                 )
 
@@ -11,6 +11,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class DropTableCheck(Check):
     """Check for DROP TABLE operations."""
 
+    statement_types = frozenset({"DropStmt"})
+    keywords = frozenset({"DROP"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
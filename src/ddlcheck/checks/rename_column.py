@@ -11,6 +11,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class RenameColumnCheck(Check):
     """Check for RENAME COLUMN operations."""
 
+    statement_types = frozenset({"RenameStmt"})
+    keywords = frozenset({"RENAME"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -62,7 +65,7 @@ class RenameColumnCheck(Check):
                         check_id=self.id,
                         message=f"Rename column '{old_name}' to '{new_name}' in table '{table_name}'",
                         line=line,
-                        severity=self.severity,
+                        severity=self.effective_severity,
                         suggestion=(
                             "Renaming columns can break dependent objects like views, functions, and triggers.\n"
                             "Consider these safer approaches:\n"
@@ -70,7 +73,11 @@ class RenameColumnCheck(Check):
                             "2. Verify all dependencies are identified and updated in the same migration\n"
                             "3. Use a view to maintain backward compatibility"
                         ),
-                        context=f"ALTER TABLE {table_name} RENAME COLUMN {old_name} TO {new_name}",
+                        context={
+                            "table_name": table_name,
+                            "old_name": old_name,
+                            "new_name": new_name,
+                        },
                     )
                 )
 
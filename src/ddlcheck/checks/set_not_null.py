@@ -16,6 +16,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class SetNotNullCheck(Check):
     """Check for SET NOT NULL operations."""
 
+    statement_types = frozenset({"AlterTableStmt"})
+    keywords = frozenset({"ALTER"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -61,7 +64,7 @@ class SetNotNullCheck(Check):
                         check_id=self.id,
                         message=f"SET NOT NULL constraint on column '{col_name}' in table '{table_name}'",
                         line=line,
-                        severity=self.severity,
+                        severity=self.effective_severity,
                         suggestion=(
                             "Adding a NOT NULL constraint requires a full table scan to verify the constraint.\n"
                             "For large tables, this can cause significant downtime.\n"
@@ -70,7 +73,7 @@ class SetNotNullCheck(Check):
                             "2. Add a CHECK constraint with a WHERE clause instead\n"
                             "3. Apply the constraint during low-traffic periods"
                         ),
-                        context=f"ALTER TABLE {table_name} ALTER COLUMN {col_name} SET NOT NULL",
+                        context={"table_name": table_name, "column_name": col_name},
                     )
                 )
 
@@ -9,6 +9,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class TruncateCheck(Check):
     """Check for TRUNCATE operations."""
 
+    statement_types = frozenset({"TruncateStmt"})
+    keywords = frozenset({"TRUNCATE"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
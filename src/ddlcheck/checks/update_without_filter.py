@@ -9,6 +9,9 @@ from ddlcheck.models import Issue, SeverityLevel
 class UpdateWithoutFilterCheck(Check):
     """Check for UPDATE statements without WHERE clauses."""
 
+    statement_types = frozenset({"UpdateStmt"})
+    keywords = frozenset({"UPDATE"})
+
     @property
     def id(self) -> str:
         """Return the unique identifier for this check."""
@@ -53,12 +56,12 @@ class UpdateWithoutFilterCheck(Check):
                     check_id=self.id,
                     message=f"UPDATE statement on table '{table_name}' without WHERE clause",
                     line=line,
-                    severity=self.severity,
+                    severity=self.effective_severity,
                     suggestion=(
                         "Add a WHERE clause to limit the rows affected by the update.\n"
                         "Updating all rows in a table can cause excessive I/O and blocking."
                     ),
-                    context=f"UPDATE {table_name} SET ... (without WHERE)",
+                    context={"table_name": table_name},
                 )
             )
 
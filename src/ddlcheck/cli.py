@@ -2,119 +2,721 @@
 
 import logging
 import os
+import sys
+from collections import Counter
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional
+from typing import IO, Any, Dict, List, Optional, Tuple
 
 import typer
 from rich.console import Console
-from rich.panel import Panel
 from rich.table import Table
-from rich.text import Text
 
 from ddlcheck import __version__
+from ddlcheck.baseline import DEFAULT_BASELINE, Baseline, BaselineBuilder
+from ddlcheck.bench.compare import (
+    DEFAULT_MAX_MEMORY_GROWTH,
+    DEFAULT_MAX_SLOWDOWN,
+    BenchmarkRun,
+    compare,
+    environment,
+    environment_differences,
+    rerun_scenarios,
+)
+from ddlcheck.bench.corpus import CorpusSpec, parse_mix, prepared_corpus
+from ddlcheck.bench.report import comparison_table, results_table, slowest_files
+from ddlcheck.bench.runner import SCENARIOS, run_scenarios
 from ddlcheck.checks import ALL_CHECKS
-from ddlcheck.logger import setup_logging
-from ddlcheck.models import CheckResult, Config, SeverityLevel
+from ddlcheck.core.archives import is_archive
+from ddlcheck.core.check import Check
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.guard import MAX_OVERRUNS, CheckGuard, CheckStats
+from ddlcheck.core.memory import DISCOVERY, MemoryReport, MemoryTracker
+from ddlcheck.core.migrations import PYTHON_SUFFIX
+from ddlcheck.core.pipeline import Pipeline
+from ddlcheck.core.profile_output import run_profiler_for
+from ddlcheck.core.profiling import REPORT, Profiler, ProfileReport, TimingRow, clock
+from ddlcheck.core.tracing import TRACEPARENT_ENV, Span, Tracer
+from ddlcheck.history import HistoryStore, check_counts_table, new_issues_table, runs_table
+from ddlcheck.logger import LogFormat, setup_logging, stop_logging
+from ddlcheck.metrics import RunMetrics, render, write_textfile
+from ddlcheck.models import Config, SeverityLevel
+from ddlcheck.progress import RunProgress
+from ddlcheck.reporters import (
+    HUMAN_FORMATS,
+    REPORTERS,
+    OutputFormat,
+    Reporter,
+    RunSummary,
+    format_severity,
+    get_reporter,
+)
 
 # Create the app
 app = typer.Typer(help="Check SQL files for potentially dangerous operations")
+baseline_app = typer.Typer(help="Manage baselines of known issues")
+app.add_typer(baseline_app, name="baseline")
 console = Console()
+err_console = Console(stderr=True)
 logger = logging.getLogger(__name__)
 
 
-def find_sql_files(directory: Path) -> List[Path]:
+def find_sql_files(directory: Path, python: bool = False) -> List[Path]:
     """Find all SQL files in a directory.
 
     Args:
-        directory: Directory to search in
+        directory: Directory to search in, or a single file or archive
+        python: Also find Python files, to check as Alembic or Django migrations
 
     Returns:
         List of paths to SQL files
     """
+    suffixes = (".sql", PYTHON_SUFFIX) if python else (".sql",)
     if not directory.is_dir():
-        return [directory] if directory.suffix.lower() == ".sql" else []
+        # A Python file named explicitly is always checked as a migration
+        if is_archive(directory) or directory.suffix.lower() in (".sql", PYTHON_SUFFIX):
+            return [directory]
+        return []
 
     sql_files = []
     for root, _, files in os.walk(directory):
         for file in files:
-            if file.endswith(".sql"):
+            if file.endswith(suffixes):
                 sql_files.append(Path(root) / file)
     return sql_files
 
 
-def format_severity(severity: SeverityLevel) -> Text:
-    """Format severity level with color.
+def load_config(config_path: Optional[Path], exclude: Optional[str]) -> Config:
+    """Load the configuration and apply command-line excludes.
 
     Args:
-        severity: Severity level to format
+        config_path: Path to the configuration file, or None for the default
+        exclude: Comma-separated list of checks to exclude
 
     Returns:
-        Formatted text
+        The configuration
     """
-    if severity == SeverityLevel.HIGH:
-        return Text("HIGH", style="bold red")
-    elif severity == SeverityLevel.MEDIUM:
-        return Text("MEDIUM", style="bold yellow")
-    elif severity == SeverityLevel.LOW:
-        return Text("LOW", style="bold blue")
-    return Text("INFO", style="bold green")
+    config = Config.from_file(config_path)
+    if exclude:
+        excluded_checks = exclude.split(",")
+        config.excluded_checks.update(excluded_checks)
+        logger.debug("Excluding checks: %s", excluded_checks)
+    return config
+
+
+def parse_variables(assignments: Optional[List[str]]) -> Dict[str, str]:
+    """Parse ``NAME=VALUE`` psql variable assignments.
+
+    Args:
+        assignments: Values of the ``--set`` option
+
+    Returns:
+        The variables by name
+
+    Raises:
+        typer.BadParameter: If an assignment has no name
+    """
+    variables = {}
+    for assignment in assignments or ():
+        name, _, value = assignment.partition("=")
+        if not name:
+            raise typer.BadParameter(f"Expected NAME=VALUE, got {assignment!r}")
+        variables[name] = value
+    return variables
+
+
+def start_memory_tracker(ctx: typer.Context, jobs: Optional[int], status: Console) -> MemoryTracker:
+    """Start tracing memory for ``--memory-report``.
+
+    Args:
+        ctx: Context of the command, stopping the tracker when it closes
+        jobs: Value of ``--jobs``; memory is traced one file at a time
+        status: Console for status messages
+
+    Returns:
+        The running tracker
+    """
+    memory = MemoryTracker()
+    memory.start()
+    ctx.call_on_close(memory.stop)
+    if jobs and jobs > 1:
+        status.print("[dim]--memory-report checks one file at a time; ignoring --jobs[/dim]")
+    return memory
+
+
+def load_baseline(baseline_path: Path, status: Console) -> Baseline:
+    """Load the baseline given with ``--baseline``.
+
+    Args:
+        baseline_path: Path to the baseline file
+        status: Console for status messages
+
+    Returns:
+        The baseline
+
+    Raises:
+        typer.Exit: If the baseline cannot be read
+    """
+    try:
+        return Baseline.load(baseline_path)
+    except (OSError, ValueError) as e:
+        status.print(f"[bold red]Invalid baseline: {e}[/bold red]")
+        raise typer.Exit(code=2)
+
+
+def parse_mix_option(mix: str) -> Dict[str, float]:
+    """Parse the statement kind weights given with ``--mix``.
+
+    Args:
+        mix: Weights such as ``create_index=3,insert=5``
+
+    Returns:
+        Weight of each statement kind
+
+    Raises:
+        typer.BadParameter: If the weights are invalid
+    """
+    try:
+        return parse_mix(mix)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--mix")
+
+
+def load_bench_baseline(compare_path: Path) -> BenchmarkRun:
+    """Load the benchmark results given with ``--compare``.
+
+    Args:
+        compare_path: Path to a results file saved with ``--save``
+
+    Returns:
+        The saved run
+
+    Raises:
+        typer.BadParameter: If the file cannot be read
+    """
+    try:
+        return BenchmarkRun.load(compare_path)
+    except (ValueError, OSError) as e:
+        raise typer.BadParameter(str(e), param_hint="--compare")
+
+
+def create_guard(
+    ctx: typer.Context,
+    checks: List[Check],
+    check_budget: Optional[float],
+    isolate: Optional[str],
+    status: Console,
+) -> Optional[CheckGuard]:
+    """Create the guard enforcing ``--check-budget`` and ``--isolate``.
+
+    Args:
+        ctx: Context of the command, closing the guard when it closes
+        checks: Checks of the run
+        check_budget: Milliseconds each check may spend on a statement
+        isolate: Comma-separated list of checks to run in subprocesses
+        status: Console for status messages
+
+    Returns:
+        The guard, or None if neither option was given
+
+    Raises:
+        typer.Exit: If a check to isolate does not exist
+    """
+    if check_budget is None and not isolate:
+        return None
+    isolated_ids = {check_id.strip() for check_id in (isolate or "").split(",") if check_id}
+    unknown = isolated_ids - {check.id for check in checks}
+    if unknown:
+        names = ", ".join(sorted(unknown))
+        status.print(f"[bold red]Unknown checks to isolate: {names}[/bold red]")
+        raise typer.Exit(code=2)
+    guard = CheckGuard(check_budget, [check for check in checks if check.id in isolated_ids])
+    ctx.call_on_close(guard.close)
+    return guard
+
+
+def start_history(stack: ExitStack, history_path: Path, path: Path, engine: Engine) -> HistoryStore:
+    """Open the history for ``--history`` and start recording a run in it.
+
+    Args:
+        stack: Exit stack closing the history when the run is done
+        history_path: Path to the SQLite database
+        path: Path being checked
+        engine: Engine of the run, reusing extracted SQL through the history
+
+    Returns:
+        The history store
+    """
+    history = stack.enter_context(HistoryStore(history_path))
+    history.start_run(path.resolve(), engine.fingerprint())
+    engine.extractor.cache = history
+    return history
+
+
+def open_results(stack: ExitStack, output: Optional[Path], binary: bool) -> IO[Any]:
+    """Open the stream the results are written to.
+
+    Args:
+        stack: Exit stack closing the file when the run is done
+        output: File to write to, or None for stdout
+        binary: Whether the reporter writes bytes
+
+    Returns:
+        The stream
+    """
+    if output:
+        mode = {"mode": "wb"} if binary else {"mode": "w", "encoding": "utf-8"}
+        return stack.enter_context(open(output, **mode))
+    return sys.stdout.buffer if binary else sys.stdout
+
+
+def create_progress(
+    progress: Optional[bool],
+    sql_files: List[Path],
+    status: Console,
+    results_on_terminal: bool,
+) -> Optional[RunProgress]:
+    """Create the progress display of a run.
+
+    Args:
+        progress: Value of ``--progress/--no-progress``, None for the default
+        sql_files: Files to check
+        status: Console for status messages, which the progress is drawn on
+        results_on_terminal: Whether machine-readable results go to a terminal on stdout
+
+    Returns:
+        The progress display, or None if progress is not shown
+    """
+    if progress is None:
+        # Don't draw over results written to the same terminal by another stream
+        progress = status.is_terminal and not results_on_terminal
+    if not progress:
+        return None
+    return RunProgress(sql_files, status, live=status.is_terminal)
+
 
+def create_reporter(
+    output_format: OutputFormat,
+    stream: IO[Any],
+    top: int,
+    console_output: Optional[Console],
+    status: Console,
+) -> Reporter:
+    """Create the reporter for ``--format``.
 
-def display_results(results: List[CheckResult]) -> None:
-    """Display check results to the console.
+    Args:
+        output_format: Output format of the results
+        stream: Stream to write the results to
+        top: Number of files and tables listed by the summary format
+        console_output: Console the text format prints through, or None for `stream`
+        status: Console for status messages
+
+    Returns:
+        The reporter
+
+    Raises:
+        typer.Exit: If the format needs an optional dependency that is not installed
+    """
+    options: Dict[str, object] = {"top": top} if output_format == OutputFormat.SUMMARY else {}
+    if console_output is not None and output_format == OutputFormat.TEXT:
+        options["console"] = console_output
+    try:
+        return get_reporter(output_format, stream, **options)
+    except ImportError as e:
+        status.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=2)
+
+
+def report_results(
+    pipeline: Pipeline,
+    sql_files: List[Path],
+    reporter: Reporter,
+    summary: RunSummary,
+    fail_on: SeverityLevel,
+    fail_fast: bool,
+    issue_counts: Optional[Counter[Tuple[str, str]]] = None,
+) -> Tuple[int, bool]:
+    """Run the checks, reporting each file's issues as soon as they are found.
 
     Args:
-        results: List of check results
+        pipeline: Pipeline checking the files
+        sql_files: Files to check
+        reporter: Reporter of the results
+        summary: Totals of the run, updated with the issues found
+        fail_on: Severity at or above which issues fail the run
+        fail_fast: Whether to stop at the first failing issue
+        issue_counts: Counts of the issues by check and severity, updated if given
+
+    Returns:
+        The number of failing issues, and whether the run was interrupted
     """
-    issue_count = sum(len(result.issues) for result in results)
-    if issue_count == 0:
-        console.print("[bold green]No issues found![/bold green]")
-        return
+    failing_count = 0
+    try:
+        for result in pipeline.run(sql_files):
+            summary.issue_count += len(result.issues)
+            if issue_counts is not None:
+                issue_counts.update(
+                    (issue.check_id, issue.severity.value) for issue in result.issues
+                )
+            failing = sum(1 for issue in result.issues if issue.severity >= fail_on)
+            failing_count += failing
+            with pipeline.engine.phase(REPORT):
+                reporter.report(result)
+            if fail_fast and failing:
+                pipeline.stop(f"--fail-fast triggered by {result.file_path}")
+    except KeyboardInterrupt:
+        # The pipeline has already shut its workers down; report what we have
+        pipeline.stop("interrupted")
+        return failing_count, True
+    return failing_count, False
+
+
+def complete_summary(
+    summary: RunSummary,
+    pipeline: Pipeline,
+    profile: bool,
+    memory: Optional[MemoryTracker],
+) -> Tuple[Optional[ProfileReport], Optional[MemoryReport]]:
+    """Add the totals, timings and memory of a finished run to its summary.
+
+    Args:
+        summary: Totals of the run, updated in place
+        pipeline: Pipeline that checked the files
+        profile: Whether to report the timings of the run
+        memory: Memory tracker of the run, if tracing memory
+
+    Returns:
+        The timings and the memory used by the run, each None if not reported
+    """
+    summary.files_checked = pipeline.files_checked
+    summary.stop_reason = pipeline.stop_reason
+    profile_report = pipeline.engine.profiler.report() if profile else None
+    if profile_report is not None:
+        summary.profile = profile_report.to_dict()
+    memory_usage = None
+    if memory is not None:
+        memory.snapshot(REPORT)
+        memory_usage = memory.report()
+        summary.memory = memory_usage.to_dict()
+    return profile_report, memory_usage
+
+
+def record_run(
+    summary: RunSummary, run_span: Optional[Span], history: Optional[HistoryStore]
+) -> None:
+    """Record the totals of a run on its trace span and in the history.
 
-    # Group issues by file
+    Args:
+        summary: Totals of the run
+        run_span: Span of the run, if traced
+        history: History store, if recording
+    """
+    if run_span is not None:
+        run_span.attributes["ddlcheck.files_checked"] = summary.files_checked
+        run_span.attributes["ddlcheck.issues"] = summary.issue_count
+        run_span.attributes["ddlcheck.stop_reason"] = summary.stop_reason
+    if history is not None:
+        history.finish_run(summary.files_checked, summary.issue_count, summary.stop_reason)
+        logger.debug("Reused stored results for %d unchanged files", history.files_reused)
+
+
+def write_metrics(
+    metrics_file: Path,
+    summary: RunSummary,
+    pipeline: Pipeline,
+    issue_counts: Counter[Tuple[str, str]],
+    history: Optional[HistoryStore],
+    status: Console,
+) -> None:
+    """Write the Prometheus metrics of a run.
+
+    Args:
+        metrics_file: File to write the metrics to
+        summary: Totals of the run
+        pipeline: Pipeline that checked the files
+        issue_counts: Counts of the issues by check and severity
+        history: History store, if recording
+        status: Console for status messages
+    """
+    engine = pipeline.engine
+    metrics = RunMetrics(
+        files_checked=summary.files_checked,
+        statements_parsed=engine.statements_parsed,
+        characters_checked=engine.characters_checked,
+        parse_errors=engine.parse_errors,
+        duration_seconds=(clock() - engine.profiler.started_ns) / 1e9,
+        workers=pipeline.workers,
+        partial=summary.partial,
+        issues=dict(issue_counts),
+        files_reused=history.files_reused if history is not None else None,
+        timings=engine.profiler.merged(),
+    )
+    try:
+        write_textfile(metrics_file, render(metrics))
+    except OSError as e:
+        status.print(f"[bold red]Could not write metrics to {metrics_file}: {e}[/bold red]")
+
+
+def export_trace(tracer: Tracer, trace_output: str, status: Console) -> None:
+    """Export the spans of a run for ``--trace-output``.
+
+    Args:
+        tracer: Tracer of the run
+        trace_output: File or OTLP/HTTP URL to export to
+        status: Console for status messages
+    """
+    try:
+        tracer.export(trace_output)
+        status.print(f"[dim]Trace written to {trace_output}[/dim]")
+    except OSError as e:
+        status.print(f"[bold red]Could not export the trace to {trace_output}: {e}[/bold red]")
+
+
+def display_run_details(
+    summary: RunSummary,
+    engine: Engine,
+    profile_report: Optional[ProfileReport],
+    memory_usage: Optional[MemoryReport],
+    out: Console,
+) -> None:
+    """Display the profile, memory, check budgets and notes of a run.
+
+    Args:
+        summary: Totals of the run
+        engine: Engine that checked the files
+        profile_report: Timings of the run, if profiled
+        memory_usage: Memory used by the run, if traced
+        out: Console to print to
+    """
+    if profile_report is not None:
+        display_profile(profile_report, out)
+    if memory_usage is not None:
+        display_memory(memory_usage, out)
+    budget_stats = engine.guard.report() if engine.guard is not None else []
+    if budget_stats:
+        display_check_budgets(budget_stats, out)
+    if engine.suppressed:
+        out.print(f"[dim]{engine.suppressed} known issues suppressed by the baseline[/dim]")
+    if summary.partial:
+        out.print(
+            f"[bold yellow]Partial results: checking stopped early "
+            f"({summary.stop_reason})[/bold yellow]"
+        )
+
+
+def exit_for_issues(
+    issue_count: int,
+    failing_count: int,
+    fail_on: SeverityLevel,
+    interrupted: bool,
+    status: Console,
+) -> None:
+    """Print the closing line of a run and exit with its status code.
+
+    Args:
+        issue_count: Number of issues found
+        failing_count: Number of issues at or above ``--fail-on``
+        fail_on: Severity at or above which issues fail the run
+        interrupted: Whether the run was interrupted
+        status: Console for status messages
+
+    Raises:
+        typer.Exit: With code 1 if issues at or above ``--fail-on`` were found, or 130 if
+            the run was interrupted
+    """
+    if failing_count > 0:
+        status.print(f"[bold red]Found {issue_count} issues![/bold red]")
+        logger.info("Found %d issues", issue_count)
+        raise typer.Exit(code=1)
+
+    if issue_count > 0:
+        status.print(
+            f"[bold yellow]Found {issue_count} issues below --fail-on {fail_on.value}[/bold yellow]"
+        )
+        logger.info("Found %d issues below the failure threshold", issue_count)
+
+    if interrupted:
+        raise typer.Exit(code=130)
+
+    logger.info("Check completed successfully with no issues")
+
+
+def display_bench_results(run: BenchmarkRun, repeat: int) -> None:
+    """Print the measurements of each benchmark scenario.
+
+    Args:
+        run: The benchmark run
+        repeat: Runs of each scenario
+    """
+    results = [run.representative(scenario) for scenario in run.samples]
+    console.print(results_table(results))
+    if repeat > 1:
+        console.print(f"[dim]Median run of {repeat} per scenario[/dim]")
     for result in results:
-        if not result.has_issues():
-            continue
+        slowest = slowest_files(result)
+        if slowest:
+            console.print(f"[dim]Slowest files for {result.scenario}: {slowest}[/dim]")
 
-        # Get the file name for display
-        file_path = result.file_path
-        file_name = file_path.name
 
-        console.print(f"\n[bold]File:[/bold] {file_path} ([bold cyan]{file_name}[/bold cyan])")
+def exit_for_regressions(
+    baseline: BenchmarkRun,
+    run: BenchmarkRun,
+    compare_path: Path,
+    max_slowdown: float,
+    max_memory_growth: float,
+) -> None:
+    """Print how a benchmark run compares with a baseline, exiting on regressions.
 
-        table = Table(show_header=True, header_style="bold")
-        table.add_column("Line")
-        table.add_column("Severity")
-        table.add_column("Check")
-        table.add_column("Message")
+    Args:
+        baseline: The saved run
+        run: The new run
+        compare_path: Path the baseline was loaded from
+        max_slowdown: Largest acceptable drop in statements per second, as a fraction
+        max_memory_growth: Largest acceptable growth of peak RSS, as a fraction
+
+    Raises:
+        typer.Exit: With code 1 if any metric regressed
+    """
+    for difference in environment_differences(baseline, run):
+        console.print(f"[bold yellow]Machine differs from the baseline: {difference}[/bold yellow]")
+    comparisons = compare(baseline, run, max_slowdown, max_memory_growth)
+    console.print(comparison_table(comparisons, f"Compared with {compare_path}"))
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        console.print(f"[bold red]{len(regressions)} performance regressions[/bold red]")
+        raise typer.Exit(code=1)
+    console.print("[bold green]No performance regressions[/bold green]")
+
+
+def display_profile(report: ProfileReport, out: Console) -> None:
+    """Display where the time of a run went.
+
+    Args:
+        report: Timings of the run
+        out: Console to print to
+    """
 
-        for issue in sorted(result.issues, key=lambda x: x.line):
+    def timing_table(title: str, rows: List[TimingRow]) -> Table:
+        table = Table(title=title, show_header=True, header_style="bold")
+        table.add_column(title.split()[0])
+        for column in ("Calls", "Total ms", "Mean ms", "p95 ms", "Max ms"):
+            table.add_column(column, justify="right")
+        for row in rows:
             table.add_row(
-                str(issue.line),
-                format_severity(issue.severity),
-                issue.check_id,
-                issue.message,
+                row.name,
+                f"{row.count:,}",
+                f"{row.total_ms:,.1f}",
+                f"{row.mean_ms:,.3f}",
+                f"{row.p95_ms:,.3f}",
+                f"{row.max_ms:,.2f}",
             )
+        return table
 
-        console.print(table)
+    out.print(timing_table("Phase timings", report.phases))
+    out.print(timing_table("Check timings", report.checks))
+    for title, items in (
+        ("Slowest files", report.slowest_files),
+        ("Slowest statements", report.slowest_statements),
+    ):
+        if items:
+            listed = ", ".join(f"{label} ({ms:,.1f} ms)" for label, ms in items[:5])
+            out.print(f"[dim]{title}: {listed}[/dim]")
+    out.print(
+        f"[dim]Wall time {report.wall_ms:,.0f} ms; phases and checks of concurrent workers "
+        f"overlap, so their totals can exceed it[/dim]"
+    )
 
-        # Show suggestions for issues
-        for issue in result.issues:
-            if issue.suggestion:
-                console.print(
-                    Panel(
-                        f"[bold]{issue.message}[/bold]\n\n{issue.suggestion}",
-                        title=f"Suggestion for {issue.check_id} (line {issue.line})",
-                        border_style="yellow",
-                    )
-                )
+
+def display_memory(report: MemoryReport, out: Console) -> None:
+    """Display where the memory of a run went.
+
+    Args:
+        report: Memory used by the run
+        out: Console to print to
+    """
+
+    def megabytes(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:,.1f}"
+
+    table = Table(title="Memory by phase", show_header=True, header_style="bold")
+    table.add_column("Phase")
+    table.add_column("File")
+    for column in ("Traced MB", "Peak traced MB", "Peak RSS MB"):
+        table.add_column(column, justify="right")
+    for snapshot in report.snapshots:
+        table.add_row(
+            snapshot.phase,
+            snapshot.file or "",
+            megabytes(snapshot.traced_mb),
+            megabytes(snapshot.peak_traced_mb),
+            megabytes(snapshot.peak_rss_mb),
+        )
+    out.print(table)
+
+    table = Table(title="Files by peak memory", show_header=True, header_style="bold")
+    table.add_column("File")
+    for column in ("Size KB", "Peak traced MB", "Peak RSS MB"):
+        table.add_column(column, justify="right")
+    for memory in report.files:
+        table.add_row(
+            memory.file,
+            f"{memory.size_bytes / 1024:,.0f}",
+            megabytes(memory.peak_traced_mb),
+            megabytes(memory.peak_rss_mb),
+        )
+    out.print(table)
+
+    # Allocation sites at the snapshot with the most memory in use
+    largest = max(report.snapshots, key=lambda snapshot: snapshot.traced_mb, default=None)
+    if largest is not None and largest.sites:
+        where = f" of {largest.file}" if largest.file else ""
+        table = Table(
+            title=f"Top allocation sites after {largest.phase}{where}",
+            show_header=True,
+            header_style="bold",
+        )
+        table.add_column("Location")
+        table.add_column("MB", justify="right")
+        table.add_column("Blocks", justify="right")
+        for site in largest.sites:
+            table.add_row(site.location, f"{site.size_mb:,.2f}", f"{site.count:,}")
+        out.print(table)
+    out.print(
+        f"[dim]Peak traced memory {report.peak_traced_mb:,.1f} MB, "
+        f"peak RSS {megabytes(report.peak_rss_mb)} MB[/dim]"
+    )
+
+
+def display_check_budgets(stats: List[CheckStats], out: Console) -> None:
+    """Display the checks that went over their time budget, crashed or were skipped.
+
+    Args:
+        stats: Statistics of those checks
+        out: Console to print to
+    """
+    table = Table(title="Check budgets", show_header=True, header_style="bold")
+    table.add_column("Check")
+    for column in ("Calls", "Over budget", "Timed out", "Crashed", "Skipped", "Slowest ms"):
+        table.add_column(column, justify="right")
+    for check in stats:
+        table.add_row(
+            check.check_id,
+            f"{check.calls:,}",
+            f"{check.overruns:,}",
+            f"{check.timeouts:,}",
+            f"{check.crashes:,}",
+            f"{check.skipped:,}",
+            f"{check.slowest_ms:,.1f}",
+        )
+    out.print(table)
 
 
 @app.command()
 def check(
+    ctx: typer.Context,
     path: Path = typer.Argument(
         ...,
-        help="Path to SQL file or directory of SQL files",
+        help="Path to SQL file, directory of SQL files, or tar/zip archive",
         exists=True,
     ),
     config_path: Optional[Path] = typer.Option(
@@ -140,53 +742,496 @@ def check(
         "--log-file",
         help="Path to log file",
     ),
+    log_format: LogFormat = typer.Option(
+        LogFormat.TEXT.value,
+        "--log-format",
+        help="Write log records as text or as JSON lines",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker threads parsing and checking files (default: number of CPUs)",
+    ),
+    min_severity: SeverityLevel = typer.Option(
+        SeverityLevel.INFO.value,
+        "--min-severity",
+        help="Only run checks and report issues at or above this severity",
+    ),
+    fail_on: SeverityLevel = typer.Option(
+        SeverityLevel.INFO.value,
+        "--fail-on",
+        help="Exit with an error only for issues at or above this severity",
+    ),
+    fail_fast: bool = typer.Option(
+        False,
+        "--fail-fast",
+        help="Stop at the first issue at or above --fail-on",
+    ),
+    max_time: Optional[float] = typer.Option(
+        None,
+        "--max-time",
+        min=0,
+        help="Stop after this many seconds and report the partial results",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.TEXT.value,
+        "--format",
+        "-f",
+        help="Output format for the results",
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Write the results to this file instead of stdout",
+    ),
+    top: int = typer.Option(
+        10,
+        "--top",
+        min=0,
+        help="Number of worst files and most affected tables listed by --format summary",
+    ),
+    history_path: Optional[Path] = typer.Option(
+        None,
+        "--history",
+        help="Record the run in this SQLite database and reuse results for unchanged files",
+    ),
+    baseline_path: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        "-b",
+        help="Only report issues that are not in this baseline file",
+        exists=True,
+        dir_okay=False,
+    ),
+    variables: Optional[List[str]] = typer.Option(
+        None,
+        "--set",
+        metavar="NAME=VALUE",
+        help="Define a psql variable, like psql --set (can be repeated)",
+    ),
+    python: bool = typer.Option(
+        False,
+        "--python",
+        help="Also check the SQL of Alembic and Django migrations in .py files",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Time each phase and check and print a breakdown (also added to JSON summaries)",
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        "--profile-output",
+        help="Profile the workers and write the profile here: pstats (cProfile), or "
+        "speedscope (sampled) for names ending in .json",
+        dir_okay=False,
+    ),
+    memory_report: bool = typer.Option(
+        False,
+        "--memory-report",
+        help="Trace memory with tracemalloc, checking one file at a time, and print where it went",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write Prometheus metrics of the run to this file, e.g. for the node_exporter "
+        "textfile collector",
+        dir_okay=False,
+    ),
+    trace_output: Optional[str] = typer.Option(
+        None,
+        "--trace-output",
+        help="Write OpenTelemetry spans of the run as OTLP/JSON to this file, or post them to "
+        f"this OTLP/HTTP URL; joins the trace in ${TRACEPARENT_ENV} if set",
+    ),
+    progress: Optional[bool] = typer.Option(
+        None,
+        "--progress/--no-progress",
+        help="Show progress while checking: a bar on terminals, otherwise a line every "
+        "10 seconds (default: on terminals only)",
+    ),
+    check_budget: Optional[float] = typer.Option(
+        None,
+        "--check-budget",
+        min=0,
+        metavar="MS",
+        help="Milliseconds each check may spend on a statement; checks over it "
+        f"{MAX_OVERRUNS} times are skipped for the rest of the run, isolated checks are killed",
+    ),
+    isolate: Optional[str] = typer.Option(
+        None,
+        "--isolate",
+        help="Comma-separated list of checks to run in subprocesses, where a slow or "
+        "crashing check is stopped without affecting the others",
+    ),
 ):
     """Check SQL files for potentially dangerous operations."""
     # Setup logging
     log_level = "DEBUG" if verbose else "INFO"
-    setup_logging(log_level, log_file)
+    setup_logging(log_level, log_file, log_format)
+    ctx.call_on_close(stop_logging)
 
-    logger.debug(f"Starting check with path: {path}")
+    logger.debug("Starting check with path: %s", path)
 
     # Load config
-    config = Config.from_file(config_path)
+    config = load_config(config_path, exclude)
 
-    # Add command-line excludes
-    if exclude:
-        excluded_checks = exclude.split(",")
-        config.excluded_checks.update(excluded_checks)
-        logger.debug(f"Excluding checks: {excluded_checks}")
+    # Machine-readable results on stdout must not be mixed with status messages
+    status = console if output_format in HUMAN_FORMATS or output else err_console
+
+    memory = None
+    if memory_report:
+        memory = start_memory_tracker(ctx, jobs, status)
+        jobs = 1
 
     # Get SQL files
-    sql_files = find_sql_files(path)
+    sql_files = find_sql_files(path, python)
     if not sql_files:
-        console.print(f"[bold red]No SQL files found at {path}[/bold red]")
+        status.print(f"[bold red]No SQL files found at {path}[/bold red]")
         raise typer.Exit(code=1)
+    if memory is not None:
+        memory.snapshot(DISCOVERY)
+        memory.watch(sql_files)
 
-    console.print(f"[bold]Checking {len(sql_files)} SQL files...[/bold]")
-    logger.info(f"Found {len(sql_files)} SQL files to check")
+    status.print(f"[bold]Checking {len(sql_files)} SQL files...[/bold]")
+    logger.info("Found %d SQL files to check", len(sql_files))
 
-    # Run checks
-    results = []
-    for sql_file in sql_files:
-        logger.debug(f"Checking file: {sql_file}")
-        for check_class in ALL_CHECKS:
-            check = check_class(config)
-            if check.enabled:
-                logger.debug(f"Running check: {check.id}")
-                results.append(check.check_file(sql_file))
+    baseline = load_baseline(baseline_path, status) if baseline_path else None
+    checks = [check_class(config) for check_class in ALL_CHECKS]
+    engine = Engine(
+        checks,
+        min_severity,
+        baseline,
+        variables=parse_variables(variables),
+        checked_files=sql_files,
+        # Metrics include the phase and check histograms
+        profiler=Profiler() if profile or metrics_file else None,
+        memory=memory,
+        tracer=Tracer.from_environment() if trace_output else None,
+        guard=create_guard(ctx, checks, check_budget, isolate, status),
+    )
+    logger.debug("Running checks: %s", ", ".join(check.id for check in engine.checks))
+    summary = RunSummary()
+    issue_counts: Counter[Tuple[str, str]] = Counter()
 
-    # Display results
-    display_results(results)
+    with ExitStack() as stack:
+        history = start_history(stack, history_path, path, engine) if history_path else None
+        run_span = None
+        if engine.tracer is not None:
+            run_span = stack.enter_context(
+                engine.tracer.run(**{"ddlcheck.path": str(path), "ddlcheck.files": len(sql_files)})
+            )
 
-    # Exit with error code if issues were found
-    issue_count = sum(len(result.issues) for result in results)
-    if issue_count > 0:
-        console.print(f"[bold red]Found {issue_count} issues![/bold red]")
-        logger.info(f"Found {issue_count} issues")
+        stream = open_results(stack, output, REPORTERS[output_format].binary)
+        run_progress = create_progress(
+            progress,
+            sql_files,
+            status,
+            results_on_terminal=output is None
+            and output_format not in HUMAN_FORMATS
+            and console.is_terminal,
+        )
+        pipeline = Pipeline(
+            engine,
+            workers=jobs,
+            max_time=max_time,
+            store=history,
+            member_suffixes=(".sql", PYTHON_SUFFIX) if python else (".sql",),
+            run_profiler=run_profiler_for(profile_output) if profile_output else None,
+            on_file=run_progress.advance if run_progress is not None else None,
+        )
+        # Print text results through the console drawing the progress bar
+        progress_console = status if run_progress is not None and not output else None
+        reporter = create_reporter(output_format, stream, top, progress_console, status)
+
+        reporter.start(engine.checks)
+        if run_progress is not None:
+            run_progress.start()
+        try:
+            failing_count, interrupted = report_results(
+                pipeline,
+                sql_files,
+                reporter,
+                summary,
+                fail_on,
+                fail_fast,
+                issue_counts if metrics_file else None,
+            )
+        finally:
+            if run_progress is not None:
+                run_progress.finish()
+
+        profile_report, memory_usage = complete_summary(summary, pipeline, profile, memory)
+        reporter.finish(summary)
+        record_run(summary, run_span, history)
+        if profile_output:
+            pipeline.run_profiler.write(profile_output)
+            status.print(f"[dim]Profile written to {profile_output}[/dim]")
+        if metrics_file:
+            write_metrics(metrics_file, summary, pipeline, issue_counts, history, status)
+
+    if trace_output and engine.tracer is not None:
+        export_trace(engine.tracer, trace_output, status)
+
+    display_run_details(summary, engine, profile_report, memory_usage, status)
+    # Exit with error code if issues at or above --fail-on were found
+    exit_for_issues(summary.issue_count, failing_count, fail_on, interrupted, status)
+
+
+@baseline_app.command("create")
+def baseline_create(
+    path: Path = typer.Argument(
+        ...,
+        help="Path to SQL file, directory of SQL files, or tar/zip archive",
+        exists=True,
+    ),
+    output: Path = typer.Option(
+        DEFAULT_BASELINE,
+        "--output",
+        "-o",
+        help="Path to write the baseline to",
+    ),
+    config_path: Optional[Path] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Path to configuration file (default: .ddlcheck)",
+    ),
+    exclude: Optional[str] = typer.Option(
+        None,
+        "--exclude",
+        "-e",
+        help="Comma-separated list of checks to exclude",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker threads parsing and checking files (default: number of CPUs)",
+    ),
+    variables: Optional[List[str]] = typer.Option(
+        None,
+        "--set",
+        metavar="NAME=VALUE",
+        help="Define a psql variable, like psql --set (can be repeated)",
+    ),
+    python: bool = typer.Option(
+        False,
+        "--python",
+        help="Also check the SQL of Alembic and Django migrations in .py files",
+    ),
+):
+    """Record every current issue so later checks only report new ones."""
+    config = load_config(config_path, exclude)
+    sql_files = find_sql_files(path, python)
+    if not sql_files:
+        console.print(f"[bold red]No SQL files found at {path}[/bold red]")
         raise typer.Exit(code=1)
 
-    logger.info("Check completed successfully with no issues")
+    root = Path(os.path.abspath(output)).parent
+    engine = Engine(
+        [check_class(config) for check_class in ALL_CHECKS],
+        fingerprint_issues=True,
+        variables=parse_variables(variables),
+        checked_files=sql_files,
+        baseline_root=root,
+    )
+    builder = BaselineBuilder(engine.fingerprint(), root)
+    pipeline = Pipeline(
+        engine,
+        workers=jobs,
+        store=builder,
+        member_suffixes=(".sql", PYTHON_SUFFIX) if python else (".sql",),
+    )
+    for _ in pipeline.run(sql_files):
+        pass
+
+    builder.save(output)
+    console.print(
+        f"[bold green]Recorded {len(builder.entries)} issues from {len(sql_files)} files "
+        f"in {output}[/bold green]"
+    )
+
+
+@app.command()
+def history(
+    database: Path = typer.Argument(
+        ...,
+        help="History database written by 'ddlcheck check --history'",
+        exists=True,
+        dir_okay=False,
+    ),
+    last: int = typer.Option(
+        10,
+        "--last",
+        "-n",
+        min=1,
+        help="Number of most recent runs to show",
+    ),
+    root: Optional[str] = typer.Option(
+        None,
+        "--root",
+        help="Only show runs started on this path",
+    ),
+    by_check: bool = typer.Option(
+        False,
+        "--by-check",
+        help="Show the number of issues per check in each run",
+    ),
+    regressions: bool = typer.Option(
+        False,
+        "--regressions",
+        help="List issues in the latest run that were not in the run before it",
+    ),
+):
+    """Show how issue counts changed across recorded runs."""
+    with HistoryStore(database) as store:
+        runs = store.runs(last, str(Path(root).resolve()) if root else None)
+        if not runs:
+            console.print("[bold yellow]No runs recorded[/bold yellow]")
+            raise typer.Exit()
+        console.print(check_counts_table(store, runs) if by_check else runs_table(runs))
+        if not regressions:
+            return
+
+        if len(runs) < 2:
+            console.print("[bold yellow]Regressions need at least two runs[/bold yellow]")
+            return
+        base, latest = runs[-2], runs[-1]
+        table = new_issues_table(store, latest, base)
+        if table is None:
+            console.print(f"[bold green]No new issues in run {latest.id}[/bold green]")
+            return
+        console.print(table)
+
+
+@app.command()
+def bench(
+    files: int = typer.Option(200, "--files", min=0, help="Number of regular migration files"),
+    statements: int = typer.Option(
+        40, "--statements", min=1, help="Statements per regular migration file"
+    ),
+    mix: Optional[str] = typer.Option(
+        None,
+        "--mix",
+        help="Statement kind weights, e.g. create_index=3,insert=5 (default: typical mix)",
+    ),
+    huge_files: int = typer.Option(1, "--huge-files", min=0, help="Number of huge files"),
+    huge_statements: int = typer.Option(
+        20000, "--huge-statements", min=1, help="Statements per huge file"
+    ),
+    dump_files: int = typer.Option(1, "--dump-files", min=0, help="Number of pg_dump files"),
+    dump_rows: int = typer.Option(
+        2000, "--dump-rows", min=0, help="COPY data rows per table in pg_dump files"
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed of the corpus generator"),
+    scenarios: Optional[List[str]] = typer.Option(
+        None,
+        "--scenario",
+        "-s",
+        help=f"Scenario to run: {', '.join(SCENARIOS)} (can be repeated; default: all)",
+    ),
+    corpus_dir: Optional[Path] = typer.Option(
+        None,
+        "--corpus",
+        help="Write the corpus to this directory and keep it (default: a temporary directory)",
+        file_okay=False,
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker threads for the cli scenario (default: number of CPUs)",
+    ),
+    repeat: Optional[int] = typer.Option(
+        None,
+        "--repeat",
+        "-r",
+        min=1,
+        help="Runs of each scenario (default: 3 with --save or --compare, otherwise 1)",
+    ),
+    save: Optional[Path] = typer.Option(
+        None,
+        "--save",
+        help="Write the results, with every sample, to this JSON file",
+        dir_okay=False,
+    ),
+    compare_path: Optional[Path] = typer.Option(
+        None,
+        "--compare",
+        help="Compare against a results file saved with --save, on the same corpus and scenarios",
+        exists=True,
+        dir_okay=False,
+    ),
+    max_slowdown: float = typer.Option(
+        DEFAULT_MAX_SLOWDOWN * 100,
+        "--max-slowdown",
+        min=0,
+        help="Fail --compare when statements/s drop by more than this percentage",
+    ),
+    max_memory_growth: float = typer.Option(
+        DEFAULT_MAX_MEMORY_GROWTH * 100,
+        "--max-memory-growth",
+        min=0,
+        help="Fail --compare when peak RSS grows by more than this percentage",
+    ),
+):
+    """Benchmark ddlcheck on a generated migration corpus.
+
+    Exits with code 1 if --compare finds a regression.
+    """
+    spec = CorpusSpec(
+        files=files,
+        statements=statements,
+        huge_files=huge_files,
+        huge_statements=huge_statements,
+        dump_files=dump_files,
+        dump_rows=dump_rows,
+        seed=seed,
+    )
+    if mix:
+        spec.mix = parse_mix_option(mix)
+    for scenario in scenarios or ():
+        if scenario not in SCENARIOS:
+            raise typer.BadParameter(
+                f"expected one of {', '.join(SCENARIOS)}", param_hint="--scenario"
+            )
+
+    baseline_run = load_bench_baseline(compare_path) if compare_path else None
+    if baseline_run is not None:
+        # Measure exactly what the baseline measured
+        spec = baseline_run.spec
+        scenarios = rerun_scenarios(baseline_run, scenarios)
+    if repeat is None:
+        repeat = 3 if save or compare_path else 1
+
+    run = BenchmarkRun(spec=spec, environment=environment(), samples={})
+    with prepared_corpus(spec, corpus_dir) as (directory, corpus):
+        console.print(
+            f"[bold]Generated {len(corpus)} files with "
+            f"{sum(item.statements for item in corpus)} statements in {directory}[/bold]"
+        )
+        try:
+            run.samples = run_scenarios(
+                scenarios or SCENARIOS, directory, jobs, repeat, err_console.status
+            )
+        except RuntimeError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            raise typer.Exit(code=2)
+
+    display_bench_results(run, repeat)
+    if save:
+        run.save(save)
+        console.print(f"[bold green]Results written to {save}[/bold green]")
+    if baseline_run is not None:
+        exit_for_regressions(
+            baseline_run, run, compare_path, max_slowdown / 100, max_memory_growth / 100
+        )
 
 
 @app.command()
@@ -3,10 +3,7 @@
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-from pglast import parse_sql, prettify
-from pglast.parser import ParseError
+from typing import Any, ClassVar, Dict, FrozenSet, List, Optional
 
 from ddlcheck.models import CheckResult, Config, Issue, SeverityLevel
 
@@ -17,6 +14,16 @@ logger = logging.getLogger(__name__)
 class Check(ABC):
     """Base class for all checks."""
 
+    # Statement node types this check inspects (e.g. ``"IndexStmt"``); the engine only
+    # passes statements of these types to check_statement. None for every statement
+    statement_types: ClassVar[Optional[FrozenSet[str]]] = None
+
+    # Upper-case SQL keywords that must appear in a source for this check to find
+    # anything. No check is run on sources containing none of the keywords of any
+    # active check; they are only parsed to report syntax errors. None if the check
+    # cannot be prefiltered
+    keywords: ClassVar[Optional[FrozenSet[str]]] = None
+
     def __init__(self, config: Optional[Config] = None):
         """Initialize a Check.
 
@@ -118,12 +125,17 @@ class Check(ABC):
     def check_file(self, file_path: Path) -> CheckResult:
         """Check a SQL file for issues.
 
+        This runs only this check; use :class:`ddlcheck.core.engine.Engine` to
+        run several checks over a file with a single parse.
+
         Args:
             file_path: Path to the SQL file to check
 
         Returns:
             Result of the check
         """
+        from ddlcheck.core.engine import Engine
+
         result = CheckResult(file_path)
 
         if not self.enabled:
@@ -132,87 +144,14 @@ class Check(ABC):
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 sql = f.read()
-
-            # Skip empty files
-            if not sql.strip():
-                logger.debug(f"Skipping empty file: {file_path}")
-                return result
-
-            # Parse the SQL into an AST
-            try:
-                # Parse the SQL string
-                parsed = parse_sql(sql)
-
-                # Check each statement
-                for stmt_idx, raw_stmt in enumerate(parsed):
-                    # Skip empty statements (can happen with bare semicolons)
-                    if not raw_stmt or not hasattr(raw_stmt, "stmt"):
-                        logger.debug(f"Skipping empty statement at index {stmt_idx}")
-                        continue
-
-                    # Extract the actual statement from the RawStmt object
-                    # In pglast, RawStmt objects have a 'stmt' attribute
-                    stmt_obj = raw_stmt.stmt
-
-                    # Skip null statements
-                    if stmt_obj is None:
-                        logger.debug(f"Skipping null statement at index {stmt_idx}")
-                        continue
-
-                    # For our check functions, we need to convert the stmt object to a dict
-                    # We'll do this by getting the node type and creating a dict with that type as key
-                    stmt_type = stmt_obj.__class__.__name__
-                    stmt = {stmt_type: stmt_obj}
-
-                    # Get line number by prettifying the SQL up to this statement
-                    # This is a bit of a hack but works for finding approximate line numbers
-                    try:
-                        if stmt_idx > 0:
-                            # Convert the statements to SQL for line counting - one statement at a time
-                            parts = []
-                            for i in range(stmt_idx):
-                                try:
-                                    stmt_sql = prettify(parsed[i])
-                                    parts.append(stmt_sql)
-                                except Exception as e:
-                                    # Skip errors in prettifying
-                                    logger.debug(f"Error prettifying statement {i}: {e}")
-                                    pass
-                            prefix_sql = "\n".join(parts)
-                        else:
-                            prefix_sql = ""
-
-                        line = prefix_sql.count("\n") + 1
-                    except Exception as e:
-                        # If we can't determine the line number, use a default
-                        logger.debug(f"Error determining line number: {e}")
-                        line = 1
-
-                    # Check the statement
-                    try:
-                        issues = self.check_statement(stmt, line)
-                        for issue in issues:
-                            result.add_issue(issue)
-                    except Exception as e:
-                        # If a check fails, log it and continue with other checks
-                        logger.warning(f"Error checking statement at line {line}: {e}")
-                        result.add_issue(
-                            self.create_issue(
-                                message=f"Error checking statement: {str(e)}", line=line
-                            )
-                        )
-
-            except ParseError as e:
-                # If we can't parse the SQL, add an issue
-                result.add_issue(
-                    self.create_issue(
-                        message=f"Failed to parse SQL: {str(e)}",
-                        line=e.location.lineno if hasattr(e, "location") else 1,
-                    )
-                )
-
         except Exception as e:
-            # If we can't open the file or something else goes wrong, add an issue
+            # If we can't open the file, add an issue
             result.add_issue(self.create_issue(message=f"Failed to check file: {str(e)}", line=1))
+            return result
+
+        # Skip empty files
+        if not sql.strip():
+            logger.debug("Skipping empty file: %s", file_path)
+            return result
 
-        return result
+        return Engine([self]).check_sql(sql, file_path)
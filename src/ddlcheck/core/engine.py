@@ -0,0 +1,731 @@
+"""Engine that runs a set of checks over a SQL source, parsing it only once."""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+from ddlcheck import __version__
+from ddlcheck.baseline import Baseline, baseline_path, issue_fingerprint, statement_fingerprint
+from ddlcheck.core.archives import MemberPath
+from ddlcheck.core.check import Check
+from ddlcheck.core.guard import CheckGuard
+from ddlcheck.core.memory import CHECK, MemoryTracker
+from ddlcheck.core.migrations import PYTHON_SUFFIX, Extractor
+from ddlcheck.core.parsing import ParsedSource, parse_statements
+from ddlcheck.core.plpgsql import BODY_STATEMENT_TYPES, embedded_statements
+from ddlcheck.core.profiling import (
+    EXTRACT,
+    FINGERPRINT,
+    LINES,
+    PARSE,
+    PLPGSQL,
+    PREPROCESS,
+    READ,
+    Profiler,
+    clock,
+)
+from ddlcheck.core.psql import Preprocessor, find_includes, has_includes
+from ddlcheck.core.suppression import IGNORE_ALL, SuppressionIndex, find_suppressions
+from ddlcheck.core.tracing import FILE_SPAN, PARSE_SPAN, Span, Tracer
+from ddlcheck.core.utils import get_node_type
+from ddlcheck.history import content_hash
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Check IDs used for problems that are not attributable to a single check
+PARSE_ERROR_ID = "parse_error"
+FILE_ERROR_ID = "file_error"
+INCLUDE_ERROR_ID = "include_error"
+
+# Context manager used for phases and spans when no profiler or tracer is attached
+_UNTIMED = nullcontext()
+
+
+class Engine:
+    """Run several checks over SQL sources.
+
+    Each source is parsed once and every enabled check is run against each of
+    its statements, producing a single :class:`CheckResult` per file.
+
+    The engine also plans the run: checks below the minimum severity are never
+    dispatched, statements only reach the checks that inspect their type, and
+    sources that contain none of the active checks' keywords are only parsed
+    to report syntax errors, without running any check.
+    Checks silenced by a ``ddlcheck:ignore`` comment are never run on the
+    statement, and files with a ``ddlcheck:ignore-file`` comment are skipped.
+
+    Sources are preprocessed as psql scripts first, see
+    :class:`ddlcheck.core.psql.Preprocessor`. The SQL run by DO blocks and
+    function bodies is checked like any other statement, see
+    :mod:`ddlcheck.core.plpgsql`, and so is the SQL of Python migrations,
+    see :mod:`ddlcheck.core.migrations`.
+
+    With a :class:`ddlcheck.core.profiling.Profiler` attached as
+    :attr:`profiler`, every phase and every check is timed, and with a
+    :class:`ddlcheck.core.memory.MemoryTracker` attached as :attr:`memory`,
+    the memory used by each file is recorded. A
+    :class:`ddlcheck.core.tracing.Tracer` attached as :attr:`tracer` records
+    a span for each file, its parsing and its checks. A
+    :class:`ddlcheck.core.guard.CheckGuard` attached as :attr:`guard` holds
+    checks to a time budget and runs untrusted checks in subprocesses.
+    """
+
+    def __init__(
+        self,
+        checks: Sequence[Check],
+        min_severity: Optional[SeverityLevel] = None,
+        baseline: Optional[Baseline] = None,
+        fingerprint_issues: bool = False,
+        variables: Optional[Dict[str, str]] = None,
+        checked_files: Optional[Iterable[Path]] = None,
+        profiler: Optional[Profiler] = None,
+        memory: Optional[MemoryTracker] = None,
+        tracer: Optional[Tracer] = None,
+        guard: Optional[CheckGuard] = None,
+        baseline_root: Optional[Path] = None,
+    ):
+        """Initialize an Engine.
+
+        Args:
+            checks: Check instances to run; disabled checks are dropped
+            min_severity: Only run checks, and report issues, at or above this
+                severity (after severity overrides)
+            baseline: Known issues to suppress
+            fingerprint_issues: Set :attr:`Issue.fingerprint` on every issue,
+                as needed to create a baseline; implied by `baseline`
+            variables: psql variables defined before every source
+            checked_files: Files the run checks in their own right; the SQL of
+                any other file included by a source is checked with it
+            profiler: Profiler timing the phases of each file and each check
+            memory: Tracker recording the memory used by each file
+            tracer: Tracer recording spans for each file
+            guard: Guard enforcing time budgets and isolating checks
+            baseline_root: Directory of the baseline being created, which
+                fingerprinted paths are relative to; taken from `baseline`
+                when one is given
+        """
+        self.min_severity = min_severity
+        self.baseline = baseline
+        self.fingerprint_issues = fingerprint_issues or baseline is not None
+        self.baseline_root = baseline.root if baseline is not None else baseline_root
+        self.preprocessor = Preprocessor(variables, checked_files)
+        self.extractor = Extractor()
+        self.profiler = profiler
+        self.memory = memory
+        self.tracer = tracer
+        self.guard = guard
+        # Runs one check on one statement, through the guard if there is one
+        self._run = self._run_check if guard is None else guard.wrap(self._run_check)
+        self.suppressed = 0
+        # Totals over every source checked, e.g. for metrics
+        self.characters_checked = 0
+        self.statements_parsed = 0
+        self.parse_errors = 0
+        self._suppressed_lock = threading.Lock()
+        self._totals_lock = threading.Lock()
+        self.checks = [
+            check
+            for check in checks
+            if check.enabled and (min_severity is None or check.effective_severity >= min_severity)
+        ]
+
+        skipped = [check.id for check in checks if check not in self.checks]
+        if skipped:
+            logger.debug("Not running disabled or below-threshold checks: %s", ", ".join(skipped))
+
+        # Route statements by node type; checks without declared types see everything
+        self._generic_checks = [check for check in self.checks if check.statement_types is None]
+        self._checks_by_type: Dict[str, List[Check]] = {}
+        for check in self.checks:
+            for stmt_type in check.statement_types or ():
+                self._checks_by_type.setdefault(stmt_type, []).append(check)
+
+        self._keyword_pattern = self._compile_keywords(self.checks)
+
+        # Files unchanged since the baseline was created cannot have new issues,
+        # unless the checks or their options have changed since then
+        self._baseline_files: Dict[str, str] = {}
+        if baseline is not None and baseline.signature == self.fingerprint(False):
+            self._baseline_files = baseline.file_hashes
+
+    @staticmethod
+    def _compile_keywords(checks: Sequence[Check]) -> Optional[Pattern[str]]:
+        """Build a pattern matching any keyword that could produce an issue.
+
+        Args:
+            checks: The active checks
+
+        Returns:
+            Compiled pattern, or None if some check cannot be prefiltered
+        """
+        keywords = set()
+        for check in checks:
+            if check.keywords is None:
+                return None
+            keywords.update(check.keywords)
+        if not keywords:
+            return None
+        alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords))
+        return re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+    def checks_for(self, stmt_type: str) -> List[Check]:
+        """Return the active checks that inspect a statement type.
+
+        Args:
+            stmt_type: Parse node type name, e.g. ``"IndexStmt"``
+
+        Returns:
+            Checks to run on statements of that type
+        """
+        typed = self._checks_by_type.get(stmt_type)
+        if not typed:
+            return self._generic_checks
+        if not self._generic_checks:
+            return typed
+        return [check for check in self.checks if check in typed or check in self._generic_checks]
+
+    def fingerprint(self, include_baseline: bool = True) -> str:
+        """Identify the engine's configuration.
+
+        Two engines with the same fingerprint report the same issues for the
+        same SQL, so stored results can be reused between them.
+
+        Args:
+            include_baseline: Include the baseline the issues are filtered
+                with; baselines themselves record the fingerprint without it
+
+        Returns:
+            Hex digest of the ddlcheck version, minimum severity, psql
+            variables, baseline and the active checks with their severities
+            and options
+        """
+        plan: Dict[str, Any] = {
+            "version": __version__,
+            "min_severity": (self.min_severity or SeverityLevel.INFO).value,
+            "variables": self.preprocessor.variables,
+            "checks": [
+                [
+                    f"{type(check).__module__}.{type(check).__qualname__}",
+                    check.id,
+                    check.effective_severity.value,
+                    check.config.get_check_config(check.id),
+                ]
+                for check in sorted(self.checks, key=lambda check: check.id)
+            ],
+        }
+        if include_baseline and self.baseline is not None:
+            plan["baseline"] = self.baseline.identity
+        encoded = json.dumps(plan, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def needs_checks(self, sql: str) -> bool:
+        """Check whether a source could contain anything the active checks report.
+
+        Args:
+            sql: The SQL source
+
+        Returns:
+            False if no check needs to run on the source's statements
+        """
+        if not self.checks:
+            return False
+        return self._keyword_pattern is None or self._keyword_pattern.search(sql) is not None
+
+    def check_sql(self, sql: str, file_path: Path, file_hash: Optional[str] = None) -> CheckResult:
+        """Check a SQL string with every enabled check.
+
+        Args:
+            sql: The SQL source
+            file_path: Path the SQL was read from, used for reporting
+            file_hash: Cache key of the source, if already computed
+
+        Returns:
+            Result holding the issues from all checks
+        """
+        if self._baseline_unchanged(sql, file_path, file_hash):
+            return CheckResult(file_path)
+        return self._check_sql(sql, file_path, {})
+
+    def check_python(
+        self, source: str, file_path: Path, file_hash: Optional[str] = None
+    ) -> CheckResult:
+        """Check the SQL run by an Alembic or Django migration.
+
+        Args:
+            source: The Python source of the migration
+            file_path: Path the source was read from, used for reporting
+            file_hash: Cache key of the source, if already computed
+
+        Returns:
+            Result holding the issues from all checks, on lines of the source
+        """
+        result = CheckResult(file_path)
+        if not self.checks or self._baseline_unchanged(source, file_path, file_hash):
+            return result
+
+        seen: Dict[str, int] = {}
+        with self.phase(EXTRACT):
+            fragments = self.extractor.extract(source)
+        for fragment in fragments:
+            for issue in self._check_sql(fragment.sql, file_path, seen).issues:
+                fragment.locate(issue)
+                result.issues.append(issue)
+        return result
+
+    def check_source(
+        self, source: str, file_path: Path, file_hash: Optional[str] = None
+    ) -> CheckResult:
+        """Check a file's contents, as SQL or as a Python migration by its suffix.
+
+        Args:
+            source: Contents of the file
+            file_path: Path the contents were read from
+            file_hash: Cache key of the contents, if already computed
+
+        Returns:
+            Result holding the issues from all checks
+        """
+        with self._totals_lock:
+            self.characters_checked += len(source)
+        check = self.check_python if file_path.suffix == PYTHON_SUFFIX else self.check_sql
+        if self.profiler is None and self.memory is None and self.tracer is None:
+            return check(source, file_path, file_hash)
+        attributes = {"code.filepath": file_path.as_posix(), "ddlcheck.characters": len(source)}
+        with self.span(FILE_SPAN, **attributes) as span:
+            memory_before = self.memory.file_started() if self.memory is not None else 0
+            start = clock()
+            result = check(source, file_path, file_hash)
+            if self.profiler is not None:
+                self.profiler.add_file(file_path.as_posix(), clock() - start)
+            if self.memory is not None:
+                self.memory.file_finished(file_path, len(source), memory_before)
+                if self.memory.watches(file_path):
+                    self.memory.snapshot(CHECK, file_path)
+            if span is not None:
+                span.attributes["ddlcheck.issues"] = len(result.issues)
+        return result
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Time the body of a ``with`` block as a phase, if a profiler is attached.
+
+        Args:
+            name: Name of the phase, see :data:`ddlcheck.core.profiling.PHASES`
+
+        Returns:
+            Context manager timing the block, or doing nothing without a profiler
+        """
+        return _UNTIMED if self.profiler is None else self.profiler.phase(name)
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Optional[Span]]:
+        """Record the body of a ``with`` block as a span, if a tracer is attached.
+
+        Args:
+            name: Name of the span
+            **attributes: Attributes of the span
+
+        Returns:
+            Context manager yielding the open span, or None without a tracer
+        """
+        return _UNTIMED if self.tracer is None else self.tracer.span(name, **attributes)
+
+    def _baseline_unchanged(
+        self, source: str, file_path: Path, file_hash: Optional[str] = None
+    ) -> bool:
+        """Return True if a file is unchanged since the baseline was created."""
+        if not self._baseline_files:
+            return False
+        known_hash = self._baseline_files.get(baseline_path(file_path, self.baseline_root))
+        if known_hash is None or has_includes(source):
+            # Scripts that include other files can change without changing
+            return False
+        return known_hash == (file_hash or content_hash(source))
+
+    def _check_sql(self, sql: str, file_path: Path, seen: Dict[str, int]) -> CheckResult:
+        """Check a SQL string with every enabled check.
+
+        Args:
+            sql: The SQL source
+            file_path: Path the SQL was read from, used for reporting
+            seen: Occurrences of each baseline fingerprint already matched in
+                the file; updated in place
+
+        Returns:
+            Result holding the issues from all checks
+        """
+        result = CheckResult(file_path)
+
+        if not sql.strip():
+            return result
+        suppressions = find_suppressions(sql)
+        if suppressions is not None and suppressions.ignore_file:
+            logger.debug("Skipping %s: ddlcheck:ignore-file", file_path)
+            return result
+
+        parsed = self._parse(sql, file_path)
+        # Parse errors are reported either way, but the checks can only find
+        # something if one of their keywords occurs, e.g. after interpolation
+        if self.needs_checks(parsed.sql):
+            result.issues.extend(self._check_statements(parsed, suppressions, file_path, seen))
+        errors = self._source_errors(parsed, file_path, seen)
+        if errors:
+            result.issues.extend(errors)
+            # Report parse errors in source order along with the other issues
+            result.issues.sort(key=lambda issue: issue.line)
+
+        if self.min_severity is not None:
+            result.issues = [
+                issue for issue in result.issues if issue.severity >= self.min_severity
+            ]
+
+        return result
+
+    def _parse(self, sql: str, file_path: Path) -> ParsedSource:
+        """Preprocess and parse a SQL string, counting its statements and errors.
+
+        Args:
+            sql: The SQL source
+            file_path: Path the SQL was read from, used to resolve includes
+
+        Returns:
+            The parsed source
+        """
+        with self.span(PARSE_SPAN) as span:
+            with self.phase(PREPROCESS):
+                script = self.preprocessor.process(sql, file_path)
+            with self.phase(PARSE):
+                parsed = parse_statements(script.sql, sql, script.offsets)
+            if span is not None:
+                span.attributes["ddlcheck.statements"] = len(parsed.statements)
+                span.attributes["ddlcheck.parse_errors"] = len(parsed.errors)
+        if self.memory is not None and self.memory.watches(file_path):
+            self.memory.snapshot(PARSE, file_path)
+        with self._totals_lock:
+            self.statements_parsed += len(parsed.statements)
+            self.parse_errors += len(parsed.errors)
+        return parsed
+
+    def _check_statements(
+        self,
+        parsed: ParsedSource,
+        suppressions: Optional[SuppressionIndex],
+        file_path: Path,
+        seen: Dict[str, int],
+    ) -> List[Issue]:
+        """Run the checks on every parsed statement that is not suppressed.
+
+        Args:
+            parsed: The parsed source
+            suppressions: Suppression comments of the source, if it has any
+            file_path: Path of the file the statements are in
+            seen: Occurrences of each fingerprint already matched in the file;
+                updated in place
+
+        Returns:
+            The issues found, after baseline filtering
+        """
+        issues: List[Issue] = []
+        previous_end = 0
+        checks_span = _UNTIMED if self.tracer is None else self.tracer.checks()
+        with checks_span as span:
+            for stmt, start, end in parsed.statements:
+                ignored: FrozenSet[str] = frozenset()
+                if suppressions is not None:
+                    original_end = parsed.original(end)
+                    ignored = suppressions.for_statement(
+                        previous_end, parsed.original(start), original_end
+                    )
+                    previous_end = original_end
+                    if IGNORE_ALL in ignored:
+                        continue
+
+                line, column = self._position(parsed, start)
+                statement_sql = parsed.sql[start:end]
+                issues.extend(
+                    self._check_statement(
+                        stmt, statement_sql, line, column, ignored, file_path, seen
+                    )
+                )
+                issues.extend(
+                    self._check_embedded(stmt, statement_sql, line, ignored, file_path, seen)
+                )
+            if span is not None:
+                span.attributes["ddlcheck.issues"] = len(issues)
+        return issues
+
+    def _position(self, parsed: ParsedSource, offset: int) -> Tuple[int, int]:
+        """Return the line and column of an offset, timed as a phase if profiling."""
+        if self.profiler is None:
+            return parsed.position(offset)
+        start = clock()
+        position = parsed.position(offset)
+        self.profiler.add_phase(LINES, clock() - start)
+        return position
+
+    def _check_embedded(
+        self,
+        stmt: Dict[str, Any],
+        statement_sql: str,
+        line: int,
+        ignored: FrozenSet[str],
+        file_path: Path,
+        seen: Dict[str, int],
+    ) -> List[Issue]:
+        """Run the checks on the SQL embedded in a DO block or function body.
+
+        Args:
+            stmt: The parsed statement
+            statement_sql: Source text of the statement
+            line: Line where the statement begins
+            ignored: IDs of checks suppressed for the statement
+            file_path: Path of the file the statement is in
+            seen: Occurrences of each fingerprint already matched in the file;
+                updated in place
+
+        Returns:
+            The issues found, after baseline filtering
+        """
+        if get_node_type(stmt) not in BODY_STATEMENT_TYPES:
+            return []
+        with self.phase(PLPGSQL):
+            embedded = embedded_statements(stmt, statement_sql, self._keyword_pattern)
+        issues: List[Issue] = []
+        for node, line_offset, embedded_sql in embedded:
+            issues.extend(
+                self._check_statement(
+                    node, embedded_sql, line + line_offset, None, ignored, file_path, seen
+                )
+            )
+        return issues
+
+    def _source_errors(
+        self, parsed: ParsedSource, file_path: Path, seen: Dict[str, int]
+    ) -> List[Issue]:
+        """Build the issues reported for SQL that could not be checked.
+
+        That is statements that failed to parse and, in archive members,
+        includes, which are not followed.
+
+        Args:
+            parsed: The parsed source
+            file_path: Path of the file the statements are in
+            seen: Occurrences of each fingerprint already matched in the file;
+                updated in place
+
+        Returns:
+            The issues, after baseline filtering
+        """
+        errors = [
+            (PARSE_ERROR_ID, f"Failed to parse SQL: {error}", parsed.position(offset))
+            for offset, error in parsed.errors
+        ]
+        if isinstance(file_path, MemberPath):
+            errors.extend(
+                (
+                    INCLUDE_ERROR_ID,
+                    f"Includes are not followed in archive members: {command}",
+                    parsed.source_position(offset),
+                )
+                for offset, command in find_includes(parsed.source)
+            )
+
+        issues: List[Issue] = []
+        for check_id, message, (line, column) in errors:
+            issue = Issue(
+                check_id=check_id,
+                message=message,
+                line=line,
+                severity=SeverityLevel.HIGH,
+                column=column,
+            )
+            if self.fingerprint_issues:
+                issues.extend(self._fingerprint([issue], message, file_path, seen, parse=False))
+            else:
+                issues.append(issue)
+        return issues
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        """Read and check a SQL file.
+
+        Args:
+            file_path: Path to the SQL file
+
+        Returns:
+            Result holding the issues from all checks
+        """
+        try:
+            with self.phase(READ):
+                sql = file_path.read_text(encoding="utf-8")
+        except Exception as e:
+            return self.file_error(file_path, e)
+        return self.check_source(sql, file_path)
+
+    @staticmethod
+    def file_error(file_path: Path, error: Exception) -> CheckResult:
+        """Build the result reported for a file that could not be read.
+
+        Args:
+            file_path: Path to the SQL file
+            error: The error raised while reading it
+
+        Returns:
+            Result holding a single file error issue
+        """
+        return CheckResult(
+            file_path,
+            [
+                Issue(
+                    check_id=FILE_ERROR_ID,
+                    message=f"Failed to check file: {error}",
+                    line=1,
+                    severity=SeverityLevel.HIGH,
+                )
+            ],
+        )
+
+    def _check_statement(
+        self,
+        stmt: Dict[str, Any],
+        statement_sql: str,
+        line: int,
+        column: Optional[int],
+        ignored: FrozenSet[str],
+        file_path: Path,
+        seen: Dict[str, int],
+    ) -> List[Issue]:
+        """Run the checks that inspect a statement's type on it.
+
+        Args:
+            stmt: The parsed statement
+            statement_sql: Source text of the statement
+            line: Line where the statement begins
+            column: Column where the statement begins, if known
+            ignored: IDs of checks suppressed for the statement
+            file_path: Path of the file the statement is in
+            seen: Occurrences of each fingerprint already matched in the file;
+                updated in place
+
+        Returns:
+            The issues found, after baseline filtering
+        """
+        checks = self.checks_for(get_node_type(stmt))
+        if ignored:
+            checks = [check for check in checks if check.id not in ignored]
+
+        issues = self._run_checks(checks, stmt, line, file_path)
+        for issue in issues:
+            if issue.column is None and issue.line == line:
+                issue.column = column
+        if issues and self.fingerprint_issues:
+            with self.phase(FINGERPRINT):
+                issues = self._fingerprint(issues, statement_sql, file_path, seen)
+        return issues
+
+    def _run_checks(
+        self, checks: List[Check], stmt: Dict[str, Any], line: int, file_path: Path
+    ) -> List[Issue]:
+        """Run checks on a statement, timing each if a profiler or tracer is attached.
+
+        Args:
+            checks: The checks to run
+            stmt: The parsed statement
+            line: Line where the statement begins
+            file_path: Path of the file the statement is in
+
+        Returns:
+            The issues found
+        """
+        issues: List[Issue] = []
+        profiler, tracer, run_check = self.profiler, self.tracer, self._run
+        if profiler is None and tracer is None:
+            for check in checks:
+                issues.extend(run_check(check, stmt, line))
+            return issues
+
+        statement_start = check_start = clock()
+        for check in checks:
+            issues.extend(run_check(check, stmt, line))
+            check_end = clock()
+            if profiler is not None:
+                profiler.add_check(check.id, check_end - check_start)
+            if tracer is not None:
+                tracer.add_check(check.id, check_end - check_start)
+            check_start = check_end
+        if profiler is not None:
+            label = f"{file_path.as_posix()}:{line}"
+            profiler.add_statement(label, check_start - statement_start)
+        return issues
+
+    def _fingerprint(
+        self,
+        issues: List[Issue],
+        statement: str,
+        file_path: Path,
+        seen: Dict[str, int],
+        parse: bool = True,
+    ) -> List[Issue]:
+        """Fingerprint a statement's issues and drop those in the baseline.
+
+        Args:
+            issues: Issues found in the statement
+            statement: Source text of the statement
+            file_path: Path of the file the statement is in
+            seen: Occurrences of each fingerprint already matched in the file;
+                updated in place
+            parse: Whether `statement` is SQL to fingerprint with pglast, rather
+                than text that identifies the issue as it is
+
+        Returns:
+            The issues that are not in the baseline
+        """
+        statement_key = statement_fingerprint(statement) if parse else statement
+        path = baseline_path(file_path, self.baseline_root)
+        new = []
+        for issue in issues:
+            fingerprint = issue_fingerprint(issue.check_id, statement_key, path)
+            issue.fingerprint = fingerprint
+            if self.baseline is None:
+                new.append(issue)
+                continue
+            seen[fingerprint] = occurrence = seen.get(fingerprint, 0) + 1
+            if occurrence > self.baseline.count(fingerprint):
+                new.append(issue)
+        if len(new) < len(issues):
+            with self._suppressed_lock:
+                self.suppressed += len(issues) - len(new)
+        return new
+
+    @staticmethod
+    def _run_check(check: Check, stmt: Dict[str, Any], line: int) -> List[Issue]:
+        """Run one check on one statement, turning errors into issues.
+
+        Args:
+            check: The check to run
+            stmt: The parsed SQL statement
+            line: The line number where the statement begins
+
+        Returns:
+            List of issues found in the statement
+        """
+        try:
+            return check.check_statement(stmt, line)
+        except Exception as e:
+            logger.warning("Error running %s on statement at line %d: %s", check.id, line, e)
+            return [check.create_issue(message=f"Error checking statement: {e}", line=line)]
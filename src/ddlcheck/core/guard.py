@@ -0,0 +1,319 @@
+"""Time budgets for checks, and isolation of untrusted checks in subprocesses.
+
+A :class:`CheckGuard` attached to an :class:`ddlcheck.core.engine.Engine`
+wraps every call to a check's ``check_statement``:
+
+* With a time budget, each call is timed and calls over the budget are
+  counted. A thread cannot be interrupted, so an in-process call always runs
+  to completion, but a check that goes over its budget
+  :data:`MAX_OVERRUNS` times is skipped for the rest of the run, so one
+  pathological check cannot stall a long run statement after statement.
+* Isolated checks run in worker processes instead. A call that outlives the
+  budget (or :data:`DEFAULT_TIMEOUT` without one) has its process killed
+  without affecting the other checks: the statement is reported as not
+  checked by that check and the next call starts a fresh process. A check
+  that crashes its process is reported the same way. The budget only covers
+  the call itself: a new worker first reports that it has imported the
+  checks, and starting it may take up to :data:`START_TIMEOUT`.
+
+Worker processes are started with ``spawn``, so isolated checks must be
+importable, like the checks of a custom entry point script are.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from ddlcheck.core.check import Check
+from ddlcheck.models import Issue
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Calls over budget after which an in-process check is skipped
+MAX_OVERRUNS = 3
+
+# Seconds an isolated call may take without a budget
+DEFAULT_TIMEOUT = 10.0
+
+# Seconds a worker process may take to start and import the isolated checks
+START_TIMEOUT = 60.0
+
+# Seconds to wait for a worker process to exit before killing it
+_STOP_TIMEOUT = 1.0
+
+RunCheck = Callable[[Check, Dict[str, Any], int], List[Issue]]
+
+
+@dataclass
+class CheckStats:
+    """How a check fared against its budget."""
+
+    check_id: str
+    calls: int = 0
+    # Calls that took longer than the budget, including timed out calls
+    overruns: int = 0
+    timeouts: int = 0
+    crashes: int = 0
+    # Calls not made because the check was skipped after too many overruns
+    skipped: int = 0
+    slowest_ms: float = 0.0
+
+    @property
+    def troubled(self) -> bool:
+        """Return True if the check went over budget, crashed or was skipped."""
+        return bool(self.overruns or self.crashes or self.skipped)
+
+
+def _serve(connection: Connection, checks: Dict[str, Check]) -> None:
+    """Run the checks asked for over a connection until it is closed.
+
+    Args:
+        connection: Connection to the parent process
+        checks: The isolated checks by ID
+    """
+    # The checks were imported along with the arguments; calls can be timed from here
+    connection.send(("ready", None))
+    while True:
+        try:
+            check_id, stmt, line = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            issues = checks[check_id].check_statement(stmt, line)
+            connection.send(("ok", issues))
+        except Exception as e:
+            connection.send(("error", str(e)))
+
+
+class _Worker:
+    """A process running isolated checks."""
+
+    def __init__(self, context: Any, checks: Dict[str, Check], start_timeout: float):
+        """Start a worker process and wait until it is ready for calls.
+
+        Args:
+            context: multiprocessing context to start the process with
+            checks: The isolated checks by ID
+            start_timeout: Seconds to wait for the process to import the checks
+        """
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, checks), name="ddlcheck-isolated", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.ready = self._handshake(start_timeout)
+
+    def _handshake(self, timeout: float) -> bool:
+        """Wait for the process to report that it is ready.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            False if the process exited or did not report in time
+        """
+        try:
+            return self.connection.poll(timeout) and self.connection.recv() == ("ready", None)
+        except (EOFError, OSError):
+            return False
+
+    def call(
+        self, check_id: str, stmt: Dict[str, Any], line: int, timeout: float
+    ) -> Tuple[str, Any]:
+        """Run a check on a statement.
+
+        Args:
+            check_id: ID of the check
+            stmt: The parsed statement
+            line: Line where the statement begins
+            timeout: Seconds to wait for the result
+
+        Returns:
+            ``("ok", issues)``, ``("error", message)`` if the check raised,
+            ``("timeout", None)``, ``("crash", exit code)`` or, if the
+            process never became ready, ``("start", exit code)``
+        """
+        if not self.ready:
+            return "start", self.process.exitcode
+        try:
+            self.connection.send((check_id, stmt, line))
+            if not self.connection.poll(timeout):
+                return "timeout", None
+            return self.connection.recv()
+        except (EOFError, OSError):
+            self.process.join(_STOP_TIMEOUT)
+            return "crash", self.process.exitcode
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the process, killing it if asked to or if it does not exit."""
+        self.connection.close()
+        if kill:
+            self.process.kill()
+        self.process.join(_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class CheckGuard:
+    """Enforce time budgets on checks and run some of them in subprocesses."""
+
+    def __init__(
+        self,
+        budget_ms: Optional[float] = None,
+        isolated: Sequence[Check] = (),
+        max_overruns: int = MAX_OVERRUNS,
+        start_timeout: float = START_TIMEOUT,
+    ):
+        """Initialize a CheckGuard.
+
+        Args:
+            budget_ms: Milliseconds a check may spend on one statement, or
+                None for no budget
+            isolated: Checks to run in worker processes
+            max_overruns: Calls over budget after which an in-process check is
+                skipped for the rest of the run
+            start_timeout: Seconds a worker process may take to start, on top
+                of the budget of its first call
+        """
+        self.budget_ms = budget_ms
+        self.max_overruns = max_overruns
+        self.start_timeout = start_timeout
+        self.isolated = {check.id: check for check in isolated}
+        self.stats: Dict[str, CheckStats] = {}
+        self._budget_ns = int(budget_ms * 1e6) if budget_ms is not None else None
+        self._timeout = budget_ms / 1000 if budget_ms is not None else DEFAULT_TIMEOUT
+        self._skipped: Set[str] = set()
+        self._lock = threading.Lock()
+        # Idle worker processes; each thread checking files uses at most one at a time
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._workers: List[_Worker] = []
+        self._context = multiprocessing.get_context("spawn")
+
+    def wrap(self, run_check: RunCheck) -> RunCheck:
+        """Guard a function running a check on a statement.
+
+        Args:
+            run_check: Function running a check in process, turning errors
+                into issues
+
+        Returns:
+            Function with the same signature that enforces the budget, or
+            runs isolated checks in a worker process
+        """
+
+        def guarded(check: Check, stmt: Dict[str, Any], line: int) -> List[Issue]:
+            if check.id in self._skipped:
+                self._count(check.id, skipped=1)
+                return []
+            if check.id in self.isolated:
+                return self._run_isolated(check, stmt, line)
+            start = time.perf_counter_ns()
+            issues = run_check(check, stmt, line)
+            self._record(check, time.perf_counter_ns() - start, line)
+            return issues
+
+        return guarded
+
+    def _stats(self, check_id: str) -> CheckStats:
+        """Return the statistics of a check, creating them on first use."""
+        stats = self.stats.get(check_id)
+        if stats is None:
+            stats = self.stats[check_id] = CheckStats(check_id)
+        return stats
+
+    def _count(self, check_id: str, **counts: int) -> None:
+        """Add to a check's counters."""
+        with self._lock:
+            stats = self._stats(check_id)
+            for name, value in counts.items():
+                setattr(stats, name, getattr(stats, name) + value)
+
+    def _record(self, check: Check, ns: int, line: int, isolated: bool = False) -> None:
+        """Record a call and skip the check if it is over budget too often."""
+        over = self._budget_ns is not None and ns > self._budget_ns
+        with self._lock:
+            stats = self._stats(check.id)
+            stats.calls += 1
+            stats.slowest_ms = max(stats.slowest_ms, ns / 1e6)
+            if not over:
+                return
+            stats.overruns += 1
+            skip = not isolated and stats.overruns >= self.max_overruns
+            if skip:
+                self._skipped.add(check.id)
+        logger.warning(
+            "Check %s took %.0f ms on the statement at line %d, over its %g ms budget",
+            check.id,
+            ns / 1e6,
+            line,
+            self.budget_ms,
+        )
+        if skip:
+            logger.warning(
+                "Skipping check %s for the rest of the run after %d calls over budget",
+                check.id,
+                self.max_overruns,
+            )
+
+    def _run_isolated(self, check: Check, stmt: Dict[str, Any], line: int) -> List[Issue]:
+        """Run a check in a worker process, killing it if it takes too long."""
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = _Worker(self._context, self.isolated, self.start_timeout)
+            with self._lock:
+                self._workers.append(worker)
+        start = time.perf_counter_ns()
+        status, value = worker.call(check.id, stmt, line, self._timeout)
+        elapsed = time.perf_counter_ns() - start
+        if status in ("ok", "error"):
+            self._idle.put(worker)
+            self._record(check, elapsed, line, isolated=True)
+            if status == "ok":
+                return value
+            logger.warning("Error running %s on statement at line %d: %s", check.id, line, value)
+            return [check.create_issue(message=f"Error checking statement: {value}", line=line)]
+
+        worker.stop(kill=True)
+        with self._lock:
+            self._workers.remove(worker)
+        if status == "timeout":
+            self._count(check.id, calls=1, overruns=1, timeouts=1)
+            message = f"Check timed out after {self._timeout * 1000:g} ms and was stopped"
+        elif status == "start":
+            self._count(check.id, calls=1, crashes=1)
+            message = "Worker process failed to start"
+        else:
+            self._count(check.id, calls=1, crashes=1)
+            message = f"Check crashed its worker process (exit code {value})"
+        with self._lock:
+            stats = self._stats(check.id)
+            stats.slowest_ms = max(stats.slowest_ms, elapsed / 1e6)
+        logger.warning("%s: %s, on the statement at line %d", check.id, message, line)
+        return [check.create_issue(message=f"Statement not checked: {message}", line=line)]
+
+    def report(self) -> List[CheckStats]:
+        """Return the statistics of the checks that went over budget, crashed or were skipped.
+
+        Returns:
+            Statistics, most overruns first
+        """
+        with self._lock:
+            stats = [stats for stats in self.stats.values() if stats.troubled]
+        return sorted(stats, key=lambda stats: (-stats.overruns - stats.crashes, stats.check_id))
+
+    def close(self) -> None:
+        """Stop every worker process."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+        self._idle = queue.LifoQueue()
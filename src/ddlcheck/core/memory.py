@@ -0,0 +1,269 @@
+"""Memory accounting of a run with :mod:`tracemalloc`.
+
+A :class:`MemoryTracker` attached to an :class:`ddlcheck.core.engine.Engine`
+records, for every file, the peak of the memory traced while checking it and
+the process's peak RSS afterwards. It also takes snapshots at the boundaries
+of a run's phases: after discovering the files, after parsing and after
+checking each of the largest files, and before the report is finished. Each
+snapshot keeps the top allocation sites, which shows whether memory goes to
+pglast's parse trees, to ddlcheck's own results or elsewhere.
+
+Traced peaks are process-wide, so files are only attributed their own
+memory when they are checked one at a time.
+"""
+
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Snapshot labels besides the profiling phases PARSE and REPORT, which are shared
+DISCOVERY = "discovery"
+CHECK = "check"
+
+# Frames kept per traced allocation
+TRACEBACK_FRAMES = 1
+
+# Files snapshotted after parse and check, and files listed by peak memory
+LARGEST_FILES = 3
+TOP_FILES = 10
+
+# Allocation sites kept per snapshot
+TOP_SITES = 10
+
+_MB = 1024 * 1024
+
+# tracemalloc.reset_peak is new in Python 3.9; without it peaks cover the whole run
+_reset_peak = getattr(tracemalloc, "reset_peak", lambda: None)
+
+# Files whose allocations are not reported: tracemalloc's own and the import system's
+_IGNORED_FILES = frozenset(
+    {
+        tracemalloc.__file__,
+        "<frozen importlib._bootstrap>",
+        "<frozen importlib._bootstrap_external>",
+        "<unknown>",
+    }
+)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process.
+
+    Returns:
+        Peak RSS in megabytes, or None where the platform cannot report it
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / _MB if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class AllocationSite:
+    """Memory allocated by one line of code and still alive at a snapshot."""
+
+    location: str
+    size_mb: float
+    count: int
+
+
+@dataclass
+class Snapshot:
+    """Memory in use at a phase boundary."""
+
+    phase: str
+    # File being checked, for per-file phases
+    file: Optional[str]
+    traced_mb: float
+    peak_traced_mb: float
+    peak_rss_mb: Optional[float]
+    sites: List[AllocationSite] = field(default_factory=list)
+
+
+@dataclass
+class FileMemory:
+    """Memory used while checking one file."""
+
+    file: str
+    size_bytes: int
+    # Peak traced memory while the file was checked, above what was in use before
+    peak_traced_mb: float
+    peak_rss_mb: Optional[float]
+
+
+@dataclass
+class MemoryReport:
+    """Where the memory of a run went."""
+
+    snapshots: List[Snapshot]
+    files: List[FileMemory]
+    peak_traced_mb: float
+    peak_rss_mb: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a JSON-serializable dict."""
+        return {
+            "peak_traced_mb": self.peak_traced_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "snapshots": [
+                {**vars(snapshot), "sites": [vars(site) for site in snapshot.sites]}
+                for snapshot in self.snapshots
+            ],
+            "files": [vars(memory) for memory in self.files],
+        }
+
+
+class MemoryTracker:
+    """Trace allocations and take snapshots at phase boundaries."""
+
+    def __init__(self, largest_files: int = LARGEST_FILES):
+        """Initialize a MemoryTracker.
+
+        Args:
+            largest_files: Number of files, largest first, that are
+                snapshotted after parsing and after checking
+        """
+        self.largest_files = largest_files
+        self.snapshots: List[Snapshot] = []
+        self._watched: Set[str] = set()
+        # Min-heap of (peak traced bytes, order, file) for the files using the most memory
+        self._files: List[Tuple[int, int, FileMemory]] = []
+        self._order = itertools.count()
+        # Highest traced memory seen, since the traced peak is reset for each file
+        self._peak = 0
+        # Traced peak of the current file before its last snapshot, which
+        # resets the peak so the snapshot's own allocations are not counted
+        self._carried = 0
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start tracing allocations, unless they are already traced."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing allocations, if :meth:`start` started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        """Pick the largest files to snapshot after parsing and checking.
+
+        Args:
+            paths: Paths of the files that will be checked
+        """
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append((path.stat().st_size, path.as_posix()))
+            except OSError:
+                continue
+        self._watched = {name for _, name in heapq.nlargest(self.largest_files, sizes)}
+
+    def watches(self, file_path: Path) -> bool:
+        """Return True if a file is snapshotted after parsing and checking."""
+        return file_path.as_posix() in self._watched
+
+    def snapshot(self, phase: str, file_path: Optional[Path] = None) -> None:
+        """Record the memory in use and its top allocation sites.
+
+        Args:
+            phase: Phase that just ended
+            file_path: File the phase belongs to, for per-file phases
+        """
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        # Filtering the grouped statistics is much faster than filtering traces
+        statistics = (
+            stat
+            for stat in tracemalloc.take_snapshot().statistics("lineno")
+            if stat.traceback[0].filename not in _IGNORED_FILES
+        )
+        sites = [
+            AllocationSite(
+                location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                size_mb=stat.size / _MB,
+                count=stat.count,
+            )
+            for stat in itertools.islice(statistics, TOP_SITES)
+        ]
+        snapshot = Snapshot(
+            phase=phase,
+            file=file_path.as_posix() if file_path is not None else None,
+            traced_mb=current / _MB,
+            peak_traced_mb=peak / _MB,
+            peak_rss_mb=peak_rss_mb(),
+            sites=sites,
+        )
+        with self._lock:
+            self.snapshots.append(snapshot)
+            self._carried = max(self._carried, peak)
+        _reset_peak()
+
+    def file_started(self) -> int:
+        """Reset the traced peak before a file is checked.
+
+        Returns:
+            Traced memory in use before the file, to pass to :meth:`file_finished`
+        """
+        if not tracemalloc.is_tracing():
+            return 0
+        _reset_peak()
+        with self._lock:
+            self._carried = 0
+        return tracemalloc.get_traced_memory()[0]
+
+    def file_finished(self, file_path: Path, size: int, baseline: int) -> None:
+        """Record the memory used while checking a file.
+
+        Args:
+            file_path: Path of the file
+            size: Size of the file's contents in characters
+            baseline: Value returned by :meth:`file_started`
+        """
+        if not tracemalloc.is_tracing():
+            return
+        with self._lock:
+            traced_peak = max(tracemalloc.get_traced_memory()[1], self._carried)
+            peak = max(0, traced_peak - baseline)
+            memory = FileMemory(file_path.as_posix(), size, peak / _MB, peak_rss_mb())
+            self._peak = max(self._peak, traced_peak)
+            item = (peak, next(self._order), memory)
+            if len(self._files) < TOP_FILES:
+                heapq.heappush(self._files, item)
+            elif peak > self._files[0][0]:
+                heapq.heapreplace(self._files, item)
+
+    def report(self) -> MemoryReport:
+        """Summarize the snapshots and the files using the most memory.
+
+        Returns:
+            The memory report
+        """
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        with self._lock:
+            peak = max(peak, self._peak)
+            files = [memory for _, _, memory in sorted(self._files, reverse=True)]
+            snapshots = list(self.snapshots)
+        return MemoryReport(
+            snapshots=snapshots,
+            files=files,
+            peak_traced_mb=max([peak / _MB] + [s.peak_traced_mb for s in snapshots]),
+            peak_rss_mb=peak_rss_mb(),
+        )
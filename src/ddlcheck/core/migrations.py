@@ -0,0 +1,238 @@
+"""SQL embedded in Python migration files.
+
+Alembic migrations run SQL with ``op.execute(...)`` and Django migrations
+with ``migrations.RunSQL(...)``. :class:`Extractor` finds the string literals
+passed to them with the standard :mod:`ast` module, so they can be checked
+like ``.sql`` files, and remembers where each one is in the Python source so
+issues are reported on the right line.
+
+Strings are recognized when they are literals, possibly wrapped in
+``text()``/``sa.text()`` or ``textwrap.dedent()``, concatenated with ``+``,
+or, for ``RunSQL``, listed in a list or tuple. Anything computed at run time
+(f-strings, variables) is skipped. ``RunSQL``'s ``reverse_sql`` is not
+checked, since it only runs when a migration is rolled back.
+
+Extraction only depends on the file contents, so results are memoized by
+content hash, and can be kept between runs in a :class:`ExtractionCache`
+such as :class:`ddlcheck.history.HistoryStore`.
+"""
+
+import ast
+import logging
+import re
+import textwrap
+import threading
+from typing import Dict, List, NamedTuple, Optional, Protocol
+
+from ddlcheck.history import content_hash
+from ddlcheck.models import Issue
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# File suffix of Python migrations
+PYTHON_SUFFIX = ".py"
+
+# Sources without any of these names cannot contain migration SQL
+_MARKERS = re.compile(r"\b(?:execute|RunSQL)\b")
+_STRING_PREFIX = re.compile(r"[rRbBuU]*")
+_WRAPPERS = frozenset({"text", "dedent"})
+
+
+class SQLFragment(NamedTuple):
+    """A SQL string found in a Python source."""
+
+    sql: str
+    # Line where the string's contents start
+    line: int
+    # Column where the string's contents start, if the string is verbatim
+    column: Optional[int]
+    # Whether lines of the SQL are lines of the source, so issue lines can be
+    # mapped; otherwise every issue is reported on `line`
+    multiline: bool
+
+    def locate(self, issue: Issue) -> None:
+        """Move an issue from a line of the SQL to a line of the Python source.
+
+        Args:
+            issue: Issue found in the fragment's SQL; updated in place
+        """
+        first_line = issue.line == 1
+        if self.multiline:
+            issue.line = self.line + issue.line - 1
+        else:
+            issue.line = self.line
+        if issue.column is not None:
+            if self.column is None or not self.multiline:
+                issue.column = None
+            elif first_line:
+                issue.column = self.column + issue.column - 1
+
+
+class ExtractionCache(Protocol):
+    """Where extracted fragments are kept between runs."""
+
+    def get_fragments(self, file_hash: str) -> Optional[List[SQLFragment]]:
+        """Return the fragments extracted from file contents, if known."""
+
+    def put_fragments(self, file_hash: str, fragments: List[SQLFragment]) -> None:
+        """Remember the fragments extracted from file contents."""
+
+
+def _is_call_to(node: ast.Call, name: str) -> bool:
+    """Return True if a call is to `name`, as a bare name or an attribute."""
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr == name
+    return isinstance(func, ast.Name) and func.id == name
+
+
+def _is_alembic_execute(node: ast.Call) -> bool:
+    """Return True for ``op.execute(...)``."""
+    func = node.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "execute"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "op"
+    )
+
+
+def _argument(node: ast.Call, position: int, keyword: str) -> Optional[ast.expr]:
+    """Return a call argument given by position or keyword."""
+    if len(node.args) > position:
+        return node.args[position]
+    for kw in node.keywords:
+        if kw.arg == keyword:
+            return kw.value
+    return None
+
+
+def _fragment(source: str, node: ast.expr) -> Optional[SQLFragment]:
+    """Evaluate a string expression and locate it in the source.
+
+    Args:
+        source: The Python source
+        node: Expression passed as SQL
+
+    Returns:
+        The fragment, or None if the string is only known at run time
+    """
+    if isinstance(node, ast.Call) and len(node.args) == 1 and not node.keywords:
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else None
+        name = node.func.id if isinstance(node.func, ast.Name) else name
+        if name in _WRAPPERS:
+            inner = _fragment(source, node.args[0])
+            if inner is None or name != "dedent":
+                return inner
+            dedented = textwrap.dedent(inner.sql)
+            if dedented == inner.sql:
+                return inner
+            # Lines stay where they were, but columns move
+            return inner._replace(sql=dedented, column=None)
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _fragment(source, node.left), _fragment(source, node.right)
+        if left is None or right is None:
+            return None
+        return SQLFragment(left.sql + right.sql, left.line, None, False)
+
+    if not isinstance(node, ast.Constant) or not isinstance(node.value, str):
+        return None
+
+    value = node.value
+    segment = ast.get_source_segment(source, node) or ""
+    prefix = _STRING_PREFIX.match(segment).end()
+    quote = 3 if segment[prefix : prefix + 3] in ('"""', "'''") else 1
+    contents = segment[prefix + quote : len(segment) - quote]
+    if contents == value:
+        return SQLFragment(value, node.lineno, node.col_offset + prefix + quote + 1, True)
+    # Escapes or implicit concatenation: lines only match if line breaks do
+    return SQLFragment(value, node.lineno, None, value.count("\n") == segment.count("\n"))
+
+
+def extract_sql(source: str) -> List[SQLFragment]:
+    """Find the SQL run by Alembic and Django migrations in a Python source.
+
+    Args:
+        source: The Python source
+
+    Returns:
+        The SQL strings found, in source order
+
+    Raises:
+        SyntaxError: If the source is not valid Python
+    """
+    fragments = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call):
+            continue
+        if _is_alembic_execute(node):
+            arguments = [_argument(node, 0, "sqltext")]
+        elif _is_call_to(node, "RunSQL"):
+            argument = _argument(node, 0, "sql")
+            if isinstance(argument, (ast.List, ast.Tuple)):
+                # Each item is a statement, or a (statement, params) pair
+                arguments = [
+                    item.elts[0] if isinstance(item, (ast.List, ast.Tuple)) and item.elts else item
+                    for item in argument.elts
+                ]
+            else:
+                arguments = [argument]
+        else:
+            continue
+        for argument in arguments:
+            fragment = _fragment(source, argument) if argument is not None else None
+            if fragment is not None and fragment.sql.strip():
+                fragments.append(fragment)
+    fragments.sort(key=lambda fragment: (fragment.line, fragment.column or 0))
+    return fragments
+
+
+class Extractor:
+    """Extract migration SQL from Python sources, memoized by content hash.
+
+    An extractor can be shared between threads.
+    """
+
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        """Initialize an Extractor.
+
+        Args:
+            cache: Store keeping extraction results between runs
+        """
+        self.cache = cache
+        self._memo: Dict[str, List[SQLFragment]] = {}
+        self._lock = threading.Lock()
+
+    def extract(self, source: str) -> List[SQLFragment]:
+        """Return the migration SQL of a Python source.
+
+        Args:
+            source: The Python source
+
+        Returns:
+            The SQL strings found, in source order; none for sources that are
+            not valid Python
+        """
+        if _MARKERS.search(source) is None:
+            return []
+
+        file_hash = content_hash(source)
+        with self._lock:
+            fragments = self._memo.get(file_hash)
+        if fragments is None and self.cache is not None:
+            fragments = self.cache.get_fragments(file_hash)
+        if fragments is not None:
+            return fragments
+
+        try:
+            fragments = extract_sql(source)
+        except (SyntaxError, ValueError) as e:
+            logger.debug("Not extracting SQL from invalid Python: %s", e)
+            fragments = []
+        with self._lock:
+            self._memo[file_hash] = fragments
+        if self.cache is not None:
+            self.cache.put_fragments(file_hash, fragments)
+        return fragments
@@ -0,0 +1,358 @@
+"""Parsing SQL sources into located statements.
+
+A whole source is parsed with a single :func:`pglast.parse_sql` call whenever
+possible. When that fails, the source is split into statements with pglast's
+scanner and the statements are parsed independently, so one unparsable
+statement (say, a psql meta-command in a large dump) is reported at its exact
+location and every other statement is still checked.
+"""
+
+import bisect
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pglast import parse_sql
+from pglast.parser import ParseError, scan
+
+from ddlcheck.core.psql import OffsetMap
+
+# Statement boundaries, as (start, end) offsets; the end excludes the semicolon
+Bounds = Tuple[int, int]
+
+_COMMENT_TOKENS = frozenset({"SQL_COMMENT", "C_COMMENT"})
+
+
+def line_starts(sql: str) -> List[int]:
+    """Compute the offsets at which each line of a SQL string starts.
+
+    Args:
+        sql: The SQL source
+
+    Returns:
+        Sorted list of offsets, one per line
+    """
+    starts = [0]
+    index = sql.find("\n")
+    while index != -1:
+        starts.append(index + 1)
+        index = sql.find("\n", index + 1)
+    return starts
+
+
+def line_for_offset(starts: List[int], offset: int) -> int:
+    """Convert a character offset into a 1-based line number.
+
+    Args:
+        starts: Line start offsets, as returned by :func:`line_starts`
+        offset: Character offset into the source
+
+    Returns:
+        The line number containing the offset
+    """
+    return bisect.bisect_right(starts, offset)
+
+
+def skip_leading_trivia(sql: str, offset: int, end: int) -> int:
+    """Skip whitespace and comments that precede a statement.
+
+    pglast reports a statement location that starts right after the previous
+    statement's semicolon, so it includes any comments in between.
+
+    Args:
+        sql: The SQL source
+        offset: Offset at which the statement region starts
+        end: Offset at which the statement region ends
+
+    Returns:
+        Offset of the first significant character of the statement
+    """
+    while offset < end:
+        char = sql[offset]
+        if char.isspace():
+            offset += 1
+        elif sql.startswith("--", offset):
+            newline = sql.find("\n", offset, end)
+            offset = end if newline == -1 else newline + 1
+        elif sql.startswith("/*", offset):
+            close = sql.find("*/", offset + 2, end)
+            offset = end if close == -1 else close + 2
+        else:
+            break
+    return offset
+
+
+class Statement(NamedTuple):
+    """A parsed statement and where it is in the source."""
+
+    # The statement in the ``{node_type: node}`` form expected by checks
+    node: Dict[str, Any]
+    # Offset of the statement's first significant character
+    start: int
+    # Offset where the statement ends, excluding the semicolon
+    end: int
+
+
+class StatementError(NamedTuple):
+    """A statement that could not be parsed."""
+
+    # Offset of the error
+    offset: int
+    message: str
+
+
+class ParsedSource:
+    """The statements of a SQL source, and any statements that failed to parse."""
+
+    def __init__(self, sql: str):
+        """Initialize an empty ParsedSource.
+
+        Args:
+            sql: The SQL source
+        """
+        self.sql = sql
+        self.statements: List[Statement] = []
+        self.errors: List[StatementError] = []
+        # The text `sql` was preprocessed from, when it is not the original source
+        self.source = sql
+        self.offsets: Optional[OffsetMap] = None
+        self._starts: List[int] = []
+
+    def original(self, offset: int) -> int:
+        """Convert an offset into the parsed SQL into one into the original source.
+
+        Args:
+            offset: Character offset into :attr:`sql`
+
+        Returns:
+            The corresponding offset into :attr:`source`
+        """
+        return self.offsets.original(offset) if self.offsets is not None else offset
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Convert an offset into a line and column of the original source.
+
+        Args:
+            offset: Character offset into the parsed SQL
+
+        Returns:
+            The 1-based line and column
+        """
+        return self.source_position(self.original(offset))
+
+    def source_position(self, offset: int) -> Tuple[int, int]:
+        """Convert an offset into the original source into a line and column.
+
+        Args:
+            offset: Character offset into :attr:`source`
+
+        Returns:
+            The 1-based line and column
+        """
+        if not self._starts:
+            self._starts = line_starts(self.source)
+        line = line_for_offset(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+
+def _error_offset(error: ParseError) -> int:
+    """Return the offset of a parse error within the parsed text."""
+    location = error.args[1] if len(error.args) > 1 else None
+    return location if isinstance(location, int) and location >= 0 else 0
+
+
+def _locate(sql: str, start: int, end: int) -> List[Statement]:
+    """Parse a region of a source and locate its statements.
+
+    Args:
+        sql: The SQL source
+        start: Offset where the region starts
+        end: Offset where the region ends
+
+    Returns:
+        The region's statements, with offsets into the whole source
+
+    Raises:
+        ParseError: If the region cannot be parsed
+    """
+    statements = []
+    for raw_stmt in parse_sql(sql[start:end]):
+        stmt_obj = getattr(raw_stmt, "stmt", None)
+        if stmt_obj is None:
+            continue
+
+        location = start + (raw_stmt.stmt_location or 0)
+        stmt_end = location + raw_stmt.stmt_len if raw_stmt.stmt_len else end
+        offset = skip_leading_trivia(sql, location, stmt_end)
+        statements.append(Statement({stmt_obj.__class__.__name__: stmt_obj}, offset, stmt_end))
+    return statements
+
+
+def _scan(sql: str) -> Tuple[List[Any], int]:
+    """Scan a source into tokens, up to any unterminated quote or comment.
+
+    Args:
+        sql: The SQL source
+
+    Returns:
+        The tokens, and the offset where scanning stopped
+    """
+    try:
+        return scan(sql), len(sql)
+    except ParseError as e:
+        limit = _error_offset(e)
+    try:
+        return scan(sql[:limit]), limit
+    except ParseError:
+        return [], limit
+
+
+class _Nesting:
+    """The parentheses and ``BEGIN ATOMIC`` bodies the scanner is inside of."""
+
+    def __init__(self) -> None:
+        """Initialize a _Nesting at the top level."""
+        self.depth = 0
+        self.atomic = 0
+        self.cases = 0
+        self.previous = ""
+
+    @property
+    def top_level(self) -> bool:
+        """Return True if a semicolon here ends a statement."""
+        return not self.depth and not self.atomic
+
+    def update(self, name: str) -> None:
+        """Enter or leave a nested block on a token.
+
+        Args:
+            name: Name of the token
+        """
+        if name == "ASCII_40":
+            self.depth += 1
+        elif name == "ASCII_41":
+            self.depth = max(0, self.depth - 1)
+        elif name == "ATOMIC" and self.previous == "BEGIN_P":
+            self.atomic += 1
+        elif name == "CASE" and self.atomic:
+            self.cases += 1
+        elif name == "END_P" and self.cases:
+            self.cases -= 1
+        elif name == "END_P" and self.atomic:
+            self.atomic -= 1
+        self.previous = name
+
+
+def _group(tokens: Sequence[Any]) -> Tuple[List[Bounds], int]:
+    """Group tokens into statements at top-level semicolons.
+
+    Args:
+        tokens: Tokens from pglast's scanner
+
+    Returns:
+        Offsets of each statement, and the start of the last one if no
+        semicolon ends it, or -1
+    """
+    bounds: List[Bounds] = []
+    nesting = _Nesting()
+    start = -1
+    end = 0
+    for token in tokens:
+        if token.name in _COMMENT_TOKENS:
+            continue
+        if start < 0:
+            start = token.start
+        if token.name == "ASCII_59" and nesting.top_level:
+            if start < token.start:
+                bounds.append((start, token.start))
+            start = -1
+        nesting.update(token.name)
+        end = token.end + 1
+
+    if start >= 0:
+        bounds.append((start, end))
+    return bounds, start
+
+
+def split_statements(sql: str) -> List[Bounds]:
+    """Split a source into statements with pglast's scanner.
+
+    Statements end at semicolons outside parentheses and ``BEGIN ATOMIC``
+    bodies. Unlike the parser, the scanner only fails on unterminated quotes
+    or comments; everything from such an error on becomes one last statement.
+
+    Args:
+        sql: The SQL source
+
+    Returns:
+        Offsets of each statement, excluding leading comments and the semicolon
+    """
+    tokens, limit = _scan(sql)
+    bounds, start = _group(tokens)
+    if limit < len(sql):
+        # The unterminated statement runs to the end of the source
+        if start >= 0:
+            bounds.pop()
+        bounds.append((start if start >= 0 else limit, len(sql)))
+    return bounds
+
+
+def _parse_bounds(sql: str, bounds: Sequence[Bounds]) -> ParsedSource:
+    """Parse consecutive statements, isolating any that fail.
+
+    The statements are parsed together; on an error they are split in half
+    and each half is parsed again, so a source with a few bad statements
+    takes only a few more parses than one without.
+
+    Args:
+        sql: The SQL source
+        bounds: Offsets of consecutive statements
+
+    Returns:
+        The parsed statements and errors
+    """
+    parsed = ParsedSource(sql)
+    pending = [bounds] if bounds else []
+    while pending:
+        group = pending.pop()
+        start, end = group[0][0], group[-1][1]
+        try:
+            parsed.statements.extend(_locate(sql, start, end))
+        except ParseError as e:
+            if len(group) == 1:
+                parsed.errors.append(StatementError(start + _error_offset(e), e.args[0]))
+            else:
+                middle = len(group) // 2
+                pending.extend((group[middle:], group[:middle]))
+    return parsed
+
+
+def parse_statements(
+    sql: str, source: Optional[str] = None, offsets: Optional[OffsetMap] = None
+) -> ParsedSource:
+    """Parse a source, recovering from statements that fail to parse.
+
+    Args:
+        sql: The SQL source
+        source: The script `sql` was preprocessed from, if any
+        offsets: Map from offsets into `sql` to offsets into `source`, if
+            preprocessing moved any text
+
+    Returns:
+        The statements that were parsed and the errors of those that were not,
+        each in source order
+    """
+    try:
+        parsed = ParsedSource(sql)
+        parsed.statements = _locate(sql, 0, len(sql))
+    except ParseError as e:
+        bounds = split_statements(sql)
+        if bounds:
+            parsed = _parse_bounds(sql, bounds)
+            parsed.statements.sort(key=lambda statement: statement.start)
+            parsed.errors.sort()
+        else:
+            parsed.errors.append(StatementError(_error_offset(e), e.args[0]))
+
+    if source is not None:
+        parsed.source = source
+        parsed.offsets = offsets
+    return parsed
@@ -0,0 +1,393 @@
+"""Staged, bounded-memory pipeline for checking many SQL files.
+
+Files flow through three stages connected by bounded queues:
+
+1. Reader threads read file contents from disk, or from the members of tar
+   and zip archives.
+2. Worker threads parse each file and run the checks on it.
+3. The caller consumes results from :meth:`Pipeline.run` as they are produced.
+
+Because each queue holds at most ``queue_size`` items, a slow stage makes the
+stages before it wait instead of buffering the whole corpus in memory.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+
+from ddlcheck.core.archives import is_archive, iter_members
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.profile_output import RunProfiler
+from ddlcheck.core.profiling import READ
+from ddlcheck.core.psql import has_includes
+from ddlcheck.history import content_hash
+from ddlcheck.models import CheckResult, Issue
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Marker placed on a queue once the stage that feeds it has finished
+_DONE = object()
+
+# Seconds to wait on a full or empty queue before re-checking for cancellation
+_POLL_INTERVAL = 0.1
+
+# Path, contents or read error, and cache key of the contents if already known
+ReadItem = Tuple[Path, Union[str, Exception], Optional[str]]
+
+
+class ResultStore(Protocol):
+    """Store that records every checked file, keyed by the hash of its contents.
+
+    Archive members may be keyed by their checksum instead, see
+    :mod:`ddlcheck.core.archives`.
+
+    :class:`ddlcheck.history.HistoryStore` and
+    :class:`ddlcheck.baseline.BaselineBuilder` implement this protocol.
+    """
+
+    def lookup(self, file_hash: str) -> Optional[List[Issue]]:
+        """Return stored issues for file contents, or None to check the file."""
+
+    def record(self, path: Path, file_hash: str, issues: Sequence[Issue]) -> None:
+        """Record a checked file and its issues."""
+
+
+class _RunState:
+    """Paths and queues shared by the reader and worker threads of one run."""
+
+    def __init__(self, paths: Iterable[Path], queue_size: int, readers: int):
+        """Initialize the state of a run.
+
+        Args:
+            paths: Paths of the SQL files to check; consumed lazily
+            queue_size: Maximum number of items buffered between stages
+            readers: Number of reader threads
+        """
+        self.paths = iter(paths)
+        self.read: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+        self.results: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+        self.readers_left = readers
+        self._lock = threading.Lock()
+
+    def next_path(self) -> Optional[Path]:
+        """Return the next path to read, or None once all have been taken."""
+        with self._lock:
+            return next(self.paths, None)
+
+    def reader_done(self) -> bool:
+        """Count a finished reader and return whether it was the last one."""
+        with self._lock:
+            self.readers_left -= 1
+            return self.readers_left == 0
+
+
+class Pipeline:
+    """Check SQL files concurrently while keeping memory bounded."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        readers: int = 2,
+        workers: Optional[int] = None,
+        queue_size: int = 64,
+        max_time: Optional[float] = None,
+        store: Optional[ResultStore] = None,
+        member_suffixes: Sequence[str] = (".sql",),
+        run_profiler: Optional[RunProfiler] = None,
+        on_file: Optional[Callable[[CheckResult], None]] = None,
+    ):
+        """Initialize a Pipeline.
+
+        Args:
+            engine: Engine used to check each file
+            readers: Number of threads reading files from disk
+            workers: Number of threads parsing and checking files
+                (default: number of CPUs)
+            queue_size: Maximum number of items buffered between stages
+            max_time: Time budget in seconds; once it is spent the run stops,
+                queued work is discarded and :attr:`stop_reason` is set
+            store: Store that every checked file is recorded in, and whose
+                results are reused for files with unchanged contents
+            member_suffixes: Name suffixes of the archive members to check
+            run_profiler: Profiler recording everything the workers run; it is
+                started and stopped with each run
+            on_file: Called with the result of every checked file, with or
+                without issues, from the worker thread that checked it
+        """
+        self.engine = engine
+        self.readers = max(1, readers)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_size = max(1, queue_size)
+        self.max_time = max_time
+        self.store = store
+        self.member_suffixes = tuple(member_suffixes)
+        self.run_profiler = run_profiler
+        self.on_file = on_file
+        self.stop_reason: Optional[str] = None
+        self.files_checked = 0
+        self._files_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self, paths: Iterable[Path]) -> Iterator[CheckResult]:
+        """Check files and yield the result of each file that has issues.
+
+        Results are yielded in completion order, not in the order of `paths`.
+        Files without issues are only counted in :attr:`files_checked` and
+        passed to :attr:`on_file`, so they never reach the result queue.
+        If the run is stopped early, by :meth:`stop` or because the time budget
+        ran out, files still queued are skipped and :attr:`stop_reason`
+        explains why the results are partial.
+
+        Args:
+            paths: Paths of the SQL files to check; consumed lazily. Archives
+                are checked member by member, see :mod:`ddlcheck.core.archives`
+
+        Yields:
+            Result for each file with issues
+        """
+        self._stop.clear()
+        self.stop_reason = None
+        self.files_checked = 0
+        deadline = time.monotonic() + self.max_time if self.max_time is not None else None
+        state = _RunState(paths, self.queue_size, self.readers)
+        threads = self._start(state)
+        try:
+            yield from self._results(state, deadline)
+        finally:
+            self._shutdown(threads)
+
+    def _start(self, state: _RunState) -> List[threading.Thread]:
+        """Start the reader and worker threads of a run.
+
+        Args:
+            state: State shared by the threads of the run
+
+        Returns:
+            The started threads
+        """
+        threads: List[threading.Thread] = [
+            threading.Thread(
+                target=self._read, args=(state,), name=f"ddlcheck-reader-{i}", daemon=True
+            )
+            for i in range(self.readers)
+        ] + [
+            threading.Thread(
+                target=self._work, args=(state,), name=f"ddlcheck-worker-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        if self.run_profiler is not None:
+            self.run_profiler.start()
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _results(self, state: _RunState, deadline: Optional[float]) -> Iterator[CheckResult]:
+        """Yield results until every worker is done, the run is stopped or time runs out.
+
+        Args:
+            state: State shared by the threads of the run
+            deadline: Monotonic time after which the run is stopped
+
+        Yields:
+            Result for each file with issues
+        """
+        workers_left = self.workers
+        while workers_left:
+            item = self._get(state.results, deadline)
+            if item is None or self._stop.is_set():
+                return
+            if item is _DONE:
+                workers_left -= 1
+                continue
+            yield item  # type: ignore[misc]
+
+    def _shutdown(self, threads: List[threading.Thread]) -> None:
+        """Stop every stage and wait for the threads of a run to finish.
+
+        Args:
+            threads: Threads of the run
+        """
+        self.stop()
+        for thread in threads:
+            thread.join()
+        if self.run_profiler is not None:
+            self.run_profiler.stop()
+
+    def _read(self, state: _RunState) -> None:
+        """Read files until none are left, then tell the workers once the last reader is done.
+
+        Args:
+            state: State shared by the threads of the run
+        """
+        try:
+            while not self._stop.is_set():
+                path = state.next_path()
+                if path is None or not self._read_path(path, state.read):
+                    break
+        finally:
+            if state.reader_done():
+                for _ in range(self.workers):
+                    self._put(state.read, _DONE)
+
+    def _read_path(self, path: Path, read_queue: "queue.Queue[object]") -> bool:
+        """Queue a file, or the members of an archive, for checking.
+
+        Args:
+            path: Path to the file or archive
+            read_queue: Queue feeding the workers
+
+        Returns:
+            False if the run was stopped while queueing
+        """
+        if is_archive(path):
+            return self._read_archive(path, read_queue)
+        item: ReadItem
+        try:
+            with self.engine.phase(READ):
+                item = (path, path.read_text(encoding="utf-8"), None)
+        except Exception as e:
+            item = (path, e, None)
+        return self._put(read_queue, item)
+
+    def _work(self, state: _RunState) -> None:
+        """Check queued files until the readers are done or the run is stopped.
+
+        Args:
+            state: State shared by the threads of the run
+        """
+        profiled = self.run_profiler.thread() if self.run_profiler else nullcontext()
+        try:
+            with profiled:
+                while True:
+                    item = self._get(state.read)
+                    if item is _DONE or item is None:
+                        break
+                    result = self._check_item(item)  # type: ignore[arg-type]
+                    if result.issues and not self._put(state.results, result):
+                        break
+        finally:
+            self._put(state.results, _DONE)
+
+    def _check_item(self, item: ReadItem) -> CheckResult:
+        """Check one read file, counting it and passing its result to :attr:`on_file`.
+
+        Args:
+            item: Path, contents or read error, and cache key of the file
+
+        Returns:
+            Result for the file
+        """
+        path, content, file_hash = item
+        if isinstance(content, Exception):
+            result = self.engine.file_error(path, content)
+        else:
+            result = self._check(path, content, file_hash)
+        with self._files_lock:
+            self.files_checked += 1
+        if self.on_file is not None:
+            self.on_file(result)
+        return result
+
+    def _read_archive(self, path: Path, read_queue: "queue.Queue[object]") -> bool:
+        """Queue the members of an archive for checking.
+
+        Args:
+            path: Path to the archive
+            read_queue: Queue feeding the workers
+
+        Returns:
+            False if the run was stopped while queueing
+        """
+        try:
+            for member in iter_members(path, self.member_suffixes):
+                if not self._put(read_queue, member):
+                    return False
+        except Exception as e:
+            return self._put(read_queue, (path, e, None))
+        return True
+
+    def _check(self, path: Path, sql: str, file_hash: Optional[str] = None) -> CheckResult:
+        """Check one file, reusing and recording results in the result store.
+
+        Args:
+            path: Path of the file
+            sql: Contents of the file
+            file_hash: Cache key of the contents, if known; otherwise the
+                contents are hashed
+
+        Returns:
+            Result for the file
+        """
+        if self.store is None:
+            return self.engine.check_source(sql, path, file_hash)
+
+        digest = file_hash or content_hash(sql)
+        # The issues of a script that includes other files depend on them too
+        issues = None if has_includes(sql) else self.store.lookup(digest)
+        if issues is None:
+            result = self.engine.check_source(sql, path, digest)
+        else:
+            result = CheckResult(path, issues)
+        self.store.record(path, digest, result.issues)
+        return result
+
+    def stop(self, reason: Optional[str] = None) -> None:
+        """Ask every stage to stop and discard any queued work.
+
+        Files already being checked are finished, but their results are
+        discarded along with everything still waiting in the queues.
+
+        Args:
+            reason: Why the run was stopped early; None for a normal shutdown
+        """
+        if reason is not None and not self._stop.is_set():
+            logger.info("Stopping checks early: %s", reason)
+            self.stop_reason = reason
+        self._stop.set()
+
+    def _put(self, target: "queue.Queue[object]", item: object) -> bool:
+        """Put an item on a queue, giving up if the pipeline is stopped.
+
+        Args:
+            target: Queue to put the item on
+            item: Item to put
+
+        Returns:
+            True if the item was queued, False if the pipeline was stopped
+        """
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(
+        self, source: "queue.Queue[object]", deadline: Optional[float] = None
+    ) -> Optional[object]:
+        """Get an item from a queue, giving up if the pipeline is stopped.
+
+        Args:
+            source: Queue to get an item from
+            deadline: Monotonic time after which the pipeline is stopped
+
+        Returns:
+            The item, or None if the pipeline was stopped
+        """
+        while not self._stop.is_set():
+            if deadline is not None and time.monotonic() >= deadline:
+                self.stop(f"time budget of {self.max_time:g}s exceeded")
+                break
+            try:
+                return source.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return None
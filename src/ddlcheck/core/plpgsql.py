@@ -0,0 +1,318 @@
+"""SQL embedded in DO blocks and function bodies.
+
+Risky DDL often lives inside ``DO $$ ... $$`` blocks and migration helper
+functions, where the parser only sees a string. This module extracts the SQL
+such bodies run so checks can inspect it:
+
+* static statements of PL/pgSQL bodies, found with :func:`pglast.parse_plpgsql`,
+* ``EXECUTE`` of a string that is constant apart from the names substituted
+  into it, e.g. ``EXECUTE format('ALTER TABLE %I DROP COLUMN c', t)``,
+* the statements of ``LANGUAGE sql`` function bodies.
+
+Parsing a PL/pgSQL body is expensive, so bodies are first scanned for the
+keywords of the active checks and only parsed when one of them occurs.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+from pglast import ast, parse_plpgsql, parse_sql
+from pglast.parser import ParseError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statement types whose body may contain SQL
+BODY_STATEMENT_TYPES = frozenset({"DoStmt", "CreateFunctionStmt"})
+
+_FORMAT_SPEC = re.compile(r"%(?:(\d+)\$)?[-\d*]*([sIL%])")
+_SIMPLE_IDENTIFIER = re.compile(r"[a-z_][a-z0-9_$]*")
+
+
+class EmbeddedStatement(NamedTuple):
+    """A statement run by a DO block or function body."""
+
+    # The statement in the ``{node_type: node}`` form expected by checks
+    node: Dict[str, Any]
+    # Lines between the start of the enclosing statement and this one
+    line_offset: int
+    # Source text of the statement, used to fingerprint its issues
+    sql: str
+
+
+def _options(node: Any, attribute: str) -> Dict[str, Any]:
+    """Return the DefElem options of a statement by name."""
+    return {
+        option.defname: option.arg
+        for option in getattr(node, attribute, None) or ()
+        if isinstance(option, ast.DefElem)
+    }
+
+
+def _body(stmt: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Return the language and body of a DO block or function.
+
+    Args:
+        stmt: The parsed statement
+
+    Returns:
+        The lower-case language name and the body, or None if the statement
+        has no body as a string (e.g. a ``BEGIN ATOMIC`` function)
+    """
+    if "DoStmt" in stmt:
+        options = _options(stmt["DoStmt"], "args")
+        default_language = "plpgsql"
+    else:
+        options = _options(stmt["CreateFunctionStmt"], "options")
+        default_language = None
+
+    body = options.get("as")
+    if isinstance(body, tuple):
+        # Functions list their body, and the link symbol of C functions
+        body = body[0] if len(body) == 1 else None
+    language = options.get("language")
+    language = language.sval.lower() if isinstance(language, ast.String) else default_language
+    if not isinstance(body, ast.String) or language is None:
+        return None
+    return language, body.sval
+
+
+def _constant(node: Any) -> Optional[str]:
+    """Evaluate an expression building a SQL string, as far as it is constant.
+
+    Variables and other column references evaluate to their own name, so
+    ``'TRUNCATE ' || quote_ident(t)`` becomes ``TRUNCATE t``.
+
+    Args:
+        node: Expression node
+
+    Returns:
+        The text of the expression, or None if it cannot be determined
+    """
+    if isinstance(node, ast.A_Const):
+        return _literal(node)
+    if isinstance(node, ast.TypeCast):
+        return _constant(node.arg)
+    if isinstance(node, ast.ColumnRef):
+        names = [getattr(field, "sval", None) for field in node.fields]
+        return ".".join(names) if None not in names else None
+    if isinstance(node, ast.A_Expr):
+        return _concatenation(node)
+    if isinstance(node, ast.FuncCall):
+        return _function_call(node)
+    return None
+
+
+def _literal(node: ast.A_Const) -> Optional[str]:
+    """Return the text of a string or numeric constant, or None for NULL."""
+    if node.isnull:
+        return None
+    for attribute in ("sval", "ival", "fval"):
+        value = getattr(node.val, attribute, None)
+        if value is not None:
+            return str(value)
+    return None
+
+
+def _concatenation(node: ast.A_Expr) -> Optional[str]:
+    """Evaluate a ``||`` expression, if both of its operands are constant."""
+    operator = node.name[0].sval if node.name else None
+    if operator != "||":
+        return None
+    left, right = _constant(node.lexpr), _constant(node.rexpr)
+    return left + right if left is not None and right is not None else None
+
+
+def _function_call(node: ast.FuncCall) -> Optional[str]:
+    """Evaluate a call of a string building function with constant arguments."""
+    name = node.funcname[-1].sval.lower()
+    args = [_constant(arg) for arg in node.args or ()]
+    if None in args or not args:
+        return None
+    if name == "format":
+        return _format(args[0], args[1:])
+    if name == "quote_ident":
+        return _quote_identifier(args[0])
+    if name in ("quote_literal", "quote_nullable"):
+        return _quote_literal(args[0])
+    if name == "concat":
+        return "".join(args)
+    return None
+
+
+def _quote_identifier(value: str) -> str:
+    """Quote an identifier the way ``quote_ident`` and ``%I`` do."""
+    if _SIMPLE_IDENTIFIER.fullmatch(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    """Quote a literal the way ``quote_literal`` and ``%L`` do."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _format(template: str, args: List[str]) -> Optional[str]:
+    """Apply ``format()`` to constant arguments.
+
+    Args:
+        template: The format string
+        args: The evaluated arguments
+
+    Returns:
+        The formatted string, or None if the arguments do not match
+    """
+    position = 0
+    missing = False
+
+    def substitute(match: "re.Match[str]") -> str:
+        nonlocal position, missing
+        explicit, kind = match.groups()
+        if kind == "%":
+            return "%"
+        index = int(explicit) - 1 if explicit else position
+        position = index + 1
+        if index >= len(args):
+            missing = True
+            return ""
+        if kind == "I":
+            return _quote_identifier(args[index])
+        if kind == "L":
+            return _quote_literal(args[index])
+        return args[index]
+
+    text = _FORMAT_SPEC.sub(substitute, template)
+    return None if missing else text
+
+
+def _dynamic_sql(expression: str) -> Optional[str]:
+    """Return the SQL run by ``EXECUTE expression``, if it is constant enough.
+
+    Args:
+        expression: The PL/pgSQL expression after EXECUTE
+
+    Returns:
+        The SQL, or None if it is built from values only known at run time
+    """
+    try:
+        statement = parse_sql(f"SELECT {expression}")[0].stmt
+    except ParseError:
+        return None
+    targets = getattr(statement, "targetList", None) or ()
+    if len(targets) != 1:
+        return None
+    return _constant(targets[0].val)
+
+
+def _plpgsql_queries(tree: Any, line: int = 1) -> Iterator[Tuple[str, int, bool]]:
+    """Find the SQL statements of a parsed PL/pgSQL body.
+
+    Args:
+        tree: JSON tree returned by :func:`pglast.parse_plpgsql`
+        line: Line of the enclosing node, relative to the body
+
+    Yields:
+        Tuples of the query text, its line relative to the body and whether
+        it is a dynamic ``EXECUTE`` expression
+    """
+    if isinstance(tree, list):
+        for item in tree:
+            yield from _plpgsql_queries(item, line)
+        return
+    if not isinstance(tree, dict):
+        return
+
+    for key, value in tree.items():
+        if not isinstance(value, dict):
+            yield from _plpgsql_queries(value, line)
+            continue
+        node_line = value.get("lineno", line)
+        if key == "PLpgSQL_stmt_execsql":
+            query = value.get("sqlstmt", {}).get("PLpgSQL_expr", {}).get("query")
+            if query:
+                yield query, node_line, False
+        elif key in ("PLpgSQL_stmt_dynexecute", "PLpgSQL_stmt_dynfors"):
+            query = value.get("query", {}).get("PLpgSQL_expr", {}).get("query")
+            if query:
+                yield query, node_line, True
+        yield from _plpgsql_queries(value, node_line)
+
+
+def _parse_embedded(sql: str, line_offset: int) -> List[EmbeddedStatement]:
+    """Parse SQL found in a body, ignoring SQL that does not parse on its own."""
+    try:
+        raw_stmts = parse_sql(sql)
+    except ParseError as e:
+        logger.debug("Not checking embedded SQL %r: %s", sql[:60], e)
+        return []
+    statements = []
+    for raw_stmt in raw_stmts:
+        stmt_obj = getattr(raw_stmt, "stmt", None)
+        if stmt_obj is None:
+            continue
+        location = raw_stmt.stmt_location or 0
+        end = location + raw_stmt.stmt_len if raw_stmt.stmt_len else len(sql)
+        text = sql[location:end].lstrip()
+        start = end - len(text)
+        statements.append(
+            EmbeddedStatement(
+                {stmt_obj.__class__.__name__: stmt_obj},
+                line_offset + sql.count("\n", 0, start),
+                text.rstrip(),
+            )
+        )
+    return statements
+
+
+def embedded_statements(
+    stmt: Dict[str, Any], statement_sql: str, keywords: Optional[Pattern[str]] = None
+) -> List[EmbeddedStatement]:
+    """Extract the statements run by a DO block or function body.
+
+    Args:
+        stmt: The parsed DO or CREATE FUNCTION statement
+        statement_sql: Source text of the statement
+        keywords: Pattern matching any keyword the active checks report on;
+            bodies without a match are not parsed. None parses every body.
+
+    Returns:
+        The embedded statements, in body order
+    """
+    found = _body(stmt)
+    if found is None:
+        return []
+    language, body = found
+    if keywords is not None and keywords.search(body) is None:
+        return []
+
+    # Line numbers in the body are relative to the line the body starts on
+    body_start = statement_sql.find(body)
+    body_offset = statement_sql.count("\n", 0, body_start) if body_start >= 0 else 0
+
+    if language == "sql":
+        return _parse_embedded(body, body_offset)
+    if language != "plpgsql":
+        return []
+
+    try:
+        tree = parse_plpgsql(statement_sql)
+    except ParseError as e:
+        logger.debug("Not checking PL/pgSQL body: %s", e)
+        return []
+
+    statements = []
+    for query, line, dynamic in _plpgsql_queries(tree):
+        line_offset = body_offset + line - 1
+        if dynamic:
+            sql = _dynamic_sql(query)
+            if sql is None:
+                continue
+            # The whole statement is reported on the EXECUTE line
+            statements.extend(
+                statement._replace(line_offset=line_offset)
+                for statement in _parse_embedded(sql, line_offset)
+            )
+        else:
+            statements.extend(_parse_embedded(query, line_offset))
+    return statements
@@ -0,0 +1,290 @@
+"""Full profiles of a run, written as pstats or speedscope files.
+
+Where :mod:`ddlcheck.core.profiling` aggregates timers, the profilers here
+record every Python function the pipeline's workers run:
+
+* :class:`CallProfiler` runs the workers under :mod:`cProfile` and merges
+  their profiles into one pstats file, for ``pstats``, snakeviz and the
+  like,
+* :class:`SamplingProfiler` samples the workers' stacks from a background
+  thread at a fixed interval, which costs much less than tracing every
+  call, and writes a `speedscope <https://www.speedscope.app>`_ file with
+  one flame graph per worker.
+
+:func:`run_profiler_for` picks one by the output file name.
+"""
+
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ddlcheck import __version__
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Output file suffixes written as speedscope JSON; anything else is pstats
+SPEEDSCOPE_SUFFIXES = (".speedscope.json", ".json")
+
+# Seconds between two samples of the sampling profiler
+DEFAULT_INTERVAL = 0.001
+
+# Deepest stack recorded per sample
+MAX_DEPTH = 256
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Whether a cProfile profile traces every thread rather than the one enabling it
+_GLOBAL_PROFILES = sys.version_info >= (3, 12)
+
+# Frame of a sampled stack: function name, file and first line
+Frame = Tuple[str, str, int]
+
+
+class RunProfiler:
+    """Profile the threads of a run and write the profile to a file."""
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the calling thread for the duration of a ``with`` block."""
+        yield
+
+    def start(self) -> None:
+        """Start profiling, before any thread is profiled."""
+
+    def stop(self) -> None:
+        """Stop profiling, after every profiled thread has finished."""
+
+    def write(self, path: Path) -> None:
+        """Write the profile.
+
+        Args:
+            path: Path to write the profile to
+        """
+        raise NotImplementedError
+
+
+class CallProfiler(RunProfiler):
+    """Run each thread under :mod:`cProfile`.
+
+    Before Python 3.12 each thread gets its own :class:`cProfile.Profile`. From
+    Python 3.12 a profile traces every thread and only one can be enabled at
+    a time, so a single profile runs from :meth:`start` to :meth:`stop`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a CallProfiler."""
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._global: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        """Enable the profile shared by every thread, where profiles are global."""
+        if _GLOBAL_PROFILES:
+            self._global = cProfile.Profile()
+            self.profiles.append(self._global)
+            self._global.enable()
+
+    def stop(self) -> None:
+        """Disable the profile shared by every thread."""
+        if self._global is not None:
+            self._global.disable()
+            self._global = None
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the calling thread for the duration of a ``with`` block."""
+        if _GLOBAL_PROFILES:
+            yield
+            return
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def stats(self) -> pstats.Stats:
+        """Merge the profiles of every thread.
+
+        Returns:
+            The merged statistics, empty if no thread recorded anything
+        """
+        with self._lock:
+            profiles = list(self.profiles)
+        stats = pstats.Stats()
+        for profile in profiles:
+            # pstats refuses profiles without any calls
+            profile.create_stats()
+            if profile.stats:
+                stats.add(profile)
+        return stats
+
+    def write(self, path: Path) -> None:
+        """Write the merged profile as a pstats file.
+
+        Args:
+            path: Path to write the profile to
+        """
+        self.stats().dump_stats(str(path))
+
+
+class SamplingProfiler(RunProfiler):
+    """Sample the stacks of profiled threads at a fixed interval."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        """Initialize a SamplingProfiler.
+
+        Args:
+            interval: Seconds between two samples
+        """
+        self.interval = interval
+        self.frames: List[Frame] = []
+        # Samples per profiled thread: thread name, stacks as frame indexes
+        # from the root, and the seconds each stack stands for
+        self.samples: Dict[int, Tuple[str, List[List[int]], List[float]]] = {}
+        self._frame_index: Dict[Frame, int] = {}
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Sample the calling thread for the duration of a ``with`` block."""
+        current = threading.current_thread()
+        with self._lock:
+            self._threads[current.ident or 0] = current.name
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads.pop(current.ident or 0, None)
+
+    def start(self) -> None:
+        """Start the sampling thread."""
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name="ddlcheck-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def _run(self) -> None:
+        """Take samples until stopped."""
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(now - last)
+            last = now
+
+    def sample(self, weight: float) -> None:
+        """Record the current stack of every profiled thread.
+
+        Args:
+            weight: Seconds the sample stands for
+        """
+        with self._lock:
+            threads = dict(self._threads)
+        if not threads:
+            return
+        current_frames = sys._current_frames()
+        for ident, name in threads.items():
+            frame = current_frames.get(ident)
+            if frame is None:
+                continue
+            stack = self._stack(frame)
+            _, stacks, weights = self.samples.setdefault(ident, (name, [], []))
+            stacks.append(stack)
+            weights.append(weight)
+
+    def _stack(self, frame: Optional[FrameType]) -> List[int]:
+        """Convert a frame and its callers into frame indexes, root first."""
+        stack = []
+        while frame is not None and len(stack) < MAX_DEPTH:
+            code = frame.f_code
+            function = getattr(code, "co_qualname", code.co_name)
+            key = (function, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self.frames)
+                self.frames.append(key)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def to_speedscope(self, name: str = "ddlcheck") -> Dict[str, object]:
+        """Build a speedscope document with one sampled profile per thread.
+
+        Args:
+            name: Name of the document
+
+        Returns:
+            JSON-serializable speedscope document
+        """
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }
+            for _, (thread_name, stacks, weights) in sorted(
+                self.samples.items(), key=lambda item: item[1][0]
+            )
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": f"ddlcheck {__version__}",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": file, "line": line}
+                    for function, file, line in self.frames
+                ]
+            },
+            "profiles": profiles,
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the samples as a speedscope file.
+
+        Args:
+            path: Path to write the profile to
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_speedscope(path.name), f)
+
+
+def run_profiler_for(path: Path) -> RunProfiler:
+    """Create the profiler whose output format matches a file name.
+
+    Args:
+        path: Path the profile will be written to
+
+    Returns:
+        A :class:`SamplingProfiler` for speedscope JSON names, otherwise a
+        :class:`CallProfiler`
+    """
+    if path.name.lower().endswith(SPEEDSCOPE_SUFFIXES):
+        return SamplingProfiler()
+    return CallProfiler()
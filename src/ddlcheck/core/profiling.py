@@ -0,0 +1,325 @@
+"""Low-overhead timing of the phases of a run and of each check.
+
+A :class:`Profiler` attached to an :class:`ddlcheck.core.engine.Engine`
+times every phase (reading, preprocessing, parsing, line computation, ...)
+and every check's ``check_statement`` with :func:`time.perf_counter_ns`.
+Without a profiler the engine takes no timings at all.
+
+Each thread records into its own :class:`Timings`, so timing never takes a
+lock; :meth:`Profiler.report` merges them. Percentiles are estimated from a
+bounded reservoir sample, and durations are also counted in fixed histogram
+buckets, so memory stays constant however long the run.
+"""
+
+import bisect
+import heapq
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Phases timed by the engine, pipeline and CLI, in the order they happen
+READ = "read"
+EXTRACT = "extract"
+PREPROCESS = "preprocess"
+PARSE = "parse"
+LINES = "lines"
+PLPGSQL = "plpgsql"
+FINGERPRINT = "fingerprint"
+REPORT = "report"
+PHASES = (READ, EXTRACT, PREPROCESS, PARSE, LINES, PLPGSQL, FINGERPRINT, REPORT)
+
+# Durations kept per timer for percentiles
+RESERVOIR_SIZE = 1024
+
+# Slowest files and statements kept
+TOP = 10
+
+# Upper bounds of the histogram buckets, in nanoseconds: 10µs to 10s
+BUCKETS_NS = tuple(
+    int(base * 10**exponent) for exponent in range(4, 10) for base in (1, 2.5, 5)
+) + (10**10,)
+
+clock = time.perf_counter_ns
+
+
+class Timer:
+    """Count, total, maximum and a reservoir sample of durations."""
+
+    def __init__(self, seed: int = 0):
+        """Initialize a Timer.
+
+        Args:
+            seed: Seed of the reservoir sampling
+        """
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples: List[int] = []
+        # Durations per bucket of BUCKETS_NS, plus one for longer durations
+        self.buckets = [0] * (len(BUCKETS_NS) + 1)
+        self._random = random.Random(seed)
+
+    def add(self, ns: int) -> None:
+        """Record a duration.
+
+        Args:
+            ns: Duration in nanoseconds
+        """
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[bisect.bisect_left(BUCKETS_NS, ns)] += 1
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(ns)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = ns
+
+    def merge(self, other: "Timer") -> None:
+        """Add another timer's durations to this one.
+
+        Args:
+            other: Timer to merge, left unchanged
+        """
+        if not other.count:
+            return
+        # Keep each timer's share of the merged reservoir proportional to its count
+        total = self.count + other.count
+        keep = round(RESERVOIR_SIZE * self.count / total)
+        mine = self._random.sample(self.samples, min(keep, len(self.samples)))
+        theirs = self._random.sample(other.samples, min(RESERVOIR_SIZE - keep, len(other.samples)))
+        self.samples = mine + theirs
+        self.count = total
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile(self, fraction: float) -> int:
+        """Estimate a percentile of the recorded durations.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            Duration in nanoseconds, 0 without durations
+        """
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Timings:
+    """Timings recorded by one thread."""
+
+    def __init__(self) -> None:
+        """Initialize empty Timings."""
+        self.phases: Dict[str, Timer] = {}
+        self.checks: Dict[str, Timer] = {}
+        # Time spent checking each file, from start to finish
+        self.file_time = Timer()
+        # Min-heaps of (nanoseconds, label) holding the slowest items
+        self.files: List[Tuple[int, str]] = []
+        self.statements: List[Tuple[int, str]] = []
+
+    def timer(self, table: Dict[str, Timer], name: str) -> Timer:
+        """Return the timer of a phase or check, creating it on first use."""
+        timer = table.get(name)
+        if timer is None:
+            timer = table[name] = Timer(len(table))
+        return timer
+
+
+def _keep_slowest(heap: List[Tuple[int, str]], ns: int, label: str) -> None:
+    """Add an item to a min-heap holding the :data:`TOP` slowest items."""
+    if len(heap) < TOP:
+        heapq.heappush(heap, (ns, label))
+    elif ns > heap[0][0]:
+        heapq.heapreplace(heap, (ns, label))
+
+
+@dataclass
+class TimingRow:
+    """Statistics of one phase or check."""
+
+    name: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_timer(cls, name: str, timer: Timer) -> "TimingRow":
+        """Summarize a timer.
+
+        Args:
+            name: Name of the phase or check
+            timer: Its timer
+
+        Returns:
+            The statistics, in milliseconds
+        """
+        return cls(
+            name=name,
+            count=timer.count,
+            total_ms=timer.total_ns / 1e6,
+            mean_ms=timer.total_ns / timer.count / 1e6 if timer.count else 0.0,
+            p95_ms=timer.percentile(0.95) / 1e6,
+            max_ms=timer.max_ns / 1e6,
+        )
+
+
+@dataclass
+class ProfileReport:
+    """Where the time of a run went."""
+
+    wall_ms: float
+    phases: List[TimingRow] = field(default_factory=list)
+    checks: List[TimingRow] = field(default_factory=list)
+    # Slowest files and statements as (label, milliseconds), slowest first
+    slowest_files: List[Tuple[str, float]] = field(default_factory=list)
+    slowest_statements: List[Tuple[str, float]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a JSON-serializable dict."""
+
+        def rows(items: List[TimingRow]) -> Dict[str, Dict[str, float]]:
+            return {
+                row.name: {key: value for key, value in vars(row).items() if key != "name"}
+                for row in items
+            }
+
+        return {
+            "wall_ms": self.wall_ms,
+            "phases": rows(self.phases),
+            "checks": rows(self.checks),
+            "slowest_files": [{"file": label, "ms": ms} for label, ms in self.slowest_files],
+            "slowest_statements": [
+                {"statement": label, "ms": ms} for label, ms in self.slowest_statements
+            ],
+        }
+
+
+class Profiler:
+    """Collect timings from any number of threads."""
+
+    def __init__(self) -> None:
+        """Initialize a Profiler and start its wall clock."""
+        self.started_ns = clock()
+        self._local = threading.local()
+        self._all: List[Timings] = []
+        self._lock = threading.Lock()
+
+    def timings(self) -> Timings:
+        """Return the calling thread's timings."""
+        timings: Optional[Timings] = getattr(self._local, "timings", None)
+        if timings is None:
+            timings = self._local.timings = Timings()
+            with self._lock:
+                self._all.append(timings)
+        return timings
+
+    def add_phase(self, name: str, ns: int) -> None:
+        """Record time spent in a phase.
+
+        Args:
+            name: Name of the phase, one of :data:`PHASES`
+            ns: Duration in nanoseconds
+        """
+        timings = self.timings()
+        timings.timer(timings.phases, name).add(ns)
+
+    def add_check(self, check_id: str, ns: int) -> None:
+        """Record time spent in a check's ``check_statement``.
+
+        Args:
+            check_id: ID of the check
+            ns: Duration in nanoseconds
+        """
+        timings = self.timings()
+        timings.timer(timings.checks, check_id).add(ns)
+
+    def add_file(self, label: str, ns: int) -> None:
+        """Record the time spent checking a file.
+
+        Args:
+            label: Path of the file
+            ns: Duration in nanoseconds
+        """
+        timings = self.timings()
+        timings.file_time.add(ns)
+        _keep_slowest(timings.files, ns, label)
+
+    def add_statement(self, label: str, ns: int) -> None:
+        """Record the time the checks spent on a statement.
+
+        Args:
+            label: Location of the statement, as ``path:line``
+            ns: Duration in nanoseconds
+        """
+        _keep_slowest(self.timings().statements, ns, label)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as a phase.
+
+        Args:
+            name: Name of the phase
+        """
+        start = clock()
+        try:
+            yield
+        finally:
+            self.add_phase(name, clock() - start)
+
+    def merged(self) -> Timings:
+        """Merge the timings of every thread.
+
+        Returns:
+            Timings of the whole run so far
+        """
+        merged = Timings()
+        with self._lock:
+            all_timings = list(self._all)
+        for timings in all_timings:
+            for table, into in ((timings.phases, merged.phases), (timings.checks, merged.checks)):
+                for name, timer in list(table.items()):
+                    merged.timer(into, name).merge(timer)
+            merged.file_time.merge(timings.file_time)
+            merged.files.extend(timings.files)
+            merged.statements.extend(timings.statements)
+        return merged
+
+    def report(self) -> ProfileReport:
+        """Summarize the timings of every thread.
+
+        Returns:
+            The timings so far
+        """
+        merged = self.merged()
+        phases, checks = merged.phases, merged.checks
+
+        def slowest(items: List[Tuple[int, str]]) -> List[Tuple[str, float]]:
+            return [(label, ns / 1e6) for ns, label in heapq.nlargest(TOP, items)]
+
+        order = {name: index for index, name in enumerate(PHASES)}
+        return ProfileReport(
+            wall_ms=(clock() - self.started_ns) / 1e6,
+            phases=[
+                TimingRow.from_timer(name, phases[name])
+                for name in sorted(phases, key=lambda name: order.get(name, len(order)))
+            ],
+            checks=sorted(
+                (TimingRow.from_timer(name, timer) for name, timer in checks.items()),
+                key=lambda row: row.total_ms,
+                reverse=True,
+            ),
+            slowest_files=slowest(merged.files),
+            slowest_statements=slowest(merged.statements),
+        )
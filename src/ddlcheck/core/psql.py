@@ -0,0 +1,639 @@
+"""Preprocessing of psql scripts.
+
+Migrations are often run with psql, so they contain things the PostgreSQL
+parser does not understand: meta-commands such as ``\\set`` or ``\\connect``,
+``:name``, ``:'name'`` and ``:"name"`` variable references, ``\\i`` includes
+and the data of ``COPY ... FROM stdin`` statements in pg_dump output.
+
+:class:`Preprocessor` turns such a script into plain SQL:
+
+* meta-commands are blanked out (``\\g`` and friends become a semicolon,
+  since they end the current query), keeping every line where it was,
+* variables set with ``\\set`` (in the script, in included files or on the
+  command line) are interpolated as psql would,
+* ``\\i`` includes are replaced by the SQL of the included file,
+* ``COPY ... FROM stdin`` data is blanked out up to its ``\\.`` terminator.
+
+Blanking keeps offsets unchanged; only interpolation and includes move text,
+and an :class:`OffsetMap` translates offsets in the output back to the
+original so issues are reported on the right line. Issues in included SQL are
+reported on the line of the include.
+
+Scripts read from archives are not on the filesystem, so their includes are
+not followed: a relative ``\\ir`` would otherwise read whatever happens to be
+next to the working directory. :func:`find_includes` lists them so they can
+be reported instead.
+
+Files that are checked in their own right are not inlined, so their issues
+are not reported once per including script; they are only read for the
+variables they set. Each included file is read and scanned for meta-commands
+once, so a file included by hundreds of scripts is only read once. The scan is
+memoized by path and content hash: touching a file re-reads it, but only an
+edit scans it again. The included SQL itself is interpolated with each
+including script's variables and parsed as part of that script, so it is
+preprocessed and parsed once per including script.
+"""
+
+import bisect
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ddlcheck.core.archives import MemberPath
+from ddlcheck.history import content_hash
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Meta-commands that send the current query, like a semicolon
+_SEND_COMMANDS = frozenset({"g", "gx", "gset", "gexec", "gdesc", "crosstabview", "watch"})
+_INCLUDE_COMMANDS = frozenset({"i", "include", "ir", "include_relative"})
+_RELATIVE_COMMANDS = frozenset({"ir", "include_relative"})
+
+# Maximum depth of nested includes, to stop include cycles
+MAX_INCLUDE_DEPTH = 16
+
+_SPECIAL = re.compile(r"""'|"|\$(?:[A-Za-z_\x80-\uffff][\w\x80-\uffff]*)?\$|--|/\*|\\|:""")
+_VARIABLE = re.compile(r""":(?:'([A-Za-z_]\w*)'|"([A-Za-z_]\w*)"|([A-Za-z_]\w*))""")
+_ARGUMENT = re.compile(r"""'((?:[^']|'')*)'|"((?:[^"]|"")*)"|`[^`]*`|(:?[^\s'"`]+)""")
+_COMMAND = re.compile(r"[A-Za-z_?!.]\w*|[^\s\w]")
+_COPY_FROM_STDIN = re.compile(r"\bCOPY\b[^;]*?\bFROM\s+STDIN\b[^;]*;[^\n]*\n", re.IGNORECASE)
+_COPY_END = re.compile(r"^\\\.[ \t\r]*$", re.MULTILINE)
+_INCLUDE = re.compile(r"\\(?:i|include|ir|include_relative)\b")
+
+
+class OffsetMap:
+    """Translate offsets in preprocessed SQL back to the original script."""
+
+    def __init__(self) -> None:
+        """Initialize an OffsetMap with no edits."""
+        self._output_starts: List[int] = []
+        # (output start, output length, original start, original length) per edit
+        self._edits: List[Tuple[int, int, int, int]] = []
+
+    def add(self, output_start: int, output_length: int, start: int, length: int) -> None:
+        """Record that original text was replaced; edits must be added in order.
+
+        Args:
+            output_start: Offset of the replacement in the output
+            output_length: Length of the replacement
+            start: Offset of the replaced text in the original
+            length: Length of the replaced text
+        """
+        self._output_starts.append(output_start)
+        self._edits.append((output_start, output_length, start, length))
+
+    def __bool__(self) -> bool:
+        """Return True if any text moved."""
+        return bool(self._edits)
+
+    def original(self, offset: int) -> int:
+        """Convert an output offset into an offset in the original script.
+
+        Args:
+            offset: Offset into the preprocessed SQL
+
+        Returns:
+            The corresponding offset in the original script; offsets inside
+            a replacement map to the start of the text it replaced
+        """
+        index = bisect.bisect_right(self._output_starts, offset) - 1
+        if index < 0:
+            return offset
+        output_start, output_length, start, length = self._edits[index]
+        if offset < output_start + output_length:
+            return start
+        return start + length + (offset - output_start - output_length)
+
+
+class PsqlScript(NamedTuple):
+    """The SQL of a preprocessed script."""
+
+    sql: str
+    # None when no text moved, so offsets need no translation
+    offsets: Optional[OffsetMap]
+
+
+class _Event(NamedTuple):
+    """A meta-command or variable reference found in a script."""
+
+    start: int
+    end: int
+    # Meta-command name, or ":" for a variable reference
+    kind: str
+    # Meta-command arguments, or the variable reference's match
+    argument: str
+    quote: str = ""
+
+
+def _skip_string(sql: str, start: int, backslash_escapes: bool) -> int:
+    """Return the offset just past the string literal whose body starts at `start`."""
+    index = start
+    while True:
+        index = sql.find("'", index)
+        if index == -1:
+            return len(sql)
+        if backslash_escapes:
+            # An odd number of backslashes escapes the quote
+            backslashes = 0
+            while sql[index - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2:
+                index += 1
+                continue
+        if sql.startswith("''", index):
+            index += 2
+            continue
+        return index + 1
+
+
+def _skip_block_comment(sql: str, start: int) -> int:
+    """Return the offset just past the (possibly nested) comment opened before `start`."""
+    depth = 1
+    index = start
+    while depth:
+        close = sql.find("*/", index)
+        if close == -1:
+            return len(sql)
+        opened = sql.find("/*", index, close)
+        if opened != -1:
+            depth += 1
+            index = opened + 2
+        else:
+            depth -= 1
+            index = close + 2
+    return index
+
+
+def _backslash_escapes(sql: str, index: int) -> bool:
+    """Return True if the string literal opened at `index` is an ``E'...'`` string."""
+    # The E must not end an identifier
+    if index == 0 or sql[index - 1] not in "eE":
+        return False
+    return index == 1 or not (sql[index - 2].isalnum() or sql[index - 2] == "_")
+
+
+def _skip_identifier(sql: str, start: int) -> int:
+    """Return the offset just past the quoted identifier whose body starts at `start`."""
+    pos = start
+    while True:
+        close = sql.find('"', pos)
+        if close == -1:
+            return len(sql)
+        if not sql.startswith('""', close):
+            return close + 1
+        pos = close + 2
+
+
+def _skip(sql: str, token: str, index: int) -> int:
+    """Return the offset just past a quoted string, comment, dollar quote or cast.
+
+    Args:
+        sql: The script
+        token: The text that opened it, as matched by ``_SPECIAL``
+        index: Offset of `token`
+
+    Returns:
+        Offset to continue scanning at
+    """
+    if token == "'":
+        return _skip_string(sql, index + 1, _backslash_escapes(sql, index))
+    if token == '"':
+        return _skip_identifier(sql, index + 1)
+    if token == "--":
+        newline = sql.find("\n", index)
+        return len(sql) if newline == -1 else newline
+    if token == "/*":
+        return _skip_block_comment(sql, index + 2)
+    if token == ":":
+        # A "::" cast
+        return index + 2
+    if index > 0 and (sql[index - 1].isalnum() or sql[index - 1] == "_"):
+        # A "$" inside an identifier, not a dollar quote
+        return index + 1
+    close = sql.find(token, index + len(token))
+    return len(sql) if close == -1 else close + len(token)
+
+
+def _variable(sql: str, index: int) -> Optional[_Event]:
+    """Return the variable reference at `index`, if there is one."""
+    variable = _VARIABLE.match(sql, index)
+    if variable is None:
+        return None
+    quote = "'" if variable.group(1) else '"' if variable.group(2) else ""
+    name = variable.group(1) or variable.group(2) or variable.group(3)
+    return _Event(index, variable.end(), ":", name, quote)
+
+
+def _meta_command(sql: str, index: int) -> _Event:
+    """Return the meta-command at `index`, which runs to the end of the line."""
+    newline = sql.find("\n", index)
+    end = len(sql) if newline == -1 else newline
+    command = _COMMAND.match(sql, index + 1, end)
+    name = command.group() if command else ""
+    argument_start = command.end() if command else index + 1
+    return _Event(index, end, name, sql[argument_start:end].strip())
+
+
+def _events(sql: str) -> Iterator[_Event]:
+    """Find the meta-commands and variable references of a script.
+
+    Quoted strings, quoted identifiers, dollar-quoted bodies and comments are
+    skipped, since psql does not look inside them either.
+
+    Args:
+        sql: The script
+
+    Yields:
+        Each meta-command and variable reference, in order
+    """
+    pos = 0
+    while True:
+        match = _SPECIAL.search(sql, pos)
+        if match is None:
+            return
+        token, index = match.group(), match.start()
+        event: Optional[_Event]
+        if token == "\\":
+            event = _meta_command(sql, index)
+        elif token == ":" and not sql.startswith("::", index):
+            event = _variable(sql, index)
+        else:
+            pos = _skip(sql, token, index)
+            continue
+
+        if event is None:
+            pos = index + 1
+        else:
+            yield event
+            pos = event.end
+
+
+def _quote_literal(value: str) -> str:
+    """Quote a value as a SQL string literal, as psql does for ``:'name'``."""
+    if "\\" in value:
+        return "E'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _quote_identifier(value: str) -> str:
+    """Quote a value as a SQL identifier, as psql does for ``:"name"``."""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _arguments(text: str, variables: Dict[str, str]) -> List[str]:
+    """Split and expand the arguments of a meta-command.
+
+    Args:
+        text: The arguments as written
+        variables: Variables to expand ``:name`` arguments with
+
+    Returns:
+        The arguments, unquoted and with variables expanded; backquoted
+        shell commands are not run and are dropped
+    """
+    arguments = []
+    for match in _ARGUMENT.finditer(text):
+        single, double, bare = match.groups()
+        if single is not None:
+            arguments.append(single.replace("''", "'"))
+        elif double is not None:
+            arguments.append(double.replace('""', '"'))
+        elif bare is not None:
+            if bare.startswith(":") and bare[1:] in variables:
+                arguments.append(variables[bare[1:]])
+            else:
+                arguments.append(bare)
+    return arguments
+
+
+def _blank(text: str) -> str:
+    """Replace everything but line breaks with spaces, keeping the length."""
+    return re.sub(r"[^\n]", " ", text)
+
+
+def blank_copy_data(sql: str) -> str:
+    """Blank out the data of ``COPY ... FROM stdin`` statements.
+
+    Args:
+        sql: The script
+
+    Returns:
+        The script with every data line up to and including ``\\.`` blanked
+    """
+    if "\\." not in sql:
+        return sql
+    parts = []
+    pos = 0
+    for match in _COPY_FROM_STDIN.finditer(sql):
+        if match.start() < pos:
+            continue
+        terminator = _COPY_END.search(sql, match.end())
+        end = len(sql) if terminator is None else terminator.end()
+        parts.append(sql[pos : match.end()])
+        parts.append(_blank(sql[match.end() : end]))
+        pos = end
+    parts.append(sql[pos:])
+    return "".join(parts)
+
+
+def _include_target(
+    command: str, argument: str, variables: Dict[str, str], directory: Optional[Path]
+) -> Optional[Path]:
+    """Return the path of the file an include meta-command includes.
+
+    Args:
+        command: Name of the meta-command, e.g. ``"ir"``
+        argument: Its arguments, as written
+        variables: Variables to expand the arguments with
+        directory: Directory of the script, for ``\\ir``, or None if the
+            script is not on the filesystem
+
+    Returns:
+        Path of the included file, or None if the command names no file or
+        includes are not followed
+    """
+    arguments = _arguments(argument, variables)
+    if not arguments or directory is None:
+        return None
+    target = Path(arguments[0])
+    if not target.is_absolute():
+        target = (directory if command in _RELATIVE_COMMANDS else Path.cwd()) / target
+    return target
+
+
+def find_includes(sql: str) -> List[Tuple[int, str]]:
+    """Find the include meta-commands of a script, without following them.
+
+    Args:
+        sql: The script
+
+    Returns:
+        Offset and text of each include meta-command, in order
+    """
+    if not has_includes(sql):
+        return []
+    return [
+        (event.start, sql[event.start : event.end].strip())
+        for event in _events(blank_copy_data(sql))
+        if event.kind in _INCLUDE_COMMANDS
+    ]
+
+
+def has_includes(sql: str) -> bool:
+    """Check whether a script may include other files.
+
+    The issues of such a script depend on the files it includes, not only on
+    its own contents.
+
+    Args:
+        sql: The script
+
+    Returns:
+        True if the script contains something that looks like an include
+    """
+    return "\\" in sql and _INCLUDE.search(sql) is not None
+
+
+class _Included(NamedTuple):
+    """An included file, as read when it was first included."""
+
+    # Modification time of the file when it was read
+    modified: int
+    # Hash of the file's contents
+    file_hash: str
+    # Contents, with COPY data blanked
+    sql: str
+    # Meta-commands and variable references of `sql`, in order
+    events: List[_Event]
+
+
+class Preprocessor:
+    """Turn psql scripts into plain SQL.
+
+    A preprocessor can be shared between threads; the memo of included files
+    is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        variables: Optional[Dict[str, str]] = None,
+        checked_files: Optional[Iterable[Path]] = None,
+    ):
+        """Initialize a Preprocessor.
+
+        Args:
+            variables: Variables defined before every script, like ``psql -v``
+            checked_files: Files checked in their own right, which are only
+                read for the variables they set when included; every other
+                included file is inlined. None inlines every included file
+        """
+        self.variables = dict(variables or {})
+        self.checked_files: Optional[FrozenSet[Path]] = (
+            frozenset(path.resolve() for path in checked_files)
+            if checked_files is not None
+            else None
+        )
+        self._lock = threading.Lock()
+        self._includes: Dict[Path, _Included] = {}
+
+    def process(self, sql: str, path: Optional[Path] = None) -> PsqlScript:
+        """Preprocess a script.
+
+        Args:
+            sql: The script
+            path: Path the script was read from, used to resolve ``\\ir``;
+                includes of archive members are not followed
+
+        Returns:
+            The plain SQL and the map back to the script's offsets
+        """
+        if "\\" not in sql and not self.variables:
+            return PsqlScript(sql, None)
+
+        directory: Optional[Path] = path.parent if path is not None else Path.cwd()
+        if isinstance(path, MemberPath):
+            directory = None
+        text, offsets = self._process(blank_copy_data(sql), dict(self.variables), directory, 0)
+        return PsqlScript(text, offsets or None)
+
+    def _process(
+        self,
+        text: str,
+        variables: Dict[str, str],
+        directory: Optional[Path],
+        depth: int,
+        events: Optional[Iterable[_Event]] = None,
+    ) -> Tuple[str, OffsetMap]:
+        """Preprocess a script or an included file.
+
+        Args:
+            text: The script, with COPY data blanked
+            variables: The script's variables; updated in place
+            directory: Directory of the script, for ``\\ir``, or None to not
+                follow includes
+            depth: Include depth of the script
+            events: The script's meta-commands and variable references, if
+                already scanned
+
+        Returns:
+            The plain SQL and the map back to the script's offsets
+        """
+        offsets = OffsetMap()
+        parts: List[str] = []
+        pos = 0
+        length = 0
+
+        for event in _events(text) if events is None else events:
+            value: Optional[str] = None
+            if event.kind == ":":
+                value = variables.get(event.argument)
+                if value is None:
+                    # psql leaves references to undefined variables alone
+                    continue
+                if event.quote == "'":
+                    value = _quote_literal(value)
+                elif event.quote == '"':
+                    value = _quote_identifier(value)
+            elif event.kind in _INCLUDE_COMMANDS:
+                target = _include_target(event.kind, event.argument, variables, directory)
+                if target is not None and self._inlines(target):
+                    value = self._inline(target, variables, depth + 1)
+
+            if value is not None:
+                parts.append(text[pos : event.start])
+                length += event.start - pos
+                offsets.add(length, len(value), event.start, event.end - event.start)
+                parts.append(value)
+                length += len(value)
+                pos = event.end
+                continue
+
+            replacement = _blank(text[event.start : event.end])
+            if event.kind in _SEND_COMMANDS:
+                replacement = ";" + replacement[1:]
+            parts.append(text[pos : event.start])
+            parts.append(replacement)
+            length += event.end - pos
+            pos = event.end
+            self._run(event.kind, event.argument, variables, directory, depth)
+
+        parts.append(text[pos:])
+        return "".join(parts), offsets
+
+    def _inlines(self, path: Path) -> bool:
+        """Return True if an included file is inlined rather than checked on its own."""
+        if self.checked_files is None:
+            return True
+        try:
+            return path.resolve() not in self.checked_files
+        except OSError:
+            return True
+
+    def _inline(self, path: Path, variables: Dict[str, str], depth: int) -> str:
+        """Return the plain SQL of an included file.
+
+        Args:
+            path: Path of the included file
+            variables: The including script's variables; updated in place
+            depth: Include depth of the included file
+
+        Returns:
+            The file's SQL, without trailing whitespace, or an empty string if
+            it cannot be read
+        """
+        if depth > MAX_INCLUDE_DEPTH:
+            logger.warning("Not including %s: includes nested too deeply", path)
+            return ""
+        included = self._read(path)
+        if included is None:
+            return ""
+        text, _ = self._process(included.sql, variables, path.parent, depth, included.events)
+        return text.rstrip()
+
+    def _run(
+        self,
+        command: str,
+        argument: str,
+        variables: Dict[str, str],
+        directory: Optional[Path],
+        depth: int,
+    ) -> None:
+        """Apply the effect of a meta-command on the variables.
+
+        Args:
+            command: Name of the meta-command
+            argument: Its arguments, as written
+            variables: The script's variables; updated in place
+            directory: Directory of the script, for ``\\ir``, or None to not
+                follow includes
+            depth: Include depth of the script
+        """
+        if command == "set":
+            arguments = _arguments(argument, variables)
+            if arguments:
+                variables[arguments[0]] = "".join(arguments[1:])
+        elif command == "unset":
+            for name in _arguments(argument, variables)[:1]:
+                variables.pop(name, None)
+        elif command in _INCLUDE_COMMANDS:
+            target = _include_target(command, argument, variables, directory)
+            if target is not None:
+                self._include(target, variables, depth + 1)
+
+    def _include(self, path: Path, variables: Dict[str, str], depth: int) -> None:
+        """Apply the meta-commands of an included file.
+
+        Args:
+            path: Path of the included file
+            variables: The including script's variables; updated in place
+            depth: Include depth of the included file
+        """
+        if depth > MAX_INCLUDE_DEPTH:
+            logger.warning("Not including %s: includes nested too deeply", path)
+            return
+
+        included = self._read(path)
+        for event in included.events if included is not None else ():
+            if event.kind != ":":
+                self._run(event.kind, event.argument, variables, path.parent, depth)
+
+    def _read(self, path: Path) -> Optional[_Included]:
+        """Read and scan an included file, only once unless it changes.
+
+        Args:
+            path: Path of the included file
+
+        Returns:
+            The file's contents and events, or None if it cannot be read
+        """
+        try:
+            resolved = path.resolve()
+            modified = os.stat(resolved).st_mtime_ns
+        except OSError as e:
+            logger.warning("Cannot include %s: %s", path, e)
+            return None
+
+        with self._lock:
+            cached = self._includes.get(resolved)
+        if cached is not None and cached.modified == modified:
+            return cached
+
+        try:
+            raw = resolved.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Cannot include %s: %s", path, e)
+            return None
+        file_hash = content_hash(raw)
+        if cached is not None and cached.file_hash == file_hash:
+            # Touched but unchanged; no need to scan it again
+            included = cached._replace(modified=modified)
+        else:
+            sql = blank_copy_data(raw)
+            included = _Included(modified, file_hash, sql, list(_events(sql)))
+        with self._lock:
+            self._includes[resolved] = included
+        return included
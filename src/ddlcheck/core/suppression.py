@@ -0,0 +1,133 @@
+"""Inline suppression comments.
+
+A comment containing ``ddlcheck:ignore`` silences checks for one statement::
+
+    -- ddlcheck:ignore create_index
+    CREATE INDEX idx_users_email ON users (email);
+
+    TRUNCATE staging_events;  -- ddlcheck:ignore truncate, drop_table
+
+Without a list of check IDs every check is silenced for the statement. A
+comment applies to the statement that follows it, to the statement it is
+inside of, and to a statement that ends on the same line as the comment.
+
+A ``ddlcheck:ignore-file`` comment anywhere in a file skips the whole file.
+
+Comments are extracted once per file from pglast's scanner, and only for
+files that mention ``ddlcheck:`` at all. When the scanner rejects a file, e.g.
+for an unterminated string, comments are found with a regular expression
+instead, so the statements that do parse keep their suppressions.
+"""
+
+import bisect
+import re
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+from pglast.parser import ParseError, scan
+
+# Marker that must appear in a source before it is scanned for suppressions
+MARKER = "ddlcheck:"
+
+# Entry in a suppression set meaning "every check"
+IGNORE_ALL = "*"
+
+_COMMENT_TOKENS = frozenset({"SQL_COMMENT", "C_COMMENT"})
+# Comments, and the string literals that may contain comment-like text
+_FALLBACK_COMMENT = re.compile(r"'(?:[^']|'')*'|(--[^\n]*|/\*.*?(?:\*/|\Z))", re.DOTALL)
+_DIRECTIVE = re.compile(r"ddlcheck:(ignore-file|ignore)\b(?:[ \t]+(\w+(?:[ \t]*,[ \t]*\w+)*))?")
+
+
+class SuppressionIndex:
+    """Suppression comments of one SQL source, indexed by offset."""
+
+    def __init__(self, sql: str):
+        """Scan a SQL source for suppression comments.
+
+        Args:
+            sql: The SQL source
+        """
+        self.sql = sql
+        self.ignore_file = False
+        self._offsets: List[int] = []
+        self._checks: List[FrozenSet[str]] = []
+
+        for start, text in _comments(sql):
+            for directive, check_ids in _DIRECTIVE.findall(text):
+                if directive == "ignore-file":
+                    self.ignore_file = True
+                    continue
+                checks = frozenset(re.split(r"[ \t]*,[ \t]*", check_ids) if check_ids else [])
+                self._offsets.append(start)
+                self._checks.append(checks or frozenset({IGNORE_ALL}))
+
+    def __bool__(self) -> bool:
+        """Return True if the source has any suppression comment."""
+        return self.ignore_file or bool(self._offsets)
+
+    def for_statement(self, previous_end: int, start: int, end: int) -> FrozenSet[str]:
+        """Return the checks suppressed for a statement.
+
+        Args:
+            previous_end: Offset where the previous statement ended, 0 for the
+                first statement
+            start: Offset of the statement's first significant character
+            end: Offset where the statement ends
+
+        Returns:
+            IDs of the suppressed checks, containing :data:`IGNORE_ALL` if
+            every check is suppressed
+        """
+        if not self._offsets:
+            return frozenset()
+
+        # Comments on the line where the previous statement ended belong to it
+        low = min(self._next_line(previous_end), start) if previous_end else 0
+        high = self._next_line(end)
+        first = bisect.bisect_left(self._offsets, low)
+        last = bisect.bisect_left(self._offsets, high)
+        if first == last:
+            return frozenset()
+        return frozenset().union(*self._checks[first:last])
+
+    def _next_line(self, offset: int) -> int:
+        """Return the offset where the line after `offset` starts."""
+        newline = self.sql.find("\n", offset)
+        return len(self.sql) if newline == -1 else newline + 1
+
+
+def _comments(sql: str) -> Iterator[Tuple[int, str]]:
+    """Find the comments of a SQL source.
+
+    Args:
+        sql: The SQL source
+
+    Yields:
+        Offset and text of each comment, in source order
+    """
+    try:
+        tokens = scan(sql)
+    except ParseError:
+        # The parser reports the error; fall back to matching comments by text
+        for match in _FALLBACK_COMMENT.finditer(sql):
+            if match.group(1) is not None:
+                yield match.start(1), match.group(1)
+        return
+
+    for token in tokens:
+        if token.name in _COMMENT_TOKENS:
+            yield token.start, sql[token.start : token.end + 1]
+
+
+def find_suppressions(sql: str) -> Optional[SuppressionIndex]:
+    """Build the suppression index of a source, if it could have one.
+
+    Args:
+        sql: The SQL source
+
+    Returns:
+        The index, or None if the source has no suppression comments
+    """
+    if MARKER not in sql:
+        return None
+    index = SuppressionIndex(sql)
+    return index if index else None
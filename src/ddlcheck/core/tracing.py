@@ -0,0 +1,332 @@
+"""Trace spans of a run, exported as OpenTelemetry OTLP/JSON.
+
+A :class:`Tracer` attached to an :class:`ddlcheck.core.engine.Engine`
+records a span for the run, one for each file checked under it, and under
+each file a ``parse`` and a ``run_checks`` span. Checks run statement by
+statement, interleaved with each other, so the time of each check in a file
+is reported as one aggregated span per check under ``run_checks``: the spans
+are laid end to end from the start of ``run_checks`` and each lasts as long
+as the check ran in total, with the number of calls as an attribute.
+
+When the ``TRACEPARENT`` environment variable holds a W3C trace context, as
+set by a deploy pipeline that traces its steps, the run span joins that
+trace as a child of the caller's span. The spans are written as an OTLP/JSON
+``ExportTraceServiceRequest``, to a file or posted to an OTLP/HTTP collector.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ddlcheck import __version__
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Environment variables carrying the caller's W3C trace context
+TRACEPARENT_ENV = "TRACEPARENT"
+TRACESTATE_ENV = "TRACESTATE"
+
+# Span names
+RUN_SPAN = "ddlcheck check"
+FILE_SPAN = "check_file"
+PARSE_SPAN = "parse"
+CHECKS_SPAN = "run_checks"
+
+# OTLP span kind and status codes
+_KIND_INTERNAL = 1
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+# Seconds to wait for a collector to accept the spans
+EXPORT_TIMEOUT = 10.0
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Parse a W3C ``traceparent`` header.
+
+    Args:
+        value: The header, e.g. ``00-<trace id>-<parent span id>-01``
+
+    Returns:
+        Trace ID and parent span ID as hex, or None if the header is missing
+        or invalid
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, _ = match.groups()
+    if version == "ff" or not int(trace_id, 16) or not int(span_id, 16):
+        return None
+    return trace_id, span_id
+
+
+def _new_id(size: int) -> str:
+    """Return a random, non-zero ID of `size` bytes as hex."""
+    while True:
+        value = os.urandom(size)
+        if any(value):
+            return value.hex()
+
+
+@dataclass
+class Span:
+    """A timed operation of a run."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    # Time and calls of each check run under this span, for run_checks spans
+    checks: Optional[Dict[str, List[int]]] = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Return the span in OTLP/JSON form."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _attributes(self.attributes),
+            "status": (
+                {"code": _STATUS_ERROR, "message": self.error}
+                if self.error is not None
+                else {"code": _STATUS_OK}
+            ),
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _value(value: Any) -> Dict[str, Any]:
+    """Convert an attribute value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert attributes to OTLP KeyValues, skipping unset ones."""
+    return [
+        {"key": key, "value": _value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class Tracer:
+    """Record the spans of a run from any number of threads."""
+
+    def __init__(self, traceparent: Optional[str] = None, tracestate: Optional[str] = None):
+        """Initialize a Tracer.
+
+        Args:
+            traceparent: W3C ``traceparent`` of the caller's span, to nest the
+                run under; a new trace is started without a valid one
+            tracestate: W3C ``tracestate`` passed along with it
+        """
+        parent = parse_traceparent(traceparent)
+        if traceparent and parent is None:
+            logger.warning("Ignoring invalid traceparent %r", traceparent)
+        self.trace_id, self.parent_id = parent if parent else (_new_id(16), None)
+        self.tracestate = tracestate if parent else None
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "Tracer":
+        """Create a Tracer joining the trace in ``TRACEPARENT``, if set."""
+        return cls(os.environ.get(TRACEPARENT_ENV), os.environ.get(TRACESTATE_ENV))
+
+    def _stack(self) -> List[Span]:
+        """Return the calling thread's stack of open spans."""
+        stack: Optional[List[Span]] = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        """Return the innermost open span of the calling thread, or the run span."""
+        stack = self._stack()
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Record the body of a ``with`` block as a span.
+
+        The span's parent is the calling thread's innermost open span, or the
+        run span in threads without one.
+
+        Args:
+            name: Name of the span
+            **attributes: Attributes of the span; more can be set on the
+                yielded span
+
+        Yields:
+            The open span
+        """
+        parent = self.current()
+        span = Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=_new_id(8),
+            parent_id=parent.span_id if parent is not None else self.parent_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            self._finish(span)
+
+    @contextmanager
+    def run(self, **attributes: Any) -> Iterator[Span]:
+        """Record the whole run as the span every other span nests under.
+
+        Args:
+            **attributes: Attributes of the run span
+
+        Yields:
+            The run span
+        """
+        with self.span(RUN_SPAN, **attributes) as span:
+            self.root = span
+            try:
+                yield span
+            finally:
+                self.root = None
+
+    @contextmanager
+    def checks(self) -> Iterator[Span]:
+        """Record running the checks on a source, with a span per check.
+
+        Yields:
+            The open ``run_checks`` span; :meth:`add_check` adds to it
+        """
+        with self.span(CHECKS_SPAN) as span:
+            span.checks = {}
+            yield span
+
+    def add_check(self, check_id: str, ns: int) -> None:
+        """Record time spent in a check under the calling thread's ``run_checks`` span.
+
+        Args:
+            check_id: ID of the check
+            ns: Duration in nanoseconds
+        """
+        stack = self._stack()
+        span = stack[-1] if stack else None
+        if span is None or span.checks is None:
+            return
+        totals = span.checks.get(check_id)
+        if totals is None:
+            span.checks[check_id] = [ns, 1]
+        else:
+            totals[0] += ns
+            totals[1] += 1
+
+    def _finish(self, span: Span) -> None:
+        """End a span and record it, with the aggregated spans of its checks."""
+        span.end_ns = time.time_ns()
+        finished = [span]
+        start = span.start_ns
+        for check_id, (ns, calls) in (span.checks or {}).items():
+            finished.append(
+                Span(
+                    name=check_id,
+                    trace_id=self.trace_id,
+                    span_id=_new_id(8),
+                    parent_id=span.span_id,
+                    start_ns=start,
+                    end_ns=start + ns,
+                    attributes={
+                        "ddlcheck.check_id": check_id,
+                        "ddlcheck.calls": calls,
+                        "ddlcheck.aggregated": True,
+                    },
+                )
+            )
+            start += ns
+        span.checks = None
+        with self._lock:
+            self.spans.extend(finished)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Build an OTLP/JSON ``ExportTraceServiceRequest`` of the recorded spans.
+
+        Returns:
+            JSON-serializable request
+        """
+        with self._lock:
+            spans = [span.to_otlp() for span in self.spans]
+        if self.tracestate:
+            for span in spans:
+                if span.get("parentSpanId") == self.parent_id:
+                    span["traceState"] = self.tracestate
+        resource = {"service.name": "ddlcheck", "service.version": __version__}
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes(resource)},
+                    "scopeSpans": [
+                        {"scope": {"name": "ddlcheck", "version": __version__}, "spans": spans}
+                    ],
+                }
+            ]
+        }
+
+    def export(self, destination: str) -> None:
+        """Write the spans to a file, or post them to an OTLP/HTTP collector.
+
+        Args:
+            destination: Path of a file to write, or the ``http://`` or
+                ``https://`` URL of a collector's traces endpoint, e.g.
+                ``http://localhost:4318/v1/traces``
+
+        Raises:
+            OSError: If the file cannot be written or the collector cannot be
+                reached or refuses the spans
+        """
+        body = json.dumps(self.to_otlp()).encode("utf-8")
+        if destination.startswith(("http://", "https://")):
+            request = urllib.request.Request(
+                destination, data=body, headers={"Content-Type": "application/json"}
+            )
+            with urllib.request.urlopen(request, timeout=EXPORT_TIMEOUT):
+                pass
+        else:
+            # One request per line, as written by the collector's file exporter
+            with open(destination, "wb") as f:
+                f.write(body + b"\n")
+        logger.debug("Exported %d spans to %s", len(self.spans), destination)
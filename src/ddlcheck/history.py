@@ -0,0 +1,477 @@
+"""SQLite store of past runs, used for trend queries and to reuse results.
+
+Every file checked during a run is recorded with the hash of its contents, and
+every issue found in it with its check, severity and location. Rows are
+buffered and written in batched transactions so recording stays cheap even
+for runs over hundreds of thousands of files.
+
+Results are keyed by file hash and by :meth:`Engine.fingerprint`, so a later
+run with the same checks, options and baseline can reuse the issues of any
+file whose contents have not changed instead of parsing it again. The SQL
+extracted from Python migrations does not depend on the checks at all, so it
+is reused by every later run.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+from rich.table import Table
+
+from ddlcheck import __version__
+from ddlcheck.models import Issue, SeverityLevel, serialize_context
+from ddlcheck.reporters.text import format_severity
+
+if TYPE_CHECKING:
+    from ddlcheck.core.migrations import SQLFragment
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    root TEXT NOT NULL,
+    version TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    files_checked INTEGER,
+    files_reused INTEGER,
+    issue_count INTEGER,
+    stop_reason TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    path TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    issue_count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+CREATE INDEX IF NOT EXISTS files_by_hash ON files (file_hash);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    path TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    "column" INTEGER,
+    message TEXT NOT NULL,
+    suggestion TEXT,
+    context TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_by_run ON issues (run_id, path);
+CREATE INDEX IF NOT EXISTS issues_by_check ON issues (check_id, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_hash ON issues (file_hash);
+CREATE TABLE IF NOT EXISTS extractions (
+    file_hash TEXT PRIMARY KEY,
+    fragments TEXT NOT NULL
+);
+"""
+
+# Number of buffered file and issue rows that triggers a write
+DEFAULT_BATCH_SIZE = 1000
+
+FileRow = Tuple[int, str, str, int]
+IssueRow = Tuple[int, str, str, str, str, int, Optional[int], str, Optional[str], str]
+
+
+def content_hash(sql: str) -> str:
+    """Hash the contents of a SQL file.
+
+    Args:
+        sql: The SQL source
+
+    Returns:
+        Hex SHA-256 digest of the UTF-8 encoded source
+    """
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RunRecord:
+    """One run stored in the history."""
+
+    id: int
+    started_at: str
+    finished_at: Optional[str]
+    root: str
+    files_checked: Optional[int]
+    files_reused: Optional[int]
+    issue_count: Optional[int]
+    stop_reason: Optional[str]
+
+
+class HistoryStore:
+    """Record runs and their issues in a SQLite database.
+
+    The store is safe to share between pipeline worker threads: all database
+    access goes through a single connection guarded by a lock.
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Open (and create if needed) a history database.
+
+        Args:
+            path: Path to the SQLite database
+            batch_size: Number of buffered rows written per transaction
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.run_id: Optional[int] = None
+        self.files_reused = 0
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._file_rows: List[FileRow] = []
+        self._issue_rows: List[IssueRow] = []
+        self._extraction_rows: List[Tuple[str, str]] = []
+        # file hash -> (run id, path, issue count) of its latest stored result
+        self._known: Dict[str, Tuple[int, str, int]] = {}
+
+    def start_run(self, root: Union[str, Path], signature: str) -> int:
+        """Record the start of a run.
+
+        Args:
+            root: Path the run was started on
+            signature: Fingerprint of the engine, see :meth:`Engine.fingerprint`
+
+        Returns:
+            ID of the new run
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started_at, root, version, signature) VALUES (?, ?, ?, ?)",
+                (_now(), str(root), __version__, signature),
+            )
+            self.run_id = cursor.lastrowid
+            rows = self._connection.execute(
+                "SELECT f.file_hash, f.run_id, f.path, f.issue_count FROM files f "
+                "JOIN runs r ON r.id = f.run_id WHERE r.signature = ? ORDER BY f.run_id",
+                (signature,),
+            )
+            self._known = {row[0]: (row[1], row[2], row[3]) for row in rows}
+        self.files_reused = 0
+        logger.debug("Started run %d with %d reusable results", self.run_id, len(self._known))
+        return self.run_id  # type: ignore[return-value]
+
+    def lookup(self, file_hash: str) -> Optional[List[Issue]]:
+        """Return the issues stored for unchanged file contents.
+
+        Args:
+            file_hash: Hash of the file contents, see :func:`content_hash`
+
+        Returns:
+            The stored issues, or None if the contents were never checked with
+            the same engine fingerprint
+        """
+        known = self._known.get(file_hash)
+        if known is None:
+            return None
+        run_id, path, issue_count = known
+        with self._lock:
+            self.files_reused += 1
+            if not issue_count:
+                return []
+            rows = self._connection.execute(
+                'SELECT check_id, severity, line, "column", message, suggestion, context '
+                "FROM issues WHERE run_id = ? AND path = ?",
+                (run_id, path),
+            ).fetchall()
+        return [
+            Issue(
+                check_id=check_id,
+                message=message,
+                line=line,
+                severity=SeverityLevel(severity),
+                suggestion=suggestion,
+                context=json.loads(context) or None,
+                column=column,
+            )
+            for check_id, severity, line, column, message, suggestion, context in rows
+        ]
+
+    def record(self, path: Path, file_hash: str, issues: Sequence[Issue]) -> None:
+        """Buffer a checked file and its issues for the current run.
+
+        Args:
+            path: Path of the file
+            file_hash: Hash of the file contents
+            issues: Issues found in the file
+        """
+        if self.run_id is None:
+            raise RuntimeError("start_run() must be called before recording results")
+        run_id, name = self.run_id, str(path)
+        issue_rows = [
+            (
+                run_id,
+                name,
+                file_hash,
+                issue.check_id,
+                issue.severity.value,
+                issue.line,
+                issue.column,
+                issue.message,
+                issue.suggestion,
+                json.dumps(serialize_context(issue.context)),
+            )
+            for issue in issues
+        ]
+        with self._lock:
+            self._file_rows.append((run_id, name, file_hash, len(issue_rows)))
+            self._issue_rows.extend(issue_rows)
+            if len(self._file_rows) + len(self._issue_rows) >= self.batch_size:
+                self._flush()
+
+    def get_fragments(self, file_hash: str) -> Optional[List["SQLFragment"]]:
+        """Return the SQL extracted from a Python migration in an earlier run.
+
+        Args:
+            file_hash: Hash of the file contents
+
+        Returns:
+            The extracted fragments, or None if the contents were never seen
+        """
+        from ddlcheck.core.migrations import SQLFragment
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fragments FROM extractions WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return [SQLFragment(*fragment) for fragment in json.loads(row[0])]
+
+    def put_fragments(self, file_hash: str, fragments: List["SQLFragment"]) -> None:
+        """Buffer the SQL extracted from a Python migration for later runs.
+
+        Args:
+            file_hash: Hash of the file contents
+            fragments: The extracted fragments
+        """
+        row = (file_hash, json.dumps([list(fragment) for fragment in fragments]))
+        with self._lock:
+            self._extraction_rows.append(row)
+            if len(self._extraction_rows) >= self.batch_size:
+                self._flush()
+
+    def finish_run(
+        self, files_checked: int, issue_count: int, stop_reason: Optional[str] = None
+    ) -> None:
+        """Write any buffered rows and the run's totals.
+
+        Args:
+            files_checked: Number of files checked
+            issue_count: Number of issues reported
+            stop_reason: Why the run stopped early, if it did
+        """
+        with self._lock:
+            self._flush()
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE runs SET finished_at = ?, files_checked = ?, files_reused = ?, "
+                    "issue_count = ?, stop_reason = ? WHERE id = ?",
+                    (
+                        _now(),
+                        files_checked,
+                        self.files_reused,
+                        issue_count,
+                        stop_reason,
+                        self.run_id,
+                    ),
+                )
+
+    def close(self) -> None:
+        """Write any buffered rows and close the database."""
+        with self._lock:
+            self._flush()
+        self._connection.close()
+
+    def __enter__(self) -> "HistoryStore":
+        """Return the store for use as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the store."""
+        self.close()
+
+    def runs(self, limit: int = 20, root: Optional[str] = None) -> List[RunRecord]:
+        """Return the most recent runs, oldest first.
+
+        Args:
+            limit: Maximum number of runs to return
+            root: Only return runs started on this path
+
+        Returns:
+            The runs
+        """
+        where, params = ("WHERE root = ?", [root]) if root is not None else ("", [])
+        rows = self._connection.execute(
+            "SELECT id, started_at, finished_at, root, files_checked, files_reused, "
+            f"issue_count, stop_reason FROM runs {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [RunRecord(*row) for row in reversed(rows)]
+
+    def check_counts(self, run_ids: Sequence[int]) -> Dict[str, Dict[int, int]]:
+        """Count issues per check for each of several runs.
+
+        Args:
+            run_ids: Runs to count issues for
+
+        Returns:
+            Mapping of check ID to a mapping of run ID to issue count
+        """
+        counts: Dict[str, Dict[int, int]] = {}
+        if not run_ids:
+            return counts
+        placeholders = ", ".join("?" for _ in run_ids)
+        rows = self._connection.execute(
+            "SELECT check_id, run_id, COUNT(*) FROM issues "
+            f"WHERE run_id IN ({placeholders}) GROUP BY check_id, run_id",
+            tuple(run_ids),
+        )
+        for check_id, run_id, count in rows:
+            counts.setdefault(check_id, {})[run_id] = count
+        return counts
+
+    def new_issues(self, run_id: int, base_run_id: int) -> List[Tuple[str, int, str, str, str]]:
+        """Return the issues of a run that did not occur in an earlier run.
+
+        Issues are matched on file path, check and message, so an issue that
+        merely moved to another line is not reported as new.
+
+        Args:
+            run_id: The run to look for regressions in
+            base_run_id: The run to compare against
+
+        Returns:
+            Tuples of path, line, check ID, severity and message
+        """
+        return self._connection.execute(
+            "SELECT path, line, check_id, severity, message FROM issues i WHERE run_id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM issues b WHERE b.run_id = ? AND b.path = i.path "
+            "AND b.check_id = i.check_id AND b.message = i.message) ORDER BY path, line",
+            (run_id, base_run_id),
+        ).fetchall()
+
+    def _flush(self) -> None:
+        """Write buffered rows in one transaction; the caller holds the lock."""
+        if not self._file_rows and not self._issue_rows and not self._extraction_rows:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?)", self._extraction_rows
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", self._file_rows
+            )
+            self._connection.executemany(
+                "INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._issue_rows
+            )
+        logger.debug(
+            "Wrote %d files and %d issues to %s",
+            len(self._file_rows),
+            len(self._issue_rows),
+            self.path,
+        )
+        self._file_rows = []
+        self._issue_rows = []
+        self._extraction_rows = []
+
+
+def runs_table(runs: Sequence[RunRecord]) -> Table:
+    """Build the table of recorded runs and how their issue counts changed.
+
+    Args:
+        runs: Runs to list, oldest first
+
+    Returns:
+        The table
+    """
+    table = Table(title="Runs", show_header=True, header_style="bold")
+    for column in ("Run", "Started", "Root", "Files", "Reused", "Issues", "Change"):
+        justify = "left" if column in ("Started", "Root") else "right"
+        table.add_column(column, justify=justify)
+    previous: Optional[int] = None
+    for run in runs:
+        change = ""
+        if previous is not None and run.issue_count is not None:
+            change = f"{run.issue_count - previous:+d}"
+        table.add_row(
+            str(run.id),
+            run.started_at,
+            run.root,
+            _count(run.files_checked),
+            _count(run.files_reused),
+            _count(run.issue_count),
+            change + (" (partial)" if run.stop_reason else ""),
+        )
+        if run.issue_count is not None:
+            previous = run.issue_count
+    return table
+
+
+def check_counts_table(store: HistoryStore, runs: Sequence[RunRecord]) -> Table:
+    """Build the table of issue counts per check in each of several runs.
+
+    Args:
+        store: Store the runs were recorded in
+        runs: Runs to count issues for, oldest first
+
+    Returns:
+        The table
+    """
+    counts = store.check_counts([run.id for run in runs])
+    table = Table(title="Issues by check", show_header=True, header_style="bold")
+    table.add_column("Check")
+    for run in runs:
+        table.add_column(f"Run {run.id}", justify="right")
+    for check_id in sorted(counts):
+        table.add_row(check_id, *(str(counts[check_id].get(run.id, 0)) for run in runs))
+    return table
+
+
+def new_issues_table(store: HistoryStore, run: RunRecord, base: RunRecord) -> Optional[Table]:
+    """Build the table of issues in a run that did not occur in an earlier run.
+
+    Args:
+        store: Store the runs were recorded in
+        run: The run to look for regressions in
+        base: The run to compare against
+
+    Returns:
+        The table, or None if the run has no new issues
+    """
+    new = store.new_issues(run.id, base.id)
+    if not new:
+        return None
+    table = Table(
+        title=f"New issues in run {run.id} since run {base.id}",
+        show_header=True,
+        header_style="bold",
+    )
+    for column in ("File", "Line", "Check", "Severity", "Message"):
+        table.add_column(column)
+    for file_path, line, check_id, severity, message in new:
+        table.add_row(
+            file_path, str(line), check_id, format_severity(SeverityLevel(severity)), message
+        )
+    return table
+
+
+def _count(value: Optional[int]) -> str:
+    """Format a count of a run, which is missing if the run did not finish."""
+    return str(value) if value is not None else "-"
+
+
+def _now() -> str:
+    """Return the current UTC time in ISO 8601 format."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
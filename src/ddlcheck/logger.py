@@ -1,20 +1,129 @@
-"""Logging configuration for ddlcheck."""
+"""Logging configuration for ddlcheck.
 
+Log records are put on a queue by a :class:`logging.handlers.QueueHandler`
+on the root logger, and a :class:`logging.handlers.QueueListener` thread
+writes them to the console and the log file, so the threads checking files
+never wait on log I/O. Records are written as text, or as JSON lines whose
+fields, including any passed with ``extra=``, can be queried with tools like
+``jq``.
+"""
+
+import atexit
+import copy
+import enum
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
+
+
+class LogFormat(str, enum.Enum):
+    """Formats log records can be written in."""
+
+    TEXT = "text"
+    JSON = "json"
+
+
+# Attributes every LogRecord has; any others were passed with extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+# Listener writing queued records, while logging is set up
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one line of JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+
+        Args:
+            record: The record
+
+        Returns:
+            JSON object with the time, level, logger, thread and message of the
+            record, its exception if any and the fields passed with ``extra=``
+        """
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in data:
+                data[key] = value
+        return json.dumps(data, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """Queue records with their message merged but without formatting them.
+
+    The stock handler formats the whole record in the logging thread, which
+    would lose the fields the JSON formatter writes; merging the message and
+    rendering the traceback is enough to make the record safe to queue.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare a record for the queue.
 
-def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None) -> None:
+        Args:
+            record: The record
+
+        Returns:
+            A copy whose arguments are merged into its message
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+def stop_logging() -> None:
+    """Write any queued records and stop the thread writing them."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_file: Optional[Path] = None,
+    log_format: LogFormat = LogFormat.TEXT,
+) -> None:
     """Set up logging configuration.
 
     Args:
         log_level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file to log to
+        log_format: Format of the records written to the console and the file
     """
+    global _listener
+
     # Convert string log level to logging constant
     numeric_level = getattr(logging, log_level.upper(), None)
     if not isinstance(numeric_level, int):
@@ -24,22 +133,25 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None) -> N
     root_logger = logging.getLogger()
     root_logger.setLevel(numeric_level)
 
-    # Remove existing handlers
+    # Remove existing handlers, writing out what a previous setup queued
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    stop_logging()
+
+    # Create formatter
+    formatter: logging.Formatter
+    if log_format == LogFormat.JSON:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        )
 
     # Create console handler
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setLevel(numeric_level)
-
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-    )
     console_handler.setFormatter(formatter)
-
-    # Add console handler to logger
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # If log file is provided, add file handler
     if log_file:
@@ -49,12 +161,21 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None) -> N
         )
         file_handler.setLevel(numeric_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Hand records to a background thread that writes them to the handlers
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root_logger.addHandler(_QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
 
     # Set pglast logging level to WARNING by default
     logging.getLogger("pglast").setLevel(logging.WARNING)
 
     # Log that logging is set up
-    root_logger.debug(f"Logging configured with level: {log_level}")
+    root_logger.debug("Logging configured with level: %s", log_level)
     if log_file:
-        root_logger.debug(f"Log file: {log_file}")
+        root_logger.debug("Log file: %s", log_file)
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,190 @@
+"""Prometheus metrics of a run, written as a node_exporter textfile.
+
+``ddlcheck check --metrics-file`` writes the totals of a run (files,
+statements, characters, parse errors and issues by check and severity), the
+share of results reused from the history, how busy the workers were, and
+histograms of the time spent per phase, per check and per file, in the
+Prometheus text exposition format.
+
+The file is written to a temporary file next to it and renamed into place, so
+the node_exporter textfile collector never reads half a file.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ddlcheck.core.profiling import BUCKETS_NS, Timer, Timings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PREFIX = "ddlcheck_"
+
+# Label names and values of one sample
+Labels = Sequence[Tuple[str, str]]
+
+
+@dataclass
+class RunMetrics:
+    """Totals and timings of a run."""
+
+    files_checked: int
+    statements_parsed: int
+    characters_checked: int
+    parse_errors: int
+    duration_seconds: float
+    workers: int
+    partial: bool
+    # Issues per (check ID, severity)
+    issues: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    # Files whose results were reused from the history; None without a history
+    files_reused: Optional[int] = None
+    timings: Optional[Timings] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, integers without a fraction."""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Exposition:
+    """Lines of a text exposition, grouped by metric family."""
+
+    def __init__(self) -> None:
+        """Initialize an empty exposition."""
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        """Start a metric family."""
+        self.lines.append(f"# HELP {PREFIX}{name} {help_text}")
+        self.lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    def sample(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Add a sample to the current family."""
+        label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+        label_text = f"{{{label_text}}}" if label_text else ""
+        self.lines.append(f"{PREFIX}{name}{label_text} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, value: float) -> None:
+        """Add a family with a single unlabelled gauge."""
+        self.family(name, "gauge", help_text)
+        self.sample(name, value)
+
+    def histogram(self, name: str, timer: Timer, labels: Labels = ()) -> None:
+        """Add a timer's durations, in seconds, as a histogram."""
+        cumulative = 0
+        for bound, count in zip(BUCKETS_NS, timer.buckets):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, (*labels, ("le", repr(bound / 1e9))))
+        self.sample(f"{name}_bucket", timer.count, (*labels, ("le", "+Inf")))
+        self.sample(f"{name}_sum", timer.total_ns / 1e9, labels)
+        self.sample(f"{name}_count", timer.count, labels)
+
+
+def render(metrics: RunMetrics) -> str:
+    """Render the metrics of a run in the Prometheus text exposition format.
+
+    Args:
+        metrics: Metrics of the run
+
+    Returns:
+        The exposition, ending with a newline
+    """
+    out = _Exposition()
+    out.gauge("files_checked", "Files checked by the last run.", metrics.files_checked)
+    out.gauge(
+        "statements_parsed", "SQL statements parsed by the last run.", metrics.statements_parsed
+    )
+    out.gauge(
+        "characters_checked",
+        "Characters of SQL and Python source checked by the last run.",
+        metrics.characters_checked,
+    )
+    out.gauge("parse_errors", "Statements the last run could not parse.", metrics.parse_errors)
+
+    out.family("issues", "gauge", "Issues found by the last run, by check and severity.")
+    for (check_id, severity), count in sorted(metrics.issues.items()):
+        out.sample("issues", count, (("check_id", check_id), ("severity", severity)))
+
+    if metrics.files_reused is not None:
+        ratio = metrics.files_reused / metrics.files_checked if metrics.files_checked else 0.0
+        out.gauge(
+            "history_hit_ratio",
+            "Share of the files checked whose results were reused from the history.",
+            ratio,
+        )
+
+    out.gauge(
+        "run_duration_seconds", "Wall-clock duration of the last run.", metrics.duration_seconds
+    )
+    out.gauge("workers", "Worker threads of the last run.", metrics.workers)
+    out.gauge(
+        "run_partial", "1 if the last run stopped before checking every file.", int(metrics.partial)
+    )
+    out.gauge(
+        "last_run_timestamp_seconds",
+        "Unix time the last run finished at.",
+        round(metrics.timestamp, 3),
+    )
+
+    timings = metrics.timings
+    if timings is not None:
+        busy = metrics.duration_seconds * metrics.workers
+        out.gauge(
+            "worker_utilization",
+            "Share of the workers' time spent checking files.",
+            min(1.0, timings.file_time.total_ns / 1e9 / busy) if busy else 0.0,
+        )
+        out.family(
+            "phase_duration_seconds", "histogram", "Time spent in each phase of the last run."
+        )
+        for name, timer in sorted(timings.phases.items()):
+            out.histogram("phase_duration_seconds", timer, (("phase", name),))
+        out.family(
+            "check_duration_seconds", "histogram", "Time spent in each check of the last run."
+        )
+        for name, timer in sorted(timings.checks.items()):
+            out.histogram("check_duration_seconds", timer, (("check_id", name),))
+        out.family("file_duration_seconds", "histogram", "Time spent checking each file.")
+        out.histogram("file_duration_seconds", timings.file_time)
+
+    return "\n".join(out.lines) + "\n"
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """Replace a file atomically with new contents.
+
+    Args:
+        path: Path of the file
+        text: New contents
+    """
+    directory = path.parent
+    fd, temporary = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+    logger.debug("Wrote metrics to %s", path)
@@ -2,9 +2,10 @@
 
 import enum
 import logging
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import toml
 
@@ -12,30 +13,223 @@ logger = logging.getLogger(__name__)
 
 
 class SeverityLevel(enum.Enum):
-    """Severity level for issues."""
+    """Severity level for issues.
 
+    Levels are ordered from least to most severe, so they can be compared
+    against a threshold: ``INFO < LOW < MEDIUM < HIGH``.
+    """
+
+    INFO = "INFO"
     LOW = "LOW"
     MEDIUM = "MEDIUM"
     HIGH = "HIGH"
-    INFO = "INFO"
+
+    @property
+    def rank(self) -> int:
+        """Return the position of this level, from 0 for the least severe."""
+        return _SEVERITY_RANKS[self]
+
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, SeverityLevel):
+            return NotImplemented
+        return self.rank < other.rank
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, SeverityLevel):
+            return NotImplemented
+        return self.rank <= other.rank
+
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, SeverityLevel):
+            return NotImplemented
+        return self.rank > other.rank
+
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, SeverityLevel):
+            return NotImplemented
+        return self.rank >= other.rank
+
+
+_SEVERITY_RANKS = {level: rank for rank, level in enumerate(SeverityLevel)}
+
+
+def serialize_context(context: Any) -> Dict[str, Any]:
+    """Convert an issue's context into a JSON-compatible dict.
+
+    Checks normally provide a dict, but older custom checks may pass a plain
+    string; that is kept under a ``detail`` key so every consumer sees a dict.
+
+    Args:
+        context: The context attached to an issue
+
+    Returns:
+        Dict with JSON-compatible values
+    """
+    if context is None:
+        return {}
+    if not isinstance(context, dict):
+        return {"detail": str(context)}
+    return {str(key): _serialize_value(value) for key, value in context.items()}
+
+
+def _serialize_value(value: Any) -> Any:
+    """Convert a context value into a JSON-compatible value.
+
+    Args:
+        value: Value to convert
+
+    Returns:
+        The value itself for JSON scalars, a list for sequences and sets,
+        a dict for mappings and its string form otherwise
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return serialize_context(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_serialize_value(item) for item in value]
+    return str(value)
 
 
-@dataclass
 class Issue:
-    """Issue found by a check."""
+    """Issue found by a check.
+
+    Large audits create millions of issues, so issues are kept compact: they
+    are slotted, check IDs and short context strings are interned, a dict
+    context is stored as a tuple of items.
+    """
+
+    __slots__ = (
+        "check_id",
+        "message",
+        "line",
+        "severity",
+        "suggestion",
+        "_context",
+        "column",
+        "fingerprint",
+    )
+
+    def __init__(
+        self,
+        check_id: str,
+        message: str,
+        line: int,
+        severity: SeverityLevel,
+        suggestion: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        column: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+    ):
+        """Initialize an Issue.
 
-    check_id: str
-    message: str
-    line: int
-    severity: SeverityLevel
-    suggestion: Optional[str] = None
-    context: Optional[Dict[str, Any]] = None
+        Args:
+            check_id: ID of the check that found the issue
+            message: Description of the issue
+            line: Line where the offending statement begins
+            severity: Severity of the issue
+            suggestion: Suggestion to fix the issue
+            context: Additional details, such as the affected table
+            column: Column where the offending statement begins
+            fingerprint: Stable identifier of the issue that does not depend on
+                its line, set by the engine when a baseline is in use
+        """
+        self.check_id = sys.intern(check_id)
+        self.message = message
+        self.line = line
+        self.severity = severity
+        self.suggestion = suggestion
+        self.context = context
+        self.column = column
+        self.fingerprint = fingerprint
+
+    @property
+    def context(self) -> Optional[Dict[str, Any]]:
+        """Return the issue's context as a new dict (or the legacy string form)."""
+        if isinstance(self._context, tuple):
+            return dict(self._context)
+        return self._context
+
+    @context.setter
+    def context(self, value: Optional[Dict[str, Any]]) -> None:
+        self._context = _compact_context(value) if isinstance(value, dict) else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the issue into a JSON-compatible dict.
+
+        Returns:
+            Dict with the issue's location, check, severity, message,
+            suggestion and serialized context
+        """
+        return {
+            "line": self.line,
+            "column": self.column,
+            "check_id": self.check_id,
+            "severity": self.severity.value,
+            "message": self.message,
+            "suggestion": self.suggestion,
+            "context": serialize_context(self.context),
+        }
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (
+            self.check_id,
+            self.message,
+            self.line,
+            self.severity,
+            self.suggestion,
+            self.context,
+            self.column,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare issues field by field."""
+        if not isinstance(other, Issue):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None  # type: ignore[assignment]
 
     def __repr__(self) -> str:
         """Return string representation of Issue."""
         return f"Issue(check_id='{self.check_id}', line={self.line}, severity={self.severity.name})"
 
 
+def _compact_context(context: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Convert an issue context into its compact stored form.
+
+    Table and column names repeat across many issues, so short strings are
+    interned to share one copy of each, and lists become tuples.
+
+    Args:
+        context: The context attached to an issue
+
+    Returns:
+        Tuple of ``(key, value)`` items
+    """
+    return tuple((sys.intern(key), _compact_value(value)) for key, value in context.items())
+
+
+def _compact_value(value: Any) -> Any:
+    """Intern a short string, or the short strings in a list.
+
+    Args:
+        value: A context value
+
+    Returns:
+        The value, interned or converted to a tuple where possible
+    """
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= _MAX_INTERNED_LENGTH else value
+    if isinstance(value, list):
+        return tuple(_compact_value(item) for item in value)
+    return value
+
+
+# Longest context string worth interning; identifiers are at most 63 bytes
+_MAX_INTERNED_LENGTH = 64
+
+
 @dataclass
 class Config:
     """Configuration for DDLCheck."""
@@ -90,18 +284,18 @@ class Config:
                     try:
                         config.severity_overrides[check_id] = SeverityLevel[level.upper()]
                     except (KeyError, AttributeError):
-                        logger.warning(f"Invalid severity level for {check_id}: {level}")
+                        logger.warning("Invalid severity level for %s: %s", check_id, level)
 
             # Any remaining keys are assumed to be check-specific configs
             for check_id, check_config in config_data.items():
                 if isinstance(check_config, dict):
                     config.check_config[check_id] = check_config
                 else:
-                    logger.warning(f"Invalid config format for check {check_id}, expected dict")
+                    logger.warning("Invalid config format for check %s, expected dict", check_id)
 
-            logger.debug(f"Loaded configuration from {config_path}")
+            logger.debug("Loaded configuration from %s", config_path)
         except Exception as e:
-            logger.warning(f"Error loading config file: {e}")
+            logger.warning("Error loading config file: %s", e)
 
         return config
 
@@ -140,7 +334,9 @@ class Config:
 
 
 class CheckResult:
-    """Result of running a check on a SQL file."""
+    """Result of running checks on a SQL file."""
+
+    __slots__ = ("file_path", "issues")
 
     def __init__(self, file_path: Path, issues: Optional[List[Issue]] = None):
         """Initialize a CheckResult.
@@ -0,0 +1,185 @@
+"""Progress of a long check run, shown as files are checked.
+
+:class:`RunProgress` is advanced by the pipeline's workers as each file is
+checked, with or without issues, and redraws at most every
+:data:`LIVE_INTERVAL` seconds, so a run over many small files spends no
+measurable time on it. On a terminal it draws a rich
+progress bar; elsewhere, as in CI logs, it prints a plain line every
+:data:`PLAIN_INTERVAL` seconds. Either shows the files and megabytes done,
+the throughput, the estimated time left and the issues found so far.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn
+
+from ddlcheck.core.archives import is_archive
+from ddlcheck.models import CheckResult, SeverityLevel
+
+# Seconds between two redraws of the progress bar
+LIVE_INTERVAL = 0.1
+
+# Seconds between two plain progress lines
+PLAIN_INTERVAL = 10.0
+
+_MB = 1024 * 1024
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration compactly, e.g. ``"1h02m"``, ``"3m05s"`` or ``"42s"``.
+
+    Args:
+        seconds: The duration
+
+    Returns:
+        The formatted duration
+    """
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class RunProgress:
+    """Show how far a run has got.
+
+    :meth:`advance` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Path],
+        console: Console,
+        live: bool,
+        interval: Optional[float] = None,
+    ):
+        """Initialize a RunProgress.
+
+        Args:
+            paths: Files the run checks
+            console: Console to draw on
+            live: Draw a progress bar rather than printing plain lines
+            interval: Seconds between two updates (default: :data:`LIVE_INTERVAL`
+                for a bar, :data:`PLAIN_INTERVAL` for plain lines)
+        """
+        self.console = console
+        self.live = live
+        if interval is None:
+            interval = LIVE_INTERVAL if live else PLAIN_INTERVAL
+        self.interval = interval
+        self._sizes: Dict[Path, int] = {}
+        for path in paths:
+            try:
+                self._sizes[path] = os.stat(path).st_size
+            except OSError:
+                continue
+        # Archives hold an unknown number of files, so their progress has no total
+        self.total_files: Optional[int] = (
+            None if any(is_archive(path) for path in paths) else len(paths)
+        )
+        self.total_bytes = sum(self._sizes.values())
+        self.files = 0
+        self.bytes = 0
+        self.issues: Dict[SeverityLevel, int] = {}
+        self._started = self._last = time.monotonic()
+        self._bar: Optional[Progress] = None
+        self._task = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the clock and, for a progress bar, draw it."""
+        self._started = self._last = time.monotonic()
+        if self.live:
+            self._bar = Progress(
+                BarColumn(),
+                TextColumn("{task.description}"),
+                console=self.console,
+                auto_refresh=False,
+                transient=True,
+            )
+            self._bar.start()
+            self._task = self._bar.add_task(self.line(), total=self.total_files)
+
+    def advance(self, result: CheckResult) -> None:
+        """Count a checked file, and redraw if it is time to.
+
+        Args:
+            result: Result of the file
+        """
+        with self._lock:
+            self.files += 1
+            self.bytes += self._sizes.get(result.file_path, 0)
+            for issue in result.issues:
+                self.issues[issue.severity] = self.issues.get(issue.severity, 0) + 1
+            now = time.monotonic()
+            if now - self._last >= self.interval:
+                self._last = now
+                self.update(now)
+
+    def update(self, now: Optional[float] = None) -> None:
+        """Redraw the progress bar, or print a progress line."""
+        line = self.line(now)
+        if self._bar is not None:
+            self._bar.update(self._task, completed=self.files, description=line)
+            self._bar.refresh()
+        else:
+            self.console.print(line, highlight=False, markup=False)
+
+    def finish(self) -> None:
+        """Remove the progress bar, or print a last progress line."""
+        with self._lock:
+            if self._bar is not None:
+                self._bar.stop()
+                self._bar = None
+            else:
+                self.update()
+
+    def line(self, now: Optional[float] = None) -> str:
+        """Describe the progress so far.
+
+        Args:
+            now: Current :func:`time.monotonic` time
+
+        Returns:
+            Files and megabytes done, throughput, time left and issues found
+        """
+        elapsed = max((now if now is not None else time.monotonic()) - self._started, 1e-9)
+        files = f"{self.files}/{self.total_files}" if self.total_files is not None else self.files
+        parts = [
+            f"{files} files",
+            f"{self.bytes / _MB:.1f}/{self.total_bytes / _MB:.1f} MB",
+            f"{self.files / elapsed:.0f} files/s",
+        ]
+        eta = self.eta(elapsed)
+        if eta is not None and self.files != self.total_files:
+            parts.append(f"ETA {format_duration(eta)}")
+        issues = sum(self.issues.values())
+        by_severity: List[str] = [
+            f"{self.issues[severity]} {severity.value.lower()}"
+            for severity in sorted(self.issues, reverse=True)
+        ]
+        parts.append(f"{issues} issues" + (f" ({', '.join(by_severity)})" if by_severity else ""))
+        return ", ".join(parts)
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        """Estimate the seconds left from the throughput so far.
+
+        Args:
+            elapsed: Seconds since the run started
+
+        Returns:
+            Seconds left, or None until there is anything to estimate from
+        """
+        # Bytes predict the time left better than files when file sizes vary
+        if self.total_files is not None and self.bytes and self.total_bytes:
+            return elapsed * (self.total_bytes - self.bytes) / self.bytes
+        if self.total_files and self.files:
+            return elapsed * (self.total_files - self.files) / self.files
+        return None
@@ -0,0 +1,78 @@
+"""Reporters that write check results in different formats."""
+
+import enum
+from typing import IO, Any, Dict, Type
+
+from ddlcheck.reporters.base import Reporter, RunSummary, issue_record
+from ddlcheck.reporters.columnar import ColumnStore, CSVReporter, ParquetReporter
+from ddlcheck.reporters.json import JSONLinesReporter, JSONReporter
+from ddlcheck.reporters.junit import JUnitReporter
+from ddlcheck.reporters.sarif import SARIFReporter
+from ddlcheck.reporters.summary import SummaryReporter
+from ddlcheck.reporters.text import TextReporter, format_severity
+
+
+class OutputFormat(str, enum.Enum):
+    """Formats the check command can write results in."""
+
+    TEXT = "text"
+    SUMMARY = "summary"
+    JSONL = "jsonl"
+    JSON = "json"
+    SARIF = "sarif"
+    JUNIT = "junit"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+# Reporter class for each output format
+REPORTERS: Dict[OutputFormat, Type[Reporter]] = {
+    OutputFormat.TEXT: TextReporter,
+    OutputFormat.SUMMARY: SummaryReporter,
+    OutputFormat.JSONL: JSONLinesReporter,
+    OutputFormat.JSON: JSONReporter,
+    OutputFormat.SARIF: SARIFReporter,
+    OutputFormat.JUNIT: JUnitReporter,
+    OutputFormat.CSV: CSVReporter,
+    OutputFormat.PARQUET: ParquetReporter,
+}
+
+
+# Formats meant for people rather than tools
+HUMAN_FORMATS = {OutputFormat.TEXT, OutputFormat.SUMMARY}
+
+
+def get_reporter(output_format: OutputFormat, stream: IO[Any], **options: Any) -> Reporter:
+    """Create the reporter for an output format.
+
+    Args:
+        output_format: Format to write
+        stream: Stream to write the report to; a binary stream for formats
+            whose reporter has ``binary`` set
+        **options: Extra keyword arguments for the reporter class
+
+    Returns:
+        Reporter instance
+    """
+    return REPORTERS[OutputFormat(output_format)](stream, **options)
+
+
+__all__ = [
+    "HUMAN_FORMATS",
+    "REPORTERS",
+    "CSVReporter",
+    "ColumnStore",
+    "JSONLinesReporter",
+    "JSONReporter",
+    "JUnitReporter",
+    "OutputFormat",
+    "ParquetReporter",
+    "Reporter",
+    "RunSummary",
+    "SARIFReporter",
+    "SummaryReporter",
+    "TextReporter",
+    "format_severity",
+    "get_reporter",
+    "issue_record",
+]
@@ -0,0 +1,81 @@
+"""Base class for all DDLCheck reporters."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, TextIO
+
+from ddlcheck.core.check import Check
+from ddlcheck.models import CheckResult, Issue
+
+
+@dataclass
+class RunSummary:
+    """Totals for a finished (or stopped) run."""
+
+    files_checked: int = 0
+    issue_count: int = 0
+    stop_reason: Optional[str] = None
+    # Timings of the run, see ProfileReport.to_dict; only set with --profile
+    profile: Optional[Dict[str, Any]] = None
+    # Memory used by the run, see MemoryReport.to_dict; only set with --memory-report
+    memory: Optional[Dict[str, Any]] = None
+
+    @property
+    def partial(self) -> bool:
+        """Return True if the run stopped before every file was checked."""
+        return self.stop_reason is not None
+
+
+def issue_record(result: CheckResult, issue: Issue) -> Dict[str, Any]:
+    """Build the flat record reported for an issue.
+
+    Args:
+        result: Result of the file the issue was found in
+        issue: The issue
+
+    Returns:
+        Dict with the file path followed by the issue's fields
+    """
+    return {"file": str(result.file_path), **issue.to_dict()}
+
+
+class Reporter(ABC):
+    """Base class for all reporters.
+
+    Reporters receive results one file at a time, as the pipeline produces
+    them, and must write them out incrementally rather than collecting them.
+    """
+
+    # Whether the reporter writes bytes rather than text
+    binary = False
+
+    def __init__(self, stream: TextIO):
+        """Initialize a Reporter.
+
+        Args:
+            stream: Text stream to write the report to
+        """
+        self.stream = stream
+
+    def start(self, checks: Sequence[Check]) -> None:
+        """Write anything that precedes the results.
+
+        Args:
+            checks: The checks that will run
+        """
+
+    @abstractmethod
+    def report(self, result: CheckResult) -> None:
+        """Write the result for one file.
+
+        Args:
+            result: Result for the file, possibly without issues
+        """
+        pass
+
+    def finish(self, summary: RunSummary) -> None:
+        """Write anything that follows the results.
+
+        Args:
+            summary: Totals for the run
+        """
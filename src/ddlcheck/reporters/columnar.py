@@ -0,0 +1,264 @@
+"""Columnar result store with bulk CSV and Parquet export.
+
+Fleet-wide audits produce millions of issues. Rather than keeping an object
+per issue, :class:`ColumnStore` appends each issue's fields to typed arrays,
+and repeated strings (file paths, check IDs, messages, table names) are stored
+once in string tables and referenced by index.
+"""
+
+import csv
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, TextIO, Tuple
+
+from ddlcheck.models import CheckResult, SeverityLevel
+from ddlcheck.reporters.base import Reporter, RunSummary
+from ddlcheck.reporters.summary import issue_tables
+
+# Column names, in output order
+COLUMNS = ("file", "line", "column", "check_id", "severity", "message", "table")
+
+_SEVERITIES = list(SeverityLevel)
+
+
+class StringTable:
+    """Deduplicated list of strings, addressed by index."""
+
+    def __init__(self) -> None:
+        """Initialize an empty StringTable."""
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        """Return the index of a string, adding it if needed.
+
+        Args:
+            value: String to look up
+
+        Returns:
+            Index of the string in :attr:`values`
+        """
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def __len__(self) -> int:
+        """Return the number of distinct strings."""
+        return len(self.values)
+
+
+class ColumnStore:
+    """Append-only, array-backed store of issues."""
+
+    def __init__(self) -> None:
+        """Initialize an empty ColumnStore."""
+        self.files = StringTable()
+        self.check_ids = StringTable()
+        self.messages = StringTable()
+        # Index 0 means "no table"
+        self.tables = StringTable()
+        self.tables.add("")
+
+        self.file_ids = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+        self.check_id_ids = array("I")
+        self.severity_ids = array("B")
+        self.message_ids = array("I")
+        self.table_ids = array("I")
+
+    def __len__(self) -> int:
+        """Return the number of stored issues."""
+        return len(self.lines)
+
+    def add_result(self, result: CheckResult) -> None:
+        """Append every issue of a file's result.
+
+        Args:
+            result: Result for the file
+        """
+        if not result.issues:
+            return
+
+        file_id = self.files.add(str(result.file_path))
+        for issue in result.issues:
+            table = next(issue_tables(issue), "")
+            self.file_ids.append(file_id)
+            self.lines.append(issue.line)
+            self.columns.append(issue.column or 0)
+            self.check_id_ids.append(self.check_ids.add(issue.check_id))
+            self.severity_ids.append(issue.severity.rank)
+            self.message_ids.append(self.messages.add(issue.message))
+            self.table_ids.append(self.tables.add(table))
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Yield one tuple per issue, in :data:`COLUMNS` order.
+
+        Yields:
+            Tuples of file, line, column, check ID, severity, message and table
+        """
+        files = self.files.values
+        check_ids = self.check_ids.values
+        severities = [level.value for level in _SEVERITIES]
+        messages = self.messages.values
+        tables = self.tables.values
+        for row in zip(
+            self.file_ids,
+            self.lines,
+            self.columns,
+            self.check_id_ids,
+            self.severity_ids,
+            self.message_ids,
+            self.table_ids,
+        ):
+            yield (
+                files[row[0]],
+                row[1],
+                row[2] or None,
+                check_ids[row[3]],
+                severities[row[4]],
+                messages[row[5]],
+                tables[row[6]] or None,
+            )
+
+    def write_csv(self, stream: TextIO) -> None:
+        """Write all issues as CSV with a header row.
+
+        Args:
+            stream: Text stream to write to
+        """
+        writer = csv.writer(stream)
+        writer.writerow(COLUMNS)
+        writer.writerows(self.rows())
+
+    def to_arrow(self) -> Any:
+        """Build a ``pyarrow.Table`` straight from the column buffers.
+
+        String columns become dictionary arrays over the string tables, so no
+        Python object is created per issue.
+
+        Returns:
+            The table
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        def indices(buffer: array, arrow_type: Any) -> Any:
+            return pa.Array.from_buffers(arrow_type, len(buffer), [None, pa.py_buffer(buffer)])
+
+        def dictionary(buffer: array, table: StringTable) -> Any:
+            return pa.DictionaryArray.from_arrays(
+                indices(buffer, pa.uint32()), pa.array(table.values, type=pa.string())
+            )
+
+        severities = pa.array([level.value for level in _SEVERITIES], type=pa.string())
+        columns = indices(self.columns, pa.uint32())
+        tables = dictionary(self.table_ids, self.tables)
+        return pa.table(
+            {
+                "file": dictionary(self.file_ids, self.files),
+                "line": indices(self.lines, pa.uint32()),
+                # 0 marks an unknown column or a missing table
+                "column": pc.if_else(pc.equal(columns, 0), None, columns),
+                "check_id": dictionary(self.check_id_ids, self.check_ids),
+                "severity": pa.DictionaryArray.from_arrays(
+                    indices(self.severity_ids, pa.uint8()), severities
+                ),
+                "message": dictionary(self.message_ids, self.messages),
+                "table": pc.if_else(
+                    pc.equal(indices(self.table_ids, pa.uint32()), 0), None, tables
+                ),
+            }
+        )
+
+    def write_parquet(self, stream: BinaryIO) -> None:
+        """Write all issues as a Parquet file.
+
+        Args:
+            stream: Binary stream to write to
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), stream)
+
+
+class CSVReporter(Reporter):
+    """Collect issues into a :class:`ColumnStore` and write them as CSV at the end."""
+
+    def __init__(self, stream: TextIO):
+        """Initialize a CSVReporter.
+
+        Args:
+            stream: Text stream to write the report to
+        """
+        super().__init__(stream)
+        self.store = ColumnStore()
+
+    def report(self, result: CheckResult) -> None:
+        """Add one file's issues to the store.
+
+        Args:
+            result: Result for the file
+        """
+        self.store.add_result(result)
+
+    def finish(self, summary: RunSummary) -> None:
+        """Write every collected issue.
+
+        Args:
+            summary: Totals for the run
+        """
+        self.store.write_csv(self.stream)
+        self.stream.flush()
+
+
+class ParquetReporter(Reporter):
+    """Collect issues into a :class:`ColumnStore` and write them as Parquet at the end.
+
+    Requires the optional ``pyarrow`` dependency (``pip install ddlcheck[parquet]``).
+    """
+
+    # Parquet is a binary format
+    binary = True
+
+    def __init__(self, stream: BinaryIO):  # type: ignore[override]
+        """Initialize a ParquetReporter.
+
+        Args:
+            stream: Binary stream to write the report to
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "Parquet output requires pyarrow; install it with 'pip install ddlcheck[parquet]'"
+            ) from e
+        super().__init__(stream)  # type: ignore[arg-type]
+        self.store = ColumnStore()
+
+    def report(self, result: CheckResult) -> None:
+        """Add one file's issues to the store.
+
+        Args:
+            result: Result for the file
+        """
+        self.store.add_result(result)
+
+    def finish(self, summary: RunSummary) -> None:
+        """Write every collected issue.
+
+        Args:
+            summary: Totals for the run
+        """
+        self.store.write_parquet(self.stream)  # type: ignore[arg-type]
+        self.stream.flush()
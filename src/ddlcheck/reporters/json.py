@@ -0,0 +1,105 @@
+"""JSON and JSON Lines reporters."""
+
+import json
+from typing import Any, Dict, Sequence, TextIO
+
+from ddlcheck.core.check import Check
+from ddlcheck.models import CheckResult
+from ddlcheck.reporters.base import Reporter, RunSummary, issue_record
+
+
+def summary_record(summary: RunSummary) -> Dict[str, Any]:
+    """Build the record describing a run's totals.
+
+    Args:
+        summary: Totals for the run
+
+    Returns:
+        JSON-compatible dict
+    """
+    record = {
+        "files_checked": summary.files_checked,
+        "issue_count": summary.issue_count,
+        "partial": summary.partial,
+        "stop_reason": summary.stop_reason,
+    }
+    if summary.profile is not None:
+        record["profile"] = summary.profile
+    if summary.memory is not None:
+        record["memory"] = summary.memory
+    return record
+
+
+class JSONLinesReporter(Reporter):
+    """Write one JSON object per issue, one per line.
+
+    The last line is a ``{"summary": {...}}`` object with the run's totals.
+    """
+
+    def report(self, result: CheckResult) -> None:
+        """Write the issues found in one file.
+
+        Args:
+            result: Result for the file
+        """
+        if not result.issues:
+            return
+        self.stream.write(
+            "".join(json.dumps(issue_record(result, issue)) + "\n" for issue in result.issues)
+        )
+        self.stream.flush()
+
+    def finish(self, summary: RunSummary) -> None:
+        """Write the summary line.
+
+        Args:
+            summary: Totals for the run
+        """
+        self.stream.write(json.dumps({"summary": summary_record(summary)}) + "\n")
+        self.stream.flush()
+
+
+class JSONReporter(Reporter):
+    """Write a single JSON document of the form ``{"issues": [...], "summary": {...}}``.
+
+    Issues are written as they arrive; only the document's closing part waits
+    for the end of the run.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Initialize a JSONReporter.
+
+        Args:
+            stream: Text stream to write the report to
+        """
+        super().__init__(stream)
+        self._first = True
+
+    def start(self, checks: Sequence[Check]) -> None:
+        """Open the document.
+
+        Args:
+            checks: The checks that will run
+        """
+        self.stream.write('{"issues": [')
+
+    def report(self, result: CheckResult) -> None:
+        """Write the issues found in one file.
+
+        Args:
+            result: Result for the file
+        """
+        for issue in result.issues:
+            self.stream.write("\n  " if self._first else ",\n  ")
+            self.stream.write(json.dumps(issue_record(result, issue)))
+            self._first = False
+
+    def finish(self, summary: RunSummary) -> None:
+        """Close the document with the run's totals.
+
+        Args:
+            summary: Totals for the run
+        """
+        self.stream.write(("]" if self._first else "\n]") + ', "summary": ')
+        self.stream.write(json.dumps(summary_record(summary)) + "}\n")
+        self.stream.flush()
@@ -0,0 +1,88 @@
+"""JUnit XML reporter for CI dashboards."""
+
+from typing import Sequence, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from ddlcheck.core.check import Check
+from ddlcheck.models import CheckResult
+from ddlcheck.reporters.base import Reporter, RunSummary
+
+
+class JUnitReporter(Reporter):
+    """Write a JUnit XML report with one test suite per file with issues.
+
+    Each issue becomes a failed test case. Files without issues are not
+    reported individually; a final suite holds one passing test case that
+    counts them, so dashboards still show how much was checked. Suites are
+    written as files complete, so the root element carries no totals.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Initialize a JUnitReporter.
+
+        Args:
+            stream: Text stream to write the report to
+        """
+        super().__init__(stream)
+        self._files_with_issues = 0
+
+    def start(self, checks: Sequence[Check]) -> None:
+        """Open the document.
+
+        Args:
+            checks: The checks that will run
+        """
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="ddlcheck">\n')
+
+    def report(self, result: CheckResult) -> None:
+        """Write the test suite for one file.
+
+        Args:
+            result: Result for the file
+        """
+        if not result.issues:
+            return
+
+        self._files_with_issues += 1
+        file_name = str(result.file_path)
+        parts = [
+            f'  <testsuite name={quoteattr(file_name)} tests="{len(result.issues)}" '
+            f'failures="{len(result.issues)}" errors="0">\n'
+        ]
+        for issue in result.issues:
+            name = f"{issue.check_id} (line {issue.line})"
+            body = f"{file_name}:{issue.line}: {issue.message}"
+            if issue.suggestion:
+                body += f"\n\n{issue.suggestion}"
+            parts.append(
+                f"    <testcase classname={quoteattr(file_name)} name={quoteattr(name)}>\n"
+                f"      <failure message={quoteattr(issue.message)} "
+                f"type={quoteattr(issue.severity.value)}>{escape(body)}</failure>\n"
+                "    </testcase>\n"
+            )
+        parts.append("  </testsuite>\n")
+        self.stream.write("".join(parts))
+
+    def finish(self, summary: RunSummary) -> None:
+        """Close the document with a suite for clean files and the run's status.
+
+        Args:
+            summary: Totals for the run
+        """
+        clean_files = max(0, summary.files_checked - self._files_with_issues)
+        tests = 1 + int(summary.partial)
+        parts = [
+            f'  <testsuite name="ddlcheck" tests="{tests}" failures="0" '
+            f'errors="{int(summary.partial)}">\n',
+            f'    <testcase classname="ddlcheck" name="{clean_files} files without issues"/>\n',
+        ]
+        if summary.partial:
+            message = f"Run stopped early: {summary.stop_reason}"
+            parts.append(
+                '    <testcase classname="ddlcheck" name="complete run">\n'
+                f"      <error message={quoteattr(message)}/>\n"
+                "    </testcase>\n"
+            )
+        parts.append("  </testsuite>\n</testsuites>\n")
+        self.stream.write("".join(parts))
+        self.stream.flush()
@@ -0,0 +1,134 @@
+"""SARIF 2.1.0 reporter for code scanning tools."""
+
+import json
+from typing import Any, Dict, Sequence, TextIO
+
+from ddlcheck import __version__
+from ddlcheck.core.check import Check
+from ddlcheck.models import CheckResult, Issue, SeverityLevel, serialize_context
+from ddlcheck.reporters.base import Reporter, RunSummary
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+# SARIF only knows three result levels
+SARIF_LEVELS = {
+    SeverityLevel.HIGH: "error",
+    SeverityLevel.MEDIUM: "warning",
+    SeverityLevel.LOW: "note",
+    SeverityLevel.INFO: "note",
+}
+
+
+def sarif_result(result: CheckResult, issue: Issue) -> Dict[str, Any]:
+    """Build the SARIF result object for an issue.
+
+    Args:
+        result: Result of the file the issue was found in
+        issue: The issue
+
+    Returns:
+        SARIF ``result`` object
+    """
+    region: Dict[str, Any] = {"startLine": issue.line}
+    if issue.column is not None:
+        region["startColumn"] = issue.column
+
+    properties: Dict[str, Any] = {
+        "severity": issue.severity.value,
+        "context": serialize_context(issue.context),
+    }
+    if issue.suggestion:
+        properties["suggestion"] = issue.suggestion
+
+    record: Dict[str, Any] = {
+        "ruleId": issue.check_id,
+        "level": SARIF_LEVELS[issue.severity],
+        "message": {"text": issue.message},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": result.file_path.as_posix()},
+                    "region": region,
+                }
+            }
+        ],
+        "properties": properties,
+    }
+    if issue.fingerprint is not None:
+        # Lets code scanning tools track the issue when its line changes
+        record["partialFingerprints"] = {"ddlcheck/v1": issue.fingerprint}
+    return record
+
+
+class SARIFReporter(Reporter):
+    """Write a SARIF log with one run, streaming its results array."""
+
+    def __init__(self, stream: TextIO):
+        """Initialize a SARIFReporter.
+
+        Args:
+            stream: Text stream to write the report to
+        """
+        super().__init__(stream)
+        self._first = True
+
+    def start(self, checks: Sequence[Check]) -> None:
+        """Write the log header and the rules of every check that will run.
+
+        Args:
+            checks: The checks that will run
+        """
+        rules = [
+            {
+                "id": check.id,
+                "shortDescription": {"text": check.description},
+                "defaultConfiguration": {"level": SARIF_LEVELS[check.effective_severity]},
+            }
+            for check in checks
+        ]
+        driver = {
+            "name": "ddlcheck",
+            "version": __version__,
+            "informationUri": "https://github.com/olirice/ddlcheck",
+            "rules": rules,
+        }
+        header = json.dumps({"$schema": SARIF_SCHEMA, "version": SARIF_VERSION})
+        self.stream.write(header[:-1] + ', "runs": [{"tool": {"driver": ')
+        self.stream.write(json.dumps(driver) + '}, "results": [')
+
+    def report(self, result: CheckResult) -> None:
+        """Write the issues found in one file.
+
+        Args:
+            result: Result for the file
+        """
+        for issue in result.issues:
+            self.stream.write("\n" if self._first else ",\n")
+            self.stream.write(json.dumps(sarif_result(result, issue)))
+            self._first = False
+
+    def finish(self, summary: RunSummary) -> None:
+        """Close the results array and record whether the run completed.
+
+        Args:
+            summary: Totals for the run
+        """
+        invocation: Dict[str, Any] = {
+            "executionSuccessful": not summary.partial,
+            "properties": {
+                "filesChecked": summary.files_checked,
+                "issueCount": summary.issue_count,
+                "partial": summary.partial,
+            },
+        }
+        if summary.stop_reason:
+            invocation["toolExecutionNotifications"] = [
+                {
+                    "level": "warning",
+                    "message": {"text": f"Run stopped early: {summary.stop_reason}"},
+                }
+            ]
+        self.stream.write(("]" if self._first else "\n]") + ', "invocations": ')
+        self.stream.write(json.dumps([invocation]) + "}]}\n")
+        self.stream.flush()
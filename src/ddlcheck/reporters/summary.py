@@ -0,0 +1,167 @@
+"""Aggregated console reporter for large runs."""
+
+import heapq
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.reporters.base import Reporter, RunSummary
+from ddlcheck.reporters.text import format_severity
+
+
+def issue_tables(issue: Issue) -> Iterator[str]:
+    """Yield the tables an issue refers to, according to its context.
+
+    Args:
+        issue: The issue
+
+    Yields:
+        Table names from the ``table_name`` or ``tables`` context keys
+    """
+    context = issue.context
+    if not isinstance(context, dict):
+        return
+    table_name = context.get("table_name")
+    if table_name:
+        yield str(table_name)
+    for table in context.get("tables") or ():
+        yield str(table)
+
+
+class SummaryReporter(Reporter):
+    """Render issue counts instead of individual issues.
+
+    Only counters, a bounded heap of the worst files and one suggestion per
+    check are kept, so memory does not grow with the number of issues.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        console: Optional[Console] = None,
+        top: int = 10,
+    ):
+        """Initialize a SummaryReporter.
+
+        Args:
+            stream: Text stream to write to, ignored if `console` is given
+            console: Console to render to (default: a console writing to `stream`)
+            top: Number of worst files and most affected tables to list; 0 to hide them
+        """
+        self.console = console or Console(file=stream)
+        super().__init__(self.console.file)
+        self.top = max(0, top)
+        self.by_check: Counter = Counter()
+        self.by_severity: Counter = Counter()
+        self.by_table: Counter = Counter()
+        self.check_severity: Dict[str, SeverityLevel] = {}
+        self.suggestions: Dict[str, str] = {}
+        self.files_with_issues = 0
+        # Min-heap of (issue count, highest severity rank, path) for the worst files
+        self._worst: List[Tuple[int, int, str]] = []
+
+    def report(self, result: CheckResult) -> None:
+        """Add one file's issues to the counters.
+
+        Args:
+            result: Result for the file
+        """
+        if not result.issues:
+            return
+
+        self.files_with_issues += 1
+        highest = SeverityLevel.INFO
+        for issue in result.issues:
+            self.by_check[issue.check_id] += 1
+            self.by_severity[issue.severity] += 1
+            self.by_table.update(issue_tables(issue))
+            current = self.check_severity.get(issue.check_id)
+            if current is None or issue.severity > current:
+                self.check_severity[issue.check_id] = issue.severity
+            if issue.suggestion and issue.check_id not in self.suggestions:
+                self.suggestions[issue.check_id] = issue.suggestion
+            highest = max(highest, issue.severity)
+
+        if self.top:
+            entry = (len(result.issues), highest.rank, str(result.file_path))
+            if len(self._worst) < self.top:
+                heapq.heappush(self._worst, entry)
+            elif entry > self._worst[0]:
+                heapq.heapreplace(self._worst, entry)
+
+    def worst_files(self) -> List[Tuple[Path, int]]:
+        """Return the files with the most issues, worst first.
+
+        Returns:
+            List of (path, issue count) tuples
+        """
+        return [(Path(path), count) for count, _, path in sorted(self._worst, reverse=True)]
+
+    def finish(self, summary: RunSummary) -> None:
+        """Render the aggregated tables.
+
+        Args:
+            summary: Totals for the run
+        """
+        if summary.issue_count == 0:
+            self.console.print("[bold green]No issues found![/bold green]")
+            return
+
+        self.console.print(
+            f"\n[bold]{summary.issue_count} issues in {self.files_with_issues} of "
+            f"{summary.files_checked} files[/bold]"
+        )
+
+        severity_table = Table(title="Issues by severity", show_header=True, header_style="bold")
+        severity_table.add_column("Severity")
+        severity_table.add_column("Issues", justify="right")
+        for severity in sorted(self.by_severity, reverse=True):
+            severity_table.add_row(format_severity(severity), str(self.by_severity[severity]))
+        self.console.print(severity_table)
+
+        check_table = Table(title="Issues by check", show_header=True, header_style="bold")
+        check_table.add_column("Check")
+        check_table.add_column("Severity")
+        check_table.add_column("Issues", justify="right")
+        for check_id, count in self.by_check.most_common():
+            check_table.add_row(
+                check_id, format_severity(self.check_severity[check_id]), str(count)
+            )
+        self.console.print(check_table)
+
+        if self.by_table:
+            tables = self.by_table.most_common(self.top or None)
+            title = "Most affected tables" if self.top else "Issues by table"
+            table_table = Table(title=title, show_header=True, header_style="bold")
+            table_table.add_column("Table")
+            table_table.add_column("Issues", justify="right")
+            for table_name, count in tables:
+                table_table.add_row(table_name, str(count))
+            if len(self.by_table) > len(tables):
+                table_table.add_row(f"... {len(self.by_table) - len(tables)} more", "")
+            self.console.print(table_table)
+
+        if self._worst:
+            file_table = Table(
+                title="Files with the most issues", show_header=True, header_style="bold"
+            )
+            file_table.add_column("File")
+            file_table.add_column("Issues", justify="right")
+            for path, count in self.worst_files():
+                file_table.add_row(str(path), str(count))
+            self.console.print(file_table)
+
+        # Show each check's suggestion once
+        for check_id in sorted(self.suggestions):
+            self.console.print(
+                Panel(
+                    self.suggestions[check_id],
+                    title=f"Suggestion for {check_id} ({self.by_check[check_id]} issues)",
+                    border_style="yellow",
+                )
+            )
@@ -0,0 +1,94 @@
+"""Human-readable console reporter."""
+
+from typing import Optional, TextIO
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from ddlcheck.models import CheckResult, SeverityLevel
+from ddlcheck.reporters.base import Reporter, RunSummary
+
+
+def format_severity(severity: SeverityLevel) -> Text:
+    """Format severity level with color.
+
+    Args:
+        severity: Severity level to format
+
+    Returns:
+        Formatted text
+    """
+    if severity == SeverityLevel.HIGH:
+        return Text("HIGH", style="bold red")
+    elif severity == SeverityLevel.MEDIUM:
+        return Text("MEDIUM", style="bold yellow")
+    elif severity == SeverityLevel.LOW:
+        return Text("LOW", style="bold blue")
+    return Text("INFO", style="bold green")
+
+
+class TextReporter(Reporter):
+    """Render each file's issues as a rich table, followed by suggestions."""
+
+    def __init__(self, stream: Optional[TextIO] = None, console: Optional[Console] = None):
+        """Initialize a TextReporter.
+
+        Args:
+            stream: Text stream to write to, ignored if `console` is given
+            console: Console to render to (default: a console writing to `stream`)
+        """
+        self.console = console or Console(file=stream)
+        super().__init__(self.console.file)
+
+    def report(self, result: CheckResult) -> None:
+        """Write the issues found in one file.
+
+        Args:
+            result: Result for the file
+        """
+        if not result.has_issues():
+            return
+
+        # Get the file name for display
+        file_path = result.file_path
+        file_name = file_path.name
+
+        self.console.print(f"\n[bold]File:[/bold] {file_path} ([bold cyan]{file_name}[/bold cyan])")
+
+        table = Table(show_header=True, header_style="bold")
+        table.add_column("Line")
+        table.add_column("Severity")
+        table.add_column("Check")
+        table.add_column("Message")
+
+        for issue in sorted(result.issues, key=lambda x: x.line):
+            table.add_row(
+                str(issue.line),
+                format_severity(issue.severity),
+                issue.check_id,
+                issue.message,
+            )
+
+        self.console.print(table)
+
+        # Show suggestions for issues
+        for issue in result.issues:
+            if issue.suggestion:
+                self.console.print(
+                    Panel(
+                        f"[bold]{issue.message}[/bold]\n\n{issue.suggestion}",
+                        title=f"Suggestion for {issue.check_id} (line {issue.line})",
+                        border_style="yellow",
+                    )
+                )
+
+    def finish(self, summary: RunSummary) -> None:
+        """Write the closing line when nothing was found.
+
+        Args:
+            summary: Totals for the run
+        """
+        if summary.issue_count == 0:
+            self.console.print("[bold green]No issues found![/bold green]")
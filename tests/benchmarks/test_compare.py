@@ -0,0 +1,152 @@
+"""Tests for benchmark results files and regression comparisons."""
+
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from ddlcheck.bench.compare import (
+    BenchmarkRun,
+    compare,
+    environment,
+    environment_differences,
+    relative_mad,
+    rerun_scenarios,
+)
+from ddlcheck.bench.corpus import CorpusSpec
+from ddlcheck.bench.runner import ScenarioResult
+from ddlcheck.cli import app
+
+SPEC = CorpusSpec(files=2, statements=3, huge_files=0, dump_files=0)
+
+
+def sample(throughput: float, rss: float = 50.0, scenario: str = "engine") -> ScenarioResult:
+    """Build a scenario result with a throughput and peak RSS."""
+    return ScenarioResult(
+        scenario=scenario,
+        files=2,
+        statements=6,
+        bytes=100,
+        seconds=6 / throughput,
+        statements_per_second=throughput,
+        peak_rss_mb=rss,
+    )
+
+
+def run_of(*samples: ScenarioResult) -> BenchmarkRun:
+    """Build a run of the engine scenario."""
+    return BenchmarkRun(spec=SPEC, environment=environment(), samples={"engine": list(samples)})
+
+
+def statuses(baseline: BenchmarkRun, current: BenchmarkRun) -> dict:
+    """Return the status of each compared metric."""
+    return {c.metric: c.status for c in compare(baseline, current, 0.1, 0.1)}
+
+
+def test_relative_mad():
+    """Noise is the median absolute deviation relative to the median."""
+    assert relative_mad([100.0]) == 0.0
+    assert relative_mad([90.0, 100.0, 110.0]) == pytest.approx(0.1)
+
+
+def test_compare_statuses():
+    """Changes beyond the thresholds are regressions or improvements."""
+    baseline = run_of(sample(1000), sample(1000), sample(1000))
+
+    assert statuses(baseline, run_of(sample(980), sample(990), sample(1000))) == {
+        "statements_per_second": "ok",
+        "peak_rss_mb": "ok",
+    }
+    assert statuses(baseline, run_of(sample(800, 60), sample(800, 60))) == {
+        "statements_per_second": "regression",
+        "peak_rss_mb": "regression",
+    }
+    assert statuses(baseline, run_of(sample(1500, 40)))["statements_per_second"] == "improvement"
+
+
+def test_noisy_changes_are_not_regressions():
+    """A slowdown within the noise between samples does not fail the gate."""
+    baseline = run_of(sample(700), sample(1000), sample(1300))
+    current = run_of(sample(600), sample(850), sample(1200))
+
+    (throughput,) = [c for c in compare(baseline, current) if c.metric == "statements_per_second"]
+    assert throughput.change == pytest.approx(0.15)
+    assert throughput.status == "noise"
+    assert not throughput.regressed
+
+
+def test_save_and_load(tmp_path):
+    """Results files keep the spec, environment and every sample."""
+    path = tmp_path / "bench.json"
+    run = run_of(sample(1000), sample(1100))
+    run.save(path)
+    loaded = BenchmarkRun.load(path)
+
+    assert loaded.spec == SPEC
+    assert loaded.samples == run.samples
+    assert loaded.environment["pglast"] == run.environment["pglast"]
+    assert loaded.representative("engine").statements_per_second == 1000
+    assert loaded.created
+
+    path.write_text('{"version": 99}')
+    with pytest.raises(ValueError):
+        BenchmarkRun.load(path)
+
+
+def test_environment_differences():
+    """Only machine properties are reported as differences."""
+    baseline = run_of(sample(1000))
+    current = run_of(sample(1000))
+    current.environment = dict(current.environment, cpus=1024, ddlcheck="9.9")
+
+    assert environment_differences(baseline, baseline) == []
+    assert environment_differences(baseline, current) == [
+        f"cpus: {baseline.environment['cpus']} -> 1024"
+    ]
+
+
+def test_rerun_scenarios():
+    """Comparisons rerun the baseline's scenarios, optionally narrowed down."""
+    baseline = BenchmarkRun(
+        spec=SPEC,
+        environment=environment(),
+        samples={"cli": [sample(10, scenario="cli")], "engine": [sample(10)]},
+    )
+
+    assert rerun_scenarios(baseline) == ["cli", "engine"]
+    assert rerun_scenarios(baseline, ["engine", "check_file"]) == ["engine"]
+
+
+def test_cli_compare(tmp_path):
+    """bench --compare reruns the baseline's scenarios and fails on regressions."""
+    path = tmp_path / "bench.json"
+    baseline = run_of(sample(1000), sample(1000), sample(1000))
+    baseline.save(path)
+    runner = CliRunner()
+
+    with patch("ddlcheck.bench.runner.run_scenario", return_value=sample(990)) as run_scenario:
+        result = runner.invoke(app, ["bench", "--compare", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "No performance regressions" in result.output
+    assert [call.args[0] for call in run_scenario.call_args_list] == ["engine"] * 3
+
+    with patch("ddlcheck.bench.runner.run_scenario", return_value=sample(500)):
+        result = runner.invoke(app, ["bench", "--compare", str(path), "--repeat", "1"])
+    assert result.exit_code == 1
+    assert "1 performance regressions" in result.output
+
+    with patch("ddlcheck.bench.runner.run_scenario", return_value=sample(500)):
+        result = runner.invoke(app, ["bench", "--compare", str(path), "--max-slowdown", "60"])
+    assert result.exit_code == 0
+
+
+def test_cli_save(tmp_path):
+    """bench --save writes every sample of every scenario."""
+    path = tmp_path / "bench.json"
+    with patch("ddlcheck.bench.runner.run_scenario", return_value=sample(1000)):
+        result = CliRunner().invoke(
+            app, ["bench", "--files", "2", "--huge-files", "0", "-s", "engine", "--save", str(path)]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert len(BenchmarkRun.load(path).samples["engine"]) == 3
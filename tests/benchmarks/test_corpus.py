@@ -0,0 +1,100 @@
+"""Tests for the synthetic corpus generator and benchmark runner."""
+
+import pytest
+
+from ddlcheck.bench.corpus import (
+    MANIFEST,
+    CorpusSpec,
+    iter_corpus,
+    parse_mix,
+    prepared_corpus,
+    read_manifest,
+    write_corpus,
+)
+from ddlcheck.bench.runner import measure, percentile, run_scenario
+from ddlcheck.core.parsing import parse_statements
+from ddlcheck.core.psql import Preprocessor
+
+SMALL = CorpusSpec(
+    files=4, statements=25, huge_files=1, huge_statements=200, dump_tables=3, dump_rows=20
+)
+
+
+def test_corpus_is_deterministic():
+    """The same spec produces the same files; another seed does not."""
+    first = list(iter_corpus(SMALL))
+    second = list(iter_corpus(SMALL))
+    reseeded = list(iter_corpus(CorpusSpec(**{**SMALL.__dict__, "seed": 1})))
+
+    assert first == second
+    assert [f.sql for f in first] != [f.sql for f in reseeded]
+
+
+def test_statement_counts_match_the_parser():
+    """Every generated file parses into the number of statements it claims."""
+    preprocessor = Preprocessor()
+    for corpus_file in iter_corpus(SMALL):
+        parsed = parse_statements(preprocessor.process(corpus_file.sql).sql)
+
+        assert not parsed.errors, corpus_file.name
+        assert len(parsed.statements) == corpus_file.statements, corpus_file.name
+
+
+def test_mix():
+    """A mix restricts the statement kinds generated."""
+    spec = CorpusSpec(files=1, statements=30, huge_files=0, dump_files=0, mix=parse_mix("truncate"))
+    (corpus_file,) = iter_corpus(spec)
+
+    assert corpus_file.sql.count("TRUNCATE") == 30
+    with pytest.raises(ValueError):
+        parse_mix("vacuum=1")
+
+
+def test_write_corpus(tmp_path):
+    """The corpus is written with a manifest of statement counts."""
+    files = write_corpus(SMALL, tmp_path)
+
+    assert (tmp_path / MANIFEST).exists()
+    assert read_manifest(tmp_path) == {f.name: f.statements for f in files}
+    assert (tmp_path / "dumps" / "001_dump.sql").read_text().count("\\.\n") == 3
+
+
+def test_prepared_corpus(tmp_path):
+    """Temporary corpora are removed afterwards; corpora in a given directory are kept."""
+    with prepared_corpus(SMALL) as (directory, files):
+        assert read_manifest(directory) == {f.name: f.statements for f in files}
+    with prepared_corpus(SMALL, tmp_path / "corpus") as (kept, _):
+        pass
+
+    assert not directory.exists()
+    assert (kept / MANIFEST).exists()
+
+
+def test_percentile():
+    """Percentiles use the nearest rank."""
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile([], 0.95) == 0.0
+
+
+def test_measure_in_process(tmp_path):
+    """In-process scenarios time every file."""
+    write_corpus(SMALL, tmp_path)
+    measured = measure("engine", tmp_path)
+
+    assert measured["seconds"] > 0
+    assert measured["latency_p50_ms"] <= measured["latency_p95_ms"] <= measured["latency_max_ms"]
+    assert measured["slowest"][0][0] == "huge/001_huge.sql"
+
+
+def test_run_cli_scenario(tmp_path):
+    """The CLI scenario runs ddlcheck in its own process."""
+    write_corpus(CorpusSpec(files=2, statements=5, huge_files=0, dump_files=0), tmp_path)
+    result = run_scenario("cli", tmp_path, jobs=1)
+
+    assert result.files == 2
+    assert result.statements == 10
+    assert result.statements_per_second > 0
+    assert result.latency_p50_ms is None
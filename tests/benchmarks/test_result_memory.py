@@ -0,0 +1,61 @@
+"""Memory benchmarks for the result model."""
+
+import gc
+import tracemalloc
+from pathlib import Path
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.core.engine import Engine
+from ddlcheck.models import Issue, SeverityLevel
+
+ISSUE_COUNT = 5000
+
+# Upper bound on the memory retained per issue, including its message and context
+MAX_BYTES_PER_ISSUE = 450
+
+
+def _measure_retained(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return value, retained
+
+
+def test_issue_is_slotted():
+    """Test that issues carry no per-instance dict."""
+    issue = Issue("truncate", "message", 1, SeverityLevel.HIGH)
+    assert not hasattr(issue, "__dict__")
+
+
+def test_issue_interns_identifiers():
+    """Test that check IDs and context names are shared between issues."""
+    first = Issue(
+        "".join(["trun", "cate"]), "m", 1, SeverityLevel.HIGH, context={"t": "".join("ab")}
+    )
+    second = Issue(
+        "".join(["trun", "cate"]), "m", 2, SeverityLevel.HIGH, context={"t": "".join("ab")}
+    )
+
+    assert first.check_id is second.check_id
+    assert first.context["t"] is second.context["t"]
+
+
+def test_memory_per_issue():
+    """Test the memory retained per issue found by the real checks."""
+    sql = "".join(
+        f"TRUNCATE table_{i % 100};\nCREATE INDEX idx_{i} ON table_{i % 100} (col);\n"
+        for i in range(ISSUE_COUNT // 2)
+    )
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+
+    result, retained = _measure_retained(lambda: engine.check_sql(sql, Path("bench.sql")))
+
+    assert len(result.issues) == ISSUE_COUNT
+    bytes_per_issue = retained / ISSUE_COUNT
+    assert bytes_per_issue < MAX_BYTES_PER_ISSUE
@@ -0,0 +1,112 @@
+"""Tests for reading migrations from archives."""
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from ddlcheck.checks import TruncateCheck
+from ddlcheck.core.archives import is_archive, iter_members
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+
+MEMBERS = {
+    "./migrations/001.sql": b"TRUNCATE logs;\n",
+    "migrations/002.sql": b"SELECT 1;\n",
+    "migrations/003.py": b"op.execute('TRUNCATE events')\n",
+    "migrations/bad.sql": b"\xff\xfe",
+    "README.md": b"# Release\n",
+}
+
+
+@pytest.fixture
+def tarball(tmp_path):
+    """Gzipped tarball of a release."""
+    path = tmp_path / "release.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+@pytest.fixture
+def wheel(tmp_path):
+    """Wheel (zip) of a release."""
+    path = tmp_path / "release-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name.lstrip("./"), data)
+    return path
+
+
+def test_is_archive():
+    """Archives are recognized by suffix."""
+    assert is_archive(Path("release.tar.gz"))
+    assert is_archive(Path("dist/pkg-1.0-py3-none-any.whl"))
+    assert not is_archive(Path("migrations/001.sql"))
+
+
+def test_tar_members(tarball):
+    """Matching tar members are read with paths inside the archive."""
+    members = list(iter_members(tarball, (".sql",)))
+
+    assert [member.path for member in members] == [
+        Path("migrations/001.sql"),
+        Path("migrations/002.sql"),
+        Path("migrations/bad.sql"),
+    ]
+    assert members[0].content == "TRUNCATE logs;\n"
+    assert members[0].file_hash is None
+    assert isinstance(members[2].content, UnicodeDecodeError)
+
+
+def test_zip_members_are_keyed_by_crc(wheel):
+    """Zip members use their CRC-32, size and name as cache key."""
+    members = list(iter_members(wheel, (".sql", ".py")))
+
+    assert [member.path.name for member in members] == ["001.sql", "002.sql", "003.py", "bad.sql"]
+    assert members[0].file_hash.startswith("zip-crc32:")
+    assert members[0].file_hash != members[1].file_hash
+
+
+def test_pipeline_checks_archive_members(tarball, wheel, tmp_path):
+    """Each member is checked like a file, and unreadable ones are reported."""
+    engine = Engine([TruncateCheck()])
+    pipeline = Pipeline(engine, workers=2, member_suffixes=(".sql", ".py"))
+    corrupt = tmp_path / "corrupt.zip"
+    corrupt.write_bytes(b"not a zip")
+
+    results = list(pipeline.run([tarball, wheel, corrupt]))
+    found = sorted((str(result.file_path), result.issues[0].check_id) for result in results)
+
+    assert found == [
+        (str(corrupt), "file_error"),
+        ("migrations/001.sql", "truncate"),
+        ("migrations/001.sql", "truncate"),
+        ("migrations/003.py", "truncate"),
+        ("migrations/003.py", "truncate"),
+        ("migrations/bad.sql", "file_error"),
+        ("migrations/bad.sql", "file_error"),
+    ]
+    assert pipeline.files_checked == 9
+
+
+def test_archive_member_includes_are_reported(tmp_path, monkeypatch):
+    """Includes in archive members are reported instead of read from the filesystem."""
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "migrations" / "002.sql").write_text("TRUNCATE users;\n")
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "release.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("migrations/001.sql", "SELECT 1;\n\\ir 002.sql\nTRUNCATE logs;\n")
+
+    results = list(Pipeline(Engine([TruncateCheck()]), workers=1).run([path]))
+
+    assert [(issue.check_id, issue.line, issue.message) for issue in results[0].issues] == [
+        ("include_error", 2, "Includes are not followed in archive members: \\ir 002.sql"),
+        ("truncate", 3, "TRUNCATE operation on table 'logs'"),
+    ]
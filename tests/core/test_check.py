@@ -2,10 +2,9 @@
 
 from pathlib import Path
 from typing import Any, Dict, List
-from unittest.mock import MagicMock, mock_open, patch
-
-from pglast.parser import ParseError
+from unittest.mock import mock_open, patch
 
+from ddlcheck.checks import TruncateCheck
 from ddlcheck.core.check import Check
 from ddlcheck.models import Config, Issue, SeverityLevel
 
@@ -110,54 +109,49 @@ def test_create_issue():
 def test_check_file_parse_error():
     """Test check_file method with parse error."""
     check = MockCheck()
+    sql = "SELECT 1;\n\nSELECT * FROM;\nALTER TABLE t ADD COLUMN c int;"
 
-    # Mock ParseError
-    parse_error = ParseError("syntax error", None)
-    parse_error.location = MagicMock()
-    parse_error.location.lineno = 5
+    with patch("builtins.open", mock_open(read_data=sql)):
+        result = check.check_file(Path("test.sql"))
 
-    with patch("builtins.open", mock_open(read_data="SELECT * FROM;")):
-        with patch("ddlcheck.core.check.parse_sql", side_effect=parse_error):
-            result = check.check_file(Path("test.sql"))
+    # The error is reported where it occurs and later statements are still checked
+    assert [issue.check_id for issue in result.issues] == ["parse_error", "test_check"]
+    assert "Failed to parse SQL" in result.issues[0].message
+    assert result.issues[0].line == 3
+    assert result.issues[1].line == 4
 
-    assert len(result.issues) == 1
+
+def test_check_file_parse_error_without_keywords():
+    """Test that parse errors are reported in files without the check's keywords."""
+    check = TruncateCheck()
+
+    with patch("builtins.open", mock_open(read_data="SELECT * FROM;\n")):
+        result = check.check_file(Path("test.sql"))
+
+    assert [issue.check_id for issue in result.issues] == ["parse_error"]
     assert "Failed to parse SQL" in result.issues[0].message
-    assert result.issues[0].line == 5
 
 
 def test_check_file_statement_error():
     """Test check_file method with statement check error."""
     check = MockCheck()
 
-    # Create a mock parsed result with a statement that will trigger an error
-    mock_stmt = MagicMock()
-    mock_stmt.stmt.__class__.__name__ = "error"
-    mock_parsed = [mock_stmt]
-
     with patch("builtins.open", mock_open(read_data="SELECT * FROM error;")):
-        with patch("ddlcheck.core.check.parse_sql", return_value=mock_parsed):
-            result = check.check_file(Path("test.sql"))
+        result = check.check_file(Path("test.sql"))
 
     assert len(result.issues) == 1
     assert "Error checking statement" in result.issues[0].message
 
 
-def test_check_file_line_number_error():
-    """Test check_file method with line number determination error."""
+def test_check_file_line_numbers():
+    """Test that check_file reports the line where each statement begins."""
     check = MockCheck()
+    sql = "SELECT 1;\n-- add a column\nALTER TABLE t\n  ADD COLUMN c int;"
 
-    # Create a mock that causes an error when trying to determine line number
-    mock_stmt = MagicMock()
-    mock_stmt.stmt.__class__.__name__ = "TestStmt"
-    mock_parsed = [mock_stmt]
-
-    with patch("builtins.open", mock_open(read_data="SELECT 1;")):
-        with patch("ddlcheck.core.check.parse_sql", return_value=mock_parsed):
-            with patch("ddlcheck.core.check.prettify", side_effect=Exception("Test error")):
-                result = check.check_file(Path("test.sql"))
+    with patch("builtins.open", mock_open(read_data=sql)):
+        result = check.check_file(Path("test.sql"))
 
-    # Should still work even if line number determination fails
-    assert len(result.issues) == 0
+    assert [(issue.line, issue.column) for issue in result.issues] == [(3, 1)]
 
 
 def test_check_file_empty():
@@ -0,0 +1,100 @@
+"""Tests for the Engine class."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from ddlcheck.checks import ALL_CHECKS, CreateIndexCheck, TruncateCheck
+from ddlcheck.core.engine import FILE_ERROR_ID, PARSE_ERROR_ID, Engine
+from ddlcheck.models import Config, SeverityLevel
+
+
+def test_engine_runs_all_checks_once(risky_sql_file):
+    """Test that the engine reports issues from every check in one result."""
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+    result = engine.check_file(risky_sql_file)
+
+    check_ids = {issue.check_id for issue in result.issues}
+    assert {"add_column", "create_index", "truncate"} <= check_ids
+    assert result.file_path == risky_sql_file
+
+
+def test_engine_drops_disabled_checks():
+    """Test that excluded checks are not run."""
+    config = Config(excluded_checks={"truncate"})
+    engine = Engine([CreateIndexCheck(config), TruncateCheck(config)])
+    assert [check.id for check in engine.checks] == ["create_index"]
+
+    result = engine.check_sql("TRUNCATE logs;", Path("test.sql"))
+    assert not result.has_issues()
+
+
+def test_engine_parse_error():
+    """Test that a parse error is reported at its exact location and the rest is checked."""
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+    result = engine.check_sql("UPDATE t SET a = 1;\n\n  SELEC 2;\nTRUNCATE t;", Path("test.sql"))
+
+    assert [(issue.check_id, issue.line) for issue in result.issues] == [
+        ("update_without_filter", 1),
+        (PARSE_ERROR_ID, 3),
+        ("truncate", 4),
+    ]
+    assert result.issues[1].column == 3
+
+
+def test_engine_file_error():
+    """Test that an unreadable file is reported once."""
+    engine = Engine([TruncateCheck()])
+    result = engine.check_file(Path("/nonexistent/file.sql"))
+
+    assert len(result.issues) == 1
+    assert result.issues[0].check_id == FILE_ERROR_ID
+
+
+def test_engine_min_severity_prunes_checks():
+    """Test that checks below the minimum severity are never run."""
+    engine = Engine([check_class() for check_class in ALL_CHECKS], SeverityLevel.HIGH)
+    check_ids = {check.id for check in engine.checks}
+
+    assert "create_index" not in check_ids
+    assert "truncate" in check_ids
+    assert all(check.effective_severity == SeverityLevel.HIGH for check in engine.checks)
+
+
+def test_engine_min_severity_uses_overrides():
+    """Test that severity overrides decide whether a check is pruned."""
+    config = Config(severity_overrides={"create_index": SeverityLevel.HIGH})
+    engine = Engine([CreateIndexCheck(config), TruncateCheck(config)], SeverityLevel.HIGH)
+
+    result = engine.check_sql("CREATE INDEX idx ON t (c);", Path("test.sql"))
+    assert [issue.severity for issue in result.issues] == [SeverityLevel.HIGH]
+
+
+def test_engine_skips_checks_without_keywords():
+    """Test that no check runs on sources without relevant keywords."""
+    checks = [check_class() for check_class in ALL_CHECKS]
+    with patch.object(Engine, "_run_check") as mock_run:
+        engine = Engine(checks, SeverityLevel.HIGH)
+        assert not engine.needs_checks("CREATE INDEX idx ON t (c);")
+        assert engine.needs_checks("truncate logs;")
+        result = engine.check_sql("CREATE INDEX idx ON t (c);", Path("test.sql"))
+
+    mock_run.assert_not_called()
+    assert not result.has_issues()
+
+
+def test_engine_reports_parse_errors_without_keywords():
+    """Test that syntax errors are reported in sources the checks cannot match."""
+    engine = Engine([TruncateCheck()])
+
+    result = engine.check_sql("SELECT * FROM;\n", Path("test.sql"))
+
+    assert [issue.check_id for issue in result.issues] == [PARSE_ERROR_ID]
+    assert "Failed to parse SQL" in result.issues[0].message
+
+
+def test_engine_dispatches_by_statement_type():
+    """Test that statements only reach checks that inspect their type."""
+    engine = Engine([CreateIndexCheck(), TruncateCheck()])
+
+    assert [check.id for check in engine.checks_for("TruncateStmt")] == ["truncate"]
+    assert engine.checks_for("SelectStmt") == []
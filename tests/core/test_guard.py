@@ -0,0 +1,158 @@
+"""Tests for check time budgets and isolation."""
+
+import os
+import time
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ddlcheck.checks import TruncateCheck
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.guard import CheckGuard
+from ddlcheck.models import SeverityLevel
+
+SQL = "TRUNCATE a;\nTRUNCATE b;\nTRUNCATE c;\nTRUNCATE d;\n"
+
+
+class _TestCheck(TruncateCheck):
+    """Base of the misbehaving checks; defined at module level so workers can import them."""
+
+    check_id = "test"
+
+    @property
+    def id(self):
+        return self.check_id
+
+    @property
+    def severity(self):
+        return SeverityLevel.LOW
+
+
+class SlowCheck(_TestCheck):
+    check_id = "slow"
+
+    def check_statement(self, stmt, line):
+        time.sleep(0.05)
+        return []
+
+
+class CrashingCheck(_TestCheck):
+    check_id = "crashing"
+
+    def check_statement(self, stmt, line):
+        os._exit(3)
+
+
+class RaisingCheck(_TestCheck):
+    check_id = "raising"
+
+    def check_statement(self, stmt, line):
+        raise RuntimeError("boom")
+
+
+def _ids(issues):
+    return sorted(issue.check_id for issue in issues)
+
+
+def test_over_budget_check_is_skipped():
+    """A check over budget too often is skipped; the other checks keep running."""
+    guard = CheckGuard(budget_ms=10, max_overruns=2)
+    engine = Engine([SlowCheck(), TruncateCheck()], guard=guard)
+
+    result = engine.check_sql(SQL, Path("a.sql"))
+
+    assert _ids(result.issues) == ["truncate"] * 4
+    (stats,) = guard.report()
+    assert stats.check_id == "slow"
+    assert (stats.calls, stats.overruns, stats.skipped) == (2, 2, 2)
+    assert stats.slowest_ms >= 10
+    assert guard.stats["truncate"].calls == 4
+    assert not guard.stats["truncate"].troubled
+
+
+def test_isolated_check_matches_in_process_results():
+    """An isolated check reports the same issues as when run in process."""
+    guard = CheckGuard(isolated=[TruncateCheck()])
+    try:
+        isolated = Engine([TruncateCheck()], guard=guard).check_sql(SQL, Path("a.sql"))
+    finally:
+        guard.close()
+    in_process = Engine([TruncateCheck()]).check_sql(SQL, Path("a.sql"))
+
+    assert [issue.to_dict() for issue in isolated.issues] == [
+        issue.to_dict() for issue in in_process.issues
+    ]
+    assert guard.report() == []
+
+
+def test_isolated_timeout_is_stopped():
+    """An isolated check over budget is killed and the statement reported as not checked."""
+    guard = CheckGuard(budget_ms=10, isolated=[SlowCheck()])
+    try:
+        result = Engine([SlowCheck(), TruncateCheck()], guard=guard).check_sql(
+            "TRUNCATE a;\n", Path("a.sql")
+        )
+    finally:
+        guard.close()
+
+    (not_checked,) = [issue for issue in result.issues if issue.check_id == "slow"]
+    assert not_checked.message.startswith("Statement not checked: Check timed out")
+    (stats,) = guard.report()
+    assert (stats.calls, stats.timeouts, stats.skipped) == (1, 1, 0)
+
+
+def test_isolated_crash_and_error_are_reported():
+    """A check crashing its worker or raising does not stop the run."""
+    guard = CheckGuard(isolated=[CrashingCheck(), RaisingCheck()])
+    try:
+        result = Engine([CrashingCheck(), RaisingCheck(), TruncateCheck()], guard=guard).check_sql(
+            SQL, Path("a.sql")
+        )
+    finally:
+        guard.close()
+
+    assert _ids(result.issues) == ["crashing"] * 4 + ["raising"] * 4 + ["truncate"] * 4
+    messages = {issue.check_id: issue.message for issue in result.issues}
+    assert "exit code 3" in messages["crashing"]
+    assert messages["raising"] == "Error checking statement: boom"
+    assert [stats.check_id for stats in guard.report()] == ["crashing"]
+
+
+def test_isolated_worker_that_does_not_start_is_reported():
+    """A worker that is not ready in time is stopped and the statement reported as not checked."""
+    guard = CheckGuard(isolated=[TruncateCheck()], start_timeout=0)
+    try:
+        result = Engine([TruncateCheck()], guard=guard).check_sql("TRUNCATE a;\n", Path("a.sql"))
+    finally:
+        guard.close()
+
+    (issue,) = result.issues
+    assert issue.message == "Statement not checked: Worker process failed to start"
+    assert [stats.crashes for stats in guard.report()] == [1]
+
+
+def test_cli_isolate_budget_excludes_worker_start(tmp_path):
+    """A small budget applies to each call, not to starting the worker process."""
+    (tmp_path / "a.sql").write_text(SQL)
+
+    result = CliRunner().invoke(
+        app,
+        ["check", str(tmp_path), "--isolate", "truncate", "--check-budget", "50"],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 1
+    assert "Found 4 issues!" in result.stdout
+    assert "TRUNCATE operation on table 'd'" in result.stdout
+    assert "not checked" not in result.stdout
+
+
+def test_cli_isolate_unknown_check(tmp_path):
+    """--isolate with an unknown check ID is a usage error."""
+    (tmp_path / "a.sql").write_text("TRUNCATE logs;\n")
+
+    result = CliRunner().invoke(app, ["check", str(tmp_path), "--isolate", "nope"])
+
+    assert result.exit_code == 2
+    assert "Unknown checks to isolate: nope" in result.stdout
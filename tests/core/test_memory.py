@@ -0,0 +1,91 @@
+"""Tests for memory accounting with tracemalloc."""
+
+import json
+import tracemalloc
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.memory import MemoryTracker, peak_rss_mb
+
+
+def test_watch_picks_largest_files(tmp_path):
+    """Only the largest files are snapshotted after parse and check."""
+    for name, size in (("a.sql", 10), ("b.sql", 300), ("c.sql", 200)):
+        (tmp_path / name).write_text("-" * size)
+    tracker = MemoryTracker(largest_files=2)
+    tracker.watch(sorted(tmp_path.iterdir()) + [tmp_path / "missing.sql"])
+
+    assert tracker.watches(tmp_path / "b.sql")
+    assert tracker.watches(tmp_path / "c.sql")
+    assert not tracker.watches(tmp_path / "a.sql")
+
+
+def test_engine_records_memory_per_file(tmp_path):
+    """The engine records each file's memory and snapshots watched files."""
+    big = tmp_path / "big.sql"
+    big.write_text("TRUNCATE t;\n" * 500)
+    small = tmp_path / "small.sql"
+    small.write_text("TRUNCATE t;\n")
+    tracker = MemoryTracker(largest_files=1)
+    tracker.watch([big, small])
+    engine = Engine([check_class() for check_class in ALL_CHECKS], memory=tracker)
+
+    tracker.start()
+    try:
+        engine.check_file(small)
+        engine.check_file(big)
+        report = tracker.report()
+    finally:
+        tracker.stop()
+
+    assert not tracemalloc.is_tracing()
+    assert [(s.phase, s.file) for s in report.snapshots] == [
+        ("parse", big.as_posix()),
+        ("check", big.as_posix()),
+    ]
+    assert report.snapshots[0].sites
+    assert [memory.file for memory in report.files] == [big.as_posix(), small.as_posix()]
+    assert report.files[0].size_bytes == len(big.read_text())
+    assert report.peak_traced_mb >= report.files[0].peak_traced_mb > 0
+
+
+def test_tracker_without_tracing():
+    """Nothing is recorded unless allocations are traced."""
+    tracker = MemoryTracker()
+    tracker.snapshot("parse")
+    tracker.file_finished(Path("a.sql"), 1, tracker.file_started())
+
+    assert tracker.report().snapshots == []
+    assert tracker.report().files == []
+
+
+def test_peak_rss():
+    """Peak RSS is reported in megabytes where available."""
+    peak = peak_rss_mb()
+    assert peak is None or peak > 1
+
+
+def test_cli_memory_report(tmp_path):
+    """--memory-report prints the breakdown and adds it to JSON summaries."""
+    (tmp_path / "a.sql").write_text("TRUNCATE t;\n")
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--memory-report", "--jobs", "4"])
+    assert "Memory by phase" in result.output
+    assert "ignoring --jobs" in result.output
+    assert not tracemalloc.is_tracing()
+
+    output = tmp_path / "out.json"
+    runner.invoke(app, ["check", str(tmp_path), "--memory-report", "-f", "json", "-o", str(output)])
+    memory = json.loads(output.read_text())["summary"]["memory"]
+    assert [snapshot["phase"] for snapshot in memory["snapshots"]] == [
+        "discovery",
+        "parse",
+        "check",
+        "report",
+    ]
+    assert memory["files"][0]["file"] == (tmp_path / "a.sql").as_posix()
@@ -0,0 +1,90 @@
+"""Tests for SQL extraction from Python migrations."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.migrations import Extractor, SQLFragment, extract_sql
+
+ALEMBIC = '''from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.execute("TRUNCATE logs")
+    op.execute(
+        """
+        ALTER TABLE users
+            ADD COLUMN status text NOT NULL DEFAULT 'active';
+        """
+    )
+    op.execute(sa.text("CREATE INDEX idx ON users (email)"))
+    op.execute(f"DROP TABLE {name}")
+    connection.execute("DROP TABLE not_a_migration")
+'''
+
+DJANGO = """from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    operations = [
+        migrations.RunSQL(
+            ["UPDATE accounts SET active = true", ("DROP TABLE old", [])],
+            reverse_sql="DROP TABLE accounts",
+        ),
+        migrations.RunSQL(sql="ALTER TABLE a " "RENAME COLUMN b TO c"),
+        migrations.RunSQL("TRUNCATE " + "events"),
+    ]
+"""
+
+
+def test_extract_alembic():
+    """Literal op.execute() strings are found with their positions."""
+    fragments = extract_sql(ALEMBIC)
+
+    assert [(f.sql.strip().split()[0], f.line, f.column, f.multiline) for f in fragments] == [
+        ("TRUNCATE", 6, 17, True),
+        ("ALTER", 8, 12, True),
+        ("CREATE", 13, 25, True),
+    ]
+
+
+def test_extract_django():
+    """RunSQL statements are found, but not reverse_sql."""
+    fragments = extract_sql(DJANGO)
+
+    assert fragments == [
+        SQLFragment("UPDATE accounts SET active = true", 7, 15, True),
+        SQLFragment("DROP TABLE old", 7, 53, True),
+        SQLFragment("ALTER TABLE a RENAME COLUMN b TO c", 10, None, True),
+        SQLFragment("TRUNCATE events", 11, None, False),
+    ]
+
+
+def test_extractor_memoizes_by_content():
+    """The same contents are only parsed once."""
+    extractor = Extractor()
+    with patch("ddlcheck.core.migrations.extract_sql", return_value=[]) as mock_extract:
+        extractor.extract(ALEMBIC)
+        extractor.extract(ALEMBIC)
+        extractor.extract("import os\n")
+
+    mock_extract.assert_called_once_with(ALEMBIC)
+
+
+def test_extractor_skips_invalid_python():
+    """Sources that are not valid Python have no SQL."""
+    assert Extractor().extract("op.execute('TRUNCATE logs'\n") == []
+
+
+def test_engine_reports_lines_of_the_python_source():
+    """Issues are reported on the lines of the migration."""
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+    result = engine.check_source(ALEMBIC, Path("versions/0001.py"))
+
+    assert [(issue.check_id, issue.line, issue.column) for issue in result.issues] == [
+        ("truncate", 6, 17),
+        ("add_column", 9, 9),
+        ("create_index", 13, 25),
+    ]
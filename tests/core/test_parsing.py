@@ -0,0 +1,68 @@
+"""Tests for parsing SQL sources into statements."""
+
+from ddlcheck.core.parsing import line_for_offset, line_starts, parse_statements, split_statements
+
+
+def _texts(sql):
+    return [sql[start:end] for start, end in split_statements(sql)]
+
+
+def test_line_for_offset():
+    """Offsets are converted to line numbers."""
+    starts = line_starts("a\nbc\n\nd")
+    assert starts == [0, 2, 5, 6]
+    assert line_for_offset(starts, 0) == 1
+    assert line_for_offset(starts, 3) == 2
+    assert line_for_offset(starts, 6) == 4
+
+
+def test_statement_positions_skip_leading_comments():
+    """Statement lines point past leading comments."""
+    sql = "-- first\nSELECT 1;\n\n/* block\n comment */\n-- more\nTRUNCATE t;"
+    parsed = parse_statements(sql)
+
+    assert [parsed.position(start) for _, start, _ in parsed.statements] == [(2, 1), (7, 1)]
+    assert list(parsed.statements[1].node) == ["TruncateStmt"]
+
+
+def test_split_statements():
+    """Semicolons in strings, dollar quotes, parentheses and atomic bodies do not split."""
+    sql = (
+        "-- header\n"
+        "SELECT ';';;\n"
+        "CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql;\n"
+        "CREATE FUNCTION g() RETURNS int LANGUAGE sql\n"
+        "BEGIN ATOMIC SELECT CASE WHEN true THEN 1 END; SELECT 2; END;\n"
+        "CREATE RULE r AS ON INSERT TO t DO ALSO (NOTIFY a; NOTIFY b);\n"
+        "TRUNCATE t"
+    )
+
+    assert _texts(sql) == [
+        "SELECT ';'",
+        "CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql",
+        "CREATE FUNCTION g() RETURNS int LANGUAGE sql\n"
+        "BEGIN ATOMIC SELECT CASE WHEN true THEN 1 END; SELECT 2; END",
+        "CREATE RULE r AS ON INSERT TO t DO ALSO (NOTIFY a; NOTIFY b)",
+        "TRUNCATE t",
+    ]
+
+
+def test_split_statements_unterminated_quote():
+    """Everything from an unterminated quote on is one last statement."""
+    assert _texts("SELECT 1;\nSELECT 'oops;\nTRUNCATE t;") == [
+        "SELECT 1",
+        "SELECT 'oops;\nTRUNCATE t;",
+    ]
+
+
+def test_parse_statements_recovers_from_errors():
+    """Every statement that parses is kept, and each error is located."""
+    sql = "TRUNCATE a;\n\\set x 1\nTRUNCATE b;\nSELEC 1;\nTRUNCATE c;"
+    parsed = parse_statements(sql)
+
+    assert [sql[start:end] for _, start, end in parsed.statements] == [
+        "TRUNCATE a",
+        "TRUNCATE c",
+    ]
+    # The meta-command swallows the statement after it, up to the semicolon
+    assert [parsed.position(offset) for offset, _ in parsed.errors] == [(2, 1), (4, 1)]
@@ -0,0 +1,91 @@
+"""Tests for the Pipeline class."""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from ddlcheck.checks import TruncateCheck
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+
+
+def _write_files(directory: Path, count: int) -> list:
+    paths = []
+    for i in range(count):
+        path = directory / f"{i:03d}.sql"
+        path.write_text("TRUNCATE logs;" if i % 2 else "SELECT 1;")
+        paths.append(path)
+    return paths
+
+
+def test_pipeline_yields_one_result_per_file_with_issues():
+    """Test that every file with issues produces exactly one result."""
+    with TemporaryDirectory() as temp_dir:
+        paths = _write_files(Path(temp_dir), 25)
+        pipeline = Pipeline(Engine([TruncateCheck()]), readers=3, workers=4, queue_size=2)
+        results = list(pipeline.run(paths))
+
+    assert sorted(result.file_path for result in results) == paths[1::2]
+    assert sum(len(result.issues) for result in results) == 12
+    assert pipeline.files_checked == 25
+
+
+def test_pipeline_consumes_paths_lazily():
+    """Test that bounded queues stop readers from running ahead of the consumer."""
+    consumed = []
+
+    def paths(directory):
+        for path in _write_files(directory, 50):
+            consumed.append(path)
+            yield path
+
+    with TemporaryDirectory() as temp_dir:
+        pipeline = Pipeline(Engine([TruncateCheck()]), readers=1, workers=1, queue_size=1)
+        results = pipeline.run(paths(Path(temp_dir)))
+        next(results)
+        results.close()
+
+    assert len(consumed) < 50
+
+
+def test_pipeline_reports_unreadable_files():
+    """Test that read errors are reported as results instead of raised."""
+    pipeline = Pipeline(Engine([TruncateCheck()]), workers=1)
+    results = list(pipeline.run([Path("/nonexistent/file.sql")]))
+
+    assert len(results) == 1
+    assert "Failed to check file" in results[0].issues[0].message
+
+
+def test_pipeline_stop_discards_queued_work():
+    """Test that stopping the pipeline ends the run with a stop reason."""
+    with TemporaryDirectory() as temp_dir:
+        paths = _write_files(Path(temp_dir), 50)
+        pipeline = Pipeline(Engine([TruncateCheck()]), workers=1, queue_size=2)
+        results = []
+        for result in pipeline.run(paths):
+            results.append(result)
+            pipeline.stop("enough")
+
+    assert len(results) == 1
+    assert pipeline.stop_reason == "enough"
+
+
+def test_pipeline_time_budget():
+    """Test that an exhausted time budget returns partial results."""
+    with TemporaryDirectory() as temp_dir:
+        paths = _write_files(Path(temp_dir), 10)
+        pipeline = Pipeline(Engine([TruncateCheck()]), workers=1, max_time=0)
+        results = list(pipeline.run(paths))
+
+    assert len(results) < 10
+    assert "time budget" in pipeline.stop_reason
+
+
+def test_pipeline_complete_run_has_no_stop_reason():
+    """Test that a run that finishes normally is not marked partial."""
+    with TemporaryDirectory() as temp_dir:
+        paths = _write_files(Path(temp_dir), 3)
+        pipeline = Pipeline(Engine([TruncateCheck()]), workers=2)
+        list(pipeline.run(paths))
+
+    assert pipeline.stop_reason is None
@@ -0,0 +1,105 @@
+"""Tests for SQL embedded in DO blocks and function bodies."""
+
+import re
+from pathlib import Path
+from unittest.mock import patch
+
+from pglast import parse_sql
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.plpgsql import embedded_statements
+
+DO_BLOCK = """DO $$
+DECLARE t text := 'events';
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = 'x') THEN
+    ALTER TABLE users
+      ADD COLUMN a int NOT NULL DEFAULT 1;
+  END IF;
+  EXECUTE format('ALTER TABLE %I DROP COLUMN b', t);
+  EXECUTE 'TRUNCATE ' || quote_ident(t || '_log');
+  EXECUTE some_query;
+END $$"""
+
+
+def _statement(sql):
+    raw_stmt = parse_sql(sql)[0]
+    return {raw_stmt.stmt.__class__.__name__: raw_stmt.stmt}
+
+
+def _summary(statements):
+    return [(next(iter(s.node)), s.line_offset, s.sql) for s in statements]
+
+
+def test_static_and_dynamic_sql_of_a_do_block():
+    """Static statements and constant EXECUTE strings are extracted."""
+    statements = embedded_statements(_statement(DO_BLOCK), DO_BLOCK)
+
+    assert _summary(statements) == [
+        ("AlterTableStmt", 4, "ALTER TABLE users\n      ADD COLUMN a int NOT NULL DEFAULT 1"),
+        ("AlterTableStmt", 7, "ALTER TABLE t DROP COLUMN b"),
+        ("TruncateStmt", 8, "TRUNCATE t_log"),
+    ]
+
+
+def test_numeric_constants_in_dynamic_sql():
+    """Numeric constants, including 0, are substituted into EXECUTE strings."""
+    sql = """DO $$
+BEGIN
+  EXECUTE format('ALTER TABLE t ADD COLUMN a int NOT NULL DEFAULT %s', 0);
+  EXECUTE 'ALTER TABLE t ADD COLUMN b numeric DEFAULT ' || 1.5;
+END $$"""
+    statements = embedded_statements(_statement(sql), sql)
+
+    assert [s.sql for s in statements] == [
+        "ALTER TABLE t ADD COLUMN a int NOT NULL DEFAULT 0",
+        "ALTER TABLE t ADD COLUMN b numeric DEFAULT 1.5",
+    ]
+
+
+def test_sql_function_body():
+    """The statements of LANGUAGE sql functions are parsed as SQL."""
+    sql = "CREATE FUNCTION f() RETURNS void LANGUAGE sql AS $$\n  SELECT 1;\n  TRUNCATE t;\n$$"
+    statements = embedded_statements(_statement(sql), sql)
+
+    assert [(s.line_offset, s.sql) for s in statements] == [(1, "SELECT 1"), (2, "TRUNCATE t")]
+
+
+def test_other_languages_are_ignored():
+    """Bodies in other languages are not inspected."""
+    sql = "DO LANGUAGE plpython3u $$ plpy.execute('TRUNCATE t') $$"
+
+    assert embedded_statements(_statement(sql), sql) == []
+
+
+def test_bodies_without_keywords_are_not_parsed():
+    """The PL/pgSQL parser only runs on bodies mentioning a relevant keyword."""
+    sql = "DO $$ BEGIN PERFORM pg_sleep(1); END $$"
+    keywords = re.compile(r"\bTRUNCATE\b", re.IGNORECASE)
+
+    with patch("ddlcheck.core.plpgsql.parse_plpgsql") as mock_parse:
+        assert embedded_statements(_statement(sql), sql, keywords) == []
+    mock_parse.assert_not_called()
+
+
+def test_invalid_bodies_are_skipped():
+    """Bodies PL/pgSQL rejects yield no statements rather than failing."""
+    sql = "DO $$ BEGIN FOR x IN SELECT 1 LOOP TRUNCATE t; END LOOP; END $$"
+
+    assert embedded_statements(_statement(sql), sql) == []
+
+
+def test_engine_checks_embedded_sql():
+    """Issues in bodies are reported on their lines and honour suppressions."""
+    sql = "-- setup\n" + DO_BLOCK + ";\n-- ddlcheck:ignore truncate\n" + DO_BLOCK + ";\n"
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+    result = engine.check_sql(sql, Path("migration.sql"))
+
+    assert [(issue.check_id, issue.line) for issue in result.issues] == [
+        ("add_column", 6),
+        ("drop_column", 9),
+        ("truncate", 10),
+        ("add_column", 18),
+        ("drop_column", 21),
+    ]
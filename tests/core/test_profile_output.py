@@ -0,0 +1,95 @@
+"""Tests for pstats and speedscope profiles of a run."""
+
+import json
+import pstats
+import threading
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+from ddlcheck.core.profile_output import CallProfiler, SamplingProfiler, run_profiler_for
+
+
+def busy(n: int) -> int:
+    """Burn some CPU in a function that shows up in profiles."""
+    return sum(i * i for i in range(n))
+
+
+def test_run_profiler_for():
+    """The profiler is chosen by the output file name."""
+    assert isinstance(run_profiler_for(Path("run.prof")), CallProfiler)
+    assert isinstance(run_profiler_for(Path("run.speedscope.json")), SamplingProfiler)
+    assert isinstance(run_profiler_for(Path("RUN.JSON")), SamplingProfiler)
+
+
+def test_call_profiler_merges_threads(tmp_path):
+    """The cProfile profiles of all threads are merged into one pstats file."""
+    profiler = CallProfiler()
+
+    def work() -> None:
+        with profiler.thread():
+            busy(1000)
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    profiler.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.stop()
+    path = tmp_path / "run.prof"
+    profiler.write(path)
+
+    stats = pstats.Stats(str(path))
+    (calls,) = [value[1] for key, value in stats.stats.items() if key[2] == "busy"]
+    assert calls == 3
+
+
+def test_sampling_profiler():
+    """Samples record the stacks of profiled threads only."""
+    profiler = SamplingProfiler()
+    with profiler.thread():
+        profiler.sample(0.5)
+        profiler.sample(0.25)
+    profiler.sample(1.0)
+    document = profiler.to_speedscope("test")
+
+    (profile,) = document["profiles"]
+    assert profile["name"] == threading.current_thread().name
+    assert profile["weights"] == [0.5, 0.25]
+    assert profile["endValue"] == 0.75
+    frames = document["shared"]["frames"]
+    leaf = frames[profile["samples"][0][-1]]
+    assert leaf["name"].endswith("sample")
+    assert any(frame["name"] == "test_sampling_profiler" for frame in frames)
+
+
+def test_pipeline_profiles_workers(tmp_path):
+    """The pipeline runs every worker under the profiler."""
+    (tmp_path / "a.sql").write_text("TRUNCATE t;\n")
+    profiler = CallProfiler()
+    engine = Engine([check_class() for check_class in ALL_CHECKS])
+    list(Pipeline(engine, workers=2, run_profiler=profiler).run([tmp_path / "a.sql"]))
+
+    stats = profiler.stats()
+    assert any(key[2] == "check_source" for key in stats.stats)
+
+
+def test_cli_profile_output(tmp_path):
+    """--profile-output writes a pstats or speedscope file."""
+    (tmp_path / "a.sql").write_text("TRUNCATE t;\n")
+    runner = CliRunner()
+
+    prof = tmp_path / "run.prof"
+    result = runner.invoke(app, ["check", str(tmp_path / "a.sql"), "--profile-output", str(prof)])
+    assert "Profile written" in result.output
+    assert pstats.Stats(str(prof)).total_calls > 0
+
+    speedscope = tmp_path / "run.speedscope.json"
+    runner.invoke(app, ["check", str(tmp_path / "a.sql"), "--profile-output", str(speedscope)])
+    document = json.loads(speedscope.read_text())
+    assert document["$schema"].startswith("https://www.speedscope.app/")
@@ -0,0 +1,107 @@
+"""Tests for phase and check timings."""
+
+import json
+import threading
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.profiling import RESERVOIR_SIZE, Profiler, Timer
+
+
+def test_timer():
+    """Timers keep exact totals and a bounded sample for percentiles."""
+    timer = Timer()
+    for ns in range(1, 5001):
+        timer.add(ns)
+
+    assert timer.count == 5000
+    assert timer.total_ns == 5000 * 5001 // 2
+    assert timer.max_ns == 5000
+    assert len(timer.samples) == RESERVOIR_SIZE
+    assert 4500 < timer.percentile(0.95) <= 5000
+
+
+def test_timer_merge():
+    """Merged timers add up and keep a sample of both."""
+    first, second = Timer(), Timer()
+    for ns in range(100):
+        first.add(ns)
+        second.add(1000 + ns)
+    first.merge(second)
+
+    assert first.count == 200
+    assert first.max_ns == 1099
+    assert len(first.samples) == 200
+    assert first.percentile(0.5) >= 1000
+
+
+def test_profiler_merges_threads():
+    """Each thread records on its own and the report merges them."""
+    profiler = Profiler()
+
+    def work(index: int) -> None:
+        for _ in range(10):
+            profiler.add_check("truncate", 1000)
+        profiler.add_file(f"file{index}.sql", index * 1_000_000)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = profiler.report()
+
+    (row,) = report.checks
+    assert (row.name, row.count, row.total_ms) == ("truncate", 40, 0.04)
+    assert [label for label, _ in report.slowest_files] == [
+        "file3.sql",
+        "file2.sql",
+        "file1.sql",
+        "file0.sql",
+    ]
+
+
+def test_engine_profiles_phases_and_checks():
+    """An engine with a profiler times its phases and each check it runs."""
+    profiler = Profiler()
+    engine = Engine([check_class() for check_class in ALL_CHECKS], profiler=profiler)
+    sql = "TRUNCATE t;\nSELECT 1;\nDO $$ BEGIN DROP TABLE t; END $$;\n"
+    engine.check_sql(sql, Path("a.sql"))
+    report = profiler.report()
+
+    phases = {row.name: row.count for row in report.phases}
+    assert phases["preprocess"] == phases["parse"] == 1
+    assert phases["lines"] == 3
+    assert phases["plpgsql"] == 1
+    checks = {row.name: row.count for row in report.checks}
+    assert checks["truncate"] == 1
+    assert checks["drop_table"] == 1
+    assert report.slowest_files == []
+    assert {label for label, _ in report.slowest_statements} == {"a.sql:1", "a.sql:2", "a.sql:3"}
+
+    engine.check_source(sql, Path("a.sql"))
+    assert [label for label, _ in profiler.report().slowest_files] == ["a.sql"]
+
+
+def test_cli_profile(tmp_path):
+    """--profile prints the breakdown and adds it to JSON summaries."""
+    (tmp_path / "a.sql").write_text("TRUNCATE t;\n")
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--profile"])
+    assert "Phase timings" in result.output
+    assert "Check timings" in result.output
+
+    output = tmp_path / "out.jsonl"
+    args = ["check", str(tmp_path), "--profile", "-f", "jsonl", "-o", str(output)]
+    result = runner.invoke(app, args)
+    summary = json.loads(output.read_text().splitlines()[-1])["summary"]
+    assert set(summary["profile"]["phases"]) >= {"read", "parse", "report"}
+    assert summary["profile"]["checks"]["truncate"]["count"] == 1
+
+    runner.invoke(app, ["check", str(tmp_path), "-f", "jsonl", "-o", str(output)])
+    assert "profile" not in json.loads(output.read_text().splitlines()[-1])["summary"]
@@ -0,0 +1,221 @@
+"""Tests for psql script preprocessing."""
+
+import os
+from pathlib import Path
+
+from ddlcheck.checks import ALL_CHECKS, DropTableCheck, TruncateCheck
+from ddlcheck.core import psql
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+from ddlcheck.core.psql import OffsetMap, Preprocessor, blank_copy_data, has_includes
+
+
+def _engine(**kwargs):
+    return Engine([check_class() for check_class in ALL_CHECKS], **kwargs)
+
+
+def test_plain_sql_is_returned_unchanged():
+    """Sources without meta-commands are not rewritten."""
+    sql = "SELECT a::int FROM t WHERE b = :b;"
+    script = Preprocessor().process(sql)
+
+    assert script.sql is sql
+    assert script.offsets is None
+
+
+def test_meta_commands_are_blanked_in_place():
+    """Meta-commands become whitespace of the same length."""
+    sql = "\\connect app\nTRUNCATE logs;\n\\echo done\n"
+    script = Preprocessor().process(sql)
+
+    assert len(script.sql) == len(sql)
+    assert script.sql.split("\n") == [" " * 12, "TRUNCATE logs;", " " * 10, ""]
+    assert script.offsets is None
+
+
+def test_send_commands_end_the_statement():
+    """\\g and friends end the current statement like a semicolon."""
+    script = Preprocessor().process("SELECT 1 \\gset\nSELECT 2")
+
+    assert script.sql == "SELECT 1 ;    \nSELECT 2"
+
+
+def test_variables_are_interpolated():
+    """Variables are interpolated as is, as literals and as identifiers."""
+    sql = "\\set t my table\n\\set v 'it''s'\nSELECT :v, :'v', :\"t\", :undefined, 1::int;"
+    script = Preprocessor().process(sql)
+
+    assert script.sql.splitlines()[2] == "SELECT it's, 'it''s', \"mytable\", :undefined, 1::int;"
+
+
+def test_variables_are_not_interpolated_in_quotes_or_comments():
+    """psql does not interpolate inside strings, identifiers, comments or bodies."""
+    sql = "\\set v x\nSELECT ':v', \":v\", $$ :v $$ -- :v\n/* :v */;"
+    script = Preprocessor().process(sql)
+
+    assert script.sql.splitlines()[1:] == ["SELECT ':v', \":v\", $$ :v $$ -- :v", "/* :v */;"]
+
+
+def test_command_line_variables():
+    """Variables can be defined before the script, and the script can override them."""
+    preprocessor = Preprocessor({"t": "users", "s": "public"})
+    script = preprocessor.process("\\set t events\nTRUNCATE :s.:t;")
+
+    assert script.sql.splitlines()[1] == "TRUNCATE public.events;"
+
+
+def test_offset_map():
+    """Offsets after an interpolation shift by the difference in length."""
+    offsets = OffsetMap()
+    offsets.add(10, 6, 10, 2)
+
+    assert offsets.original(5) == 5
+    assert offsets.original(12) == 10
+    assert offsets.original(16) == 12
+    assert offsets.original(20) == 16
+
+
+def test_copy_data_is_blanked():
+    """COPY FROM stdin data up to the terminator is blanked."""
+    sql = "COPY t (a) FROM stdin;\nx\\ty\n\\.\nTRUNCATE t;\n"
+    blanked = blank_copy_data(sql)
+
+    assert blanked.splitlines() == ["COPY t (a) FROM stdin;", "    ", "  ", "TRUNCATE t;"]
+
+
+def test_includes_set_variables(tmp_path):
+    """Variables set by included files are visible after the include."""
+    (tmp_path / "vars.sql").write_text("\\set t events\n")
+    script = Preprocessor().process("\\ir vars.sql\nTRUNCATE :t;", tmp_path / "main.sql")
+
+    assert script.sql.splitlines()[1] == "TRUNCATE events;"
+
+
+def test_included_files_are_read_once(tmp_path, monkeypatch):
+    """A file included by many scripts is only read once."""
+    (tmp_path / "vars.sql").write_text("\\set t events\n")
+    reads = []
+    read_text = Path.read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+    preprocessor = Preprocessor()
+    for index in range(5):
+        script = preprocessor.process("\\ir vars.sql\nTRUNCATE :t;", tmp_path / f"{index}.sql")
+        assert "events" in script.sql
+
+    assert reads == ["vars.sql"]
+
+
+def test_included_files_are_scanned_once_per_content(tmp_path, monkeypatch):
+    """Included files are only scanned again when their contents change."""
+    include = tmp_path / "inc.sql"
+    include.write_text("\\set t events\nDROP TABLE :t;\n")
+    scanned = []
+    events = psql._events
+
+    def counting_events(sql):
+        scanned.append(sql)
+        return events(sql)
+
+    monkeypatch.setattr(psql, "_events", counting_events)
+    preprocessor = Preprocessor()
+    for index in range(3):
+        preprocessor.process("\\ir inc.sql\n", tmp_path / f"{index}.sql")
+        os.utime(include, ns=(index, index))
+    include.write_text("DROP TABLE audit;\n")
+    script = preprocessor.process("\\ir inc.sql\n", tmp_path / "main.sql")
+
+    assert script.sql == "DROP TABLE audit;\n"
+    assert [sql for sql in scanned if "DROP" in sql] == [
+        "\\set t events\nDROP TABLE :t;\n",
+        "DROP TABLE audit;\n",
+    ]
+
+
+def test_included_sql_is_inlined(tmp_path):
+    """Included files are replaced by their SQL, unless they are checked on their own."""
+    (tmp_path / "inc.sql").write_text("\\set t events\nDROP TABLE :t;\n\n")
+    sql = "\\ir inc.sql\nTRUNCATE :t;"
+
+    inlined = Preprocessor().process(sql, tmp_path / "main.sql")
+    followed = Preprocessor(checked_files=[tmp_path / "inc.sql"]).process(
+        sql, tmp_path / "main.sql"
+    )
+
+    assert inlined.sql.split("\n")[1:] == ["DROP TABLE events;", "TRUNCATE events;"]
+    assert inlined.offsets.original(inlined.sql.index("DROP")) == 0
+    assert followed.sql.splitlines()[1] == "TRUNCATE events;"
+    assert "DROP" not in followed.sql
+
+
+def test_has_includes():
+    """Scripts with include meta-commands are recognized."""
+    assert has_includes("\\i a.sql\n")
+    assert has_includes("SELECT 1;\n  \\include_relative b.sql")
+    assert not has_includes("\\set x 1\nSELECT 1;")
+    assert not has_includes("TRUNCATE t;")
+
+
+def test_include_cycles_terminate(tmp_path):
+    """A file that includes itself does not recurse forever."""
+    (tmp_path / "loop.sql").write_text("\\ir loop.sql\n")
+    script = Preprocessor().process("\\ir loop.sql\nSELECT 1;", tmp_path / "main.sql")
+
+    assert script.sql.endswith("SELECT 1;")
+
+
+def test_engine_reports_lines_of_the_original_script():
+    """Issues after interpolations and meta-commands keep their original lines."""
+    sql = (
+        "\\set table_name a_rather_long_table_name\n"
+        "\\set ON_ERROR_STOP on\n"
+        'CREATE INDEX idx ON :"table_name" (id);\n'
+        "TRUNCATE :table_name;\n"
+    )
+    result = _engine().check_sql(sql, Path("migration.sql"))
+
+    assert [(issue.check_id, issue.line, issue.column) for issue in result.issues] == [
+        ("create_index", 3, 1),
+        ("truncate", 4, 1),
+    ]
+    assert "a_rather_long_table_name" in result.issues[1].message
+
+
+def test_engine_variables_change_the_fingerprint():
+    """Results computed with different variables are not interchangeable."""
+    assert _engine().fingerprint() != _engine(variables={"t": "x"}).fingerprint()
+
+
+def test_engine_checks_sql_only_visible_after_preprocessing(tmp_path):
+    """Included SQL and interpolated variables reach keyword-prefiltered checks."""
+    (tmp_path / "inc.sql").write_text("SELECT 1;\nDROP TABLE users;\n")
+    engine = Engine([TruncateCheck(), DropTableCheck()], variables={"ddl": "TRUNCATE logs"})
+
+    result = engine.check_sql("-- deploy\n\\ir inc.sql\n:ddl;\n", tmp_path / "main.sql")
+
+    assert [(issue.check_id, issue.line) for issue in result.issues] == [
+        ("drop_table", 2),
+        ("truncate", 3),
+    ]
+
+
+def test_scripts_with_includes_are_not_reused(tmp_path):
+    """Stored results of scripts with includes are not reused, as the includes may change."""
+    main = tmp_path / "main.sql"
+    main.write_text("\\ir inc.sql\n")
+    (tmp_path / "inc.sql").write_text("TRUNCATE logs;\n")
+
+    class Store:
+        def lookup(self, file_hash):
+            return []
+
+        def record(self, path, file_hash, issues):
+            pass
+
+    results = list(Pipeline(_engine(), store=Store()).run([main]))
+
+    assert [issue.check_id for result in results for issue in result.issues] == ["truncate"]
@@ -0,0 +1,99 @@
+"""Tests for inline suppression comments."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.suppression import IGNORE_ALL, SuppressionIndex, find_suppressions
+
+
+def _engine():
+    return Engine([check_class() for check_class in ALL_CHECKS])
+
+
+def test_find_suppressions_requires_marker():
+    """Sources without the marker are never scanned."""
+    with patch("ddlcheck.core.suppression.scan") as mock_scan:
+        assert find_suppressions("TRUNCATE logs; -- ignore") is None
+    mock_scan.assert_not_called()
+
+
+def test_directives_are_only_read_from_comments():
+    """A directive inside a string literal is not a suppression."""
+    assert find_suppressions("SELECT 'ddlcheck:ignore-file';") is None
+
+
+def test_parse_check_lists():
+    """Check lists are comma-separated; anything after them is a comment."""
+    sql = "-- ddlcheck:ignore truncate, drop_table small table\nTRUNCATE logs;"
+    index = SuppressionIndex(sql)
+
+    assert index.for_statement(0, sql.index("TRUNCATE"), len(sql) - 1) == {
+        "truncate",
+        "drop_table",
+    }
+
+
+def test_bare_ignore_suppresses_every_check():
+    """A comment without check IDs suppresses every check."""
+    sql = "/* ddlcheck:ignore */ TRUNCATE logs;"
+    index = SuppressionIndex(sql)
+
+    assert index.for_statement(0, sql.index("TRUNCATE"), len(sql) - 1) == {IGNORE_ALL}
+
+
+def test_engine_applies_suppressions_per_statement():
+    """Each comment only silences its own statement."""
+    sql = (
+        "-- ddlcheck:ignore create_index\n"
+        "CREATE INDEX idx ON t (a);\n"
+        "TRUNCATE a; -- ddlcheck:ignore truncate\n"
+        "TRUNCATE b;\n"
+        "/* ddlcheck:ignore */ DROP TABLE x;\n"
+        "CREATE INDEX idx2 ON t (a);\n"
+    )
+    result = _engine().check_sql(sql, Path("test.sql"))
+
+    assert [(issue.check_id, issue.line) for issue in result.issues] == [
+        ("truncate", 4),
+        ("create_index", 6),
+    ]
+
+
+def test_engine_skips_suppressed_checks_before_running_them():
+    """Suppressed checks never see the statement."""
+    engine = _engine()
+    sql = "-- ddlcheck:ignore truncate\nTRUNCATE logs;"
+    truncate = next(check for check in engine.checks if check.id == "truncate")
+
+    with patch.object(truncate, "check_statement") as mock_check:
+        engine.check_sql(sql, Path("test.sql"))
+
+    mock_check.assert_not_called()
+
+
+def test_engine_ignore_file_skips_parsing():
+    """A ddlcheck:ignore-file comment skips the file without parsing it."""
+    with patch("ddlcheck.core.parsing.parse_sql") as mock_parse:
+        result = _engine().check_sql(
+            "-- legacy\n-- ddlcheck:ignore-file\nTRUNCATE logs;", Path("test.sql")
+        )
+
+    mock_parse.assert_not_called()
+    assert not result.has_issues()
+
+
+def test_suppressions_survive_scanner_errors():
+    """Comments are still found when the scanner rejects the source."""
+    sql = "-- ddlcheck:ignore truncate\nTRUNCATE logs;\nTRUNCATE audit;\nSELECT 'unterminated;\n"
+    index = SuppressionIndex(sql)
+
+    assert index.for_statement(0, sql.index("TRUNCATE"), sql.index("\n", 28)) == {"truncate"}
+    assert SuppressionIndex("SELECT 'a';\n/* ddlcheck:ignore-file */ SELECT 'b").ignore_file
+    assert find_suppressions("SELECT 'ddlcheck:ignore-file', 'unterminated") is None
+
+    lines = [issue.line for issue in _engine().check_sql(sql, Path("test.sql")).issues]
+
+    assert 2 not in lines
+    assert 3 in lines
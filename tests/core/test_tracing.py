@@ -0,0 +1,143 @@
+"""Tests for OTLP/JSON trace spans."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.tracing import Tracer, parse_traceparent
+from ddlcheck.models import Config
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+TRACEPARENT = f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+
+def _spans(document):
+    return document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+def _attributes(span):
+    return {item["key"]: next(iter(item["value"].values())) for item in span["attributes"]}
+
+
+def test_parse_traceparent():
+    """Valid W3C trace contexts are parsed and invalid ones ignored."""
+    assert parse_traceparent(TRACEPARENT) == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(TRACEPARENT.upper()) == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("00-abc-def-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_ID}-01") is None
+
+
+def test_spans_nest_under_the_callers_trace():
+    """The run joins the caller's trace, and files nest under the run in any thread."""
+    tracer = Tracer(TRACEPARENT, "vendor=value")
+
+    def check_file():
+        with tracer.span("check_file"):
+            with tracer.span("parse"):
+                pass
+
+    with tracer.run() as run:
+        worker = threading.Thread(target=check_file)
+        worker.start()
+        worker.join()
+        check_file()
+
+    spans = _spans(tracer.to_otlp())
+    (run_span,) = [span for span in spans if span["name"] == "ddlcheck check"]
+    files = [span for span in spans if span["name"] == "check_file"]
+    parses = [span for span in spans if span["name"] == "parse"]
+    assert run_span["traceId"] == TRACE_ID
+    assert run_span["parentSpanId"] == PARENT_ID
+    assert run_span["traceState"] == "vendor=value"
+    assert all(span["traceId"] == TRACE_ID for span in spans)
+    assert [span["parentSpanId"] for span in files] == [run.span_id] * 2
+    assert {span["parentSpanId"] for span in parses} == {span["spanId"] for span in files}
+
+
+def test_invalid_traceparent_starts_a_new_trace():
+    """Without a valid trace context the run starts its own trace."""
+    tracer = Tracer("garbage")
+    with tracer.run():
+        pass
+
+    (span,) = _spans(tracer.to_otlp())
+    assert span["traceId"] != TRACE_ID
+    assert len(span["traceId"]) == 32
+    assert "parentSpanId" not in span
+
+
+def test_engine_spans():
+    """Each file gets parse and run_checks spans, with a span per check that ran."""
+    tracer = Tracer()
+    engine = Engine([check_class(Config()) for check_class in ALL_CHECKS], tracer=tracer)
+    with tracer.run():
+        engine.check_sql("TRUNCATE a;\nTRUNCATE b;\nSELEC oops;\n", Path("a.sql"))
+
+    spans = _spans(tracer.to_otlp())
+    by_name = {span["name"]: span for span in spans}
+    assert _attributes(by_name["parse"]) == {
+        "ddlcheck.statements": "2",
+        "ddlcheck.parse_errors": "1",
+    }
+    assert _attributes(by_name["run_checks"])["ddlcheck.issues"] == "2"
+    truncate = by_name["truncate"]
+    assert truncate["parentSpanId"] == by_name["run_checks"]["spanId"]
+    assert _attributes(truncate)["ddlcheck.calls"] == "2"
+    assert _attributes(truncate)["ddlcheck.aggregated"] is True
+
+
+def test_cli_trace_output_file(tmp_path, monkeypatch):
+    """--trace-output writes the spans of the run, nested under $TRACEPARENT."""
+    monkeypatch.setenv("TRACEPARENT", TRACEPARENT)
+    (tmp_path / "a.sql").write_text("TRUNCATE logs;\n")
+    trace = tmp_path / "trace.json"
+
+    result = CliRunner().invoke(app, ["check", str(tmp_path), "--trace-output", str(trace)])
+
+    assert result.exit_code == 1
+    spans = {span["name"]: span for span in _spans(json.loads(trace.read_text()))}
+    run, file_span = spans["ddlcheck check"], spans["check_file"]
+    assert run["parentSpanId"] == PARENT_ID
+    assert file_span["parentSpanId"] == run["spanId"]
+    assert _attributes(file_span)["ddlcheck.issues"] == "1"
+    assert _attributes(run)["ddlcheck.files_checked"] == "1"
+
+
+def test_export_to_collector():
+    """Spans are posted as OTLP/JSON to an http:// destination."""
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, self.headers["Content-Type"], json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    tracer = Tracer()
+    with tracer.run():
+        pass
+
+    tracer.export(f"http://127.0.0.1:{server.server_port}/v1/traces")
+    thread.join()
+    server.server_close()
+
+    ((path, content_type, document),) = received
+    assert path == "/v1/traces"
+    assert content_type == "application/json"
+    assert _spans(document)[0]["name"] == "ddlcheck check"
@@ -0,0 +1,107 @@
+"""Tests for the columnar result store and the CSV and Parquet reporters."""
+
+import csv
+import io
+from pathlib import Path
+
+import pytest
+
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.reporters import ColumnStore, OutputFormat, RunSummary, get_reporter
+from ddlcheck.reporters.columnar import COLUMNS, StringTable
+
+
+def _issue(check_id, line, table=None, column=None, severity=SeverityLevel.HIGH):
+    return Issue(
+        check_id=check_id,
+        message=f"{check_id} on {table}",
+        line=line,
+        column=column,
+        severity=severity,
+        context={"table_name": table} if table else None,
+    )
+
+
+@pytest.fixture
+def results():
+    """Two files sharing check IDs, messages and tables."""
+    return [
+        CheckResult(
+            Path("a.sql"),
+            [_issue("truncate", 1, "logs", column=3), _issue("drop_column", 4, "users")],
+        ),
+        CheckResult(Path("clean.sql")),
+        CheckResult(Path("b.sql"), [_issue("truncate", 2, "logs", severity=SeverityLevel.LOW)]),
+        CheckResult(Path("c.sql"), [_issue("parse_error", 7)]),
+    ]
+
+
+def test_string_table_deduplicates():
+    """Each distinct string is stored once."""
+    table = StringTable()
+    assert table.add("logs") == 0
+    assert table.add("users") == 1
+    assert table.add("logs") == 0
+    assert len(table) == 2
+
+
+def test_column_store_rows(results):
+    """Rows come back in insertion order with repeated strings shared."""
+    store = ColumnStore()
+    for result in results:
+        store.add_result(result)
+
+    assert len(store) == 4
+    assert len(store.files) == 3
+    assert len(store.check_ids) == 3
+    assert list(store.rows()) == [
+        ("a.sql", 1, 3, "truncate", "HIGH", "truncate on logs", "logs"),
+        ("a.sql", 4, None, "drop_column", "HIGH", "drop_column on users", "users"),
+        ("b.sql", 2, None, "truncate", "LOW", "truncate on logs", "logs"),
+        ("c.sql", 7, None, "parse_error", "HIGH", "parse_error on None", None),
+    ]
+
+
+def test_csv_reporter(results):
+    """The CSV reporter writes a header and one row per issue."""
+    stream = io.StringIO()
+    reporter = get_reporter(OutputFormat.CSV, stream)
+    reporter.start([])
+    for result in results:
+        reporter.report(result)
+    reporter.finish(RunSummary(files_checked=4, issue_count=4))
+
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert tuple(rows[0]) == COLUMNS
+    assert len(rows) == 4
+    assert rows[0]["column"] == "3"
+    assert rows[2]["severity"] == "LOW"
+    assert rows[3]["table"] == ""
+
+
+def test_parquet_reporter(results):
+    """The Parquet reporter writes dictionary-encoded columns with nulls for gaps."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    stream = io.BytesIO()
+    reporter = get_reporter(OutputFormat.PARQUET, stream)
+    assert reporter.binary
+    reporter.start([])
+    for result in results:
+        reporter.report(result)
+    reporter.finish(RunSummary(files_checked=4, issue_count=4))
+
+    table = pq.read_table(io.BytesIO(stream.getvalue()))
+    assert table.column_names == list(COLUMNS)
+    rows = table.to_pylist()
+    assert rows[0] == {
+        "file": "a.sql",
+        "line": 1,
+        "column": 3,
+        "check_id": "truncate",
+        "severity": "HIGH",
+        "message": "truncate on logs",
+        "table": "logs",
+    }
+    assert rows[1]["column"] is None
+    assert rows[3]["table"] is None
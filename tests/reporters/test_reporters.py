@@ -0,0 +1,112 @@
+"""Tests for the machine-readable reporters."""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from ddlcheck.checks import TruncateCheck
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.reporters import OutputFormat, RunSummary, get_reporter
+
+
+@pytest.fixture
+def results():
+    """Results for one file with issues and one clean file."""
+    return [
+        CheckResult(
+            Path("migrations/001.sql"),
+            [
+                Issue(
+                    check_id="truncate",
+                    message="TRUNCATE operation on table 'logs'",
+                    line=3,
+                    column=5,
+                    severity=SeverityLevel.HIGH,
+                    suggestion="Use DELETE instead",
+                    context={"tables": ("logs",)},
+                ),
+                Issue(
+                    check_id="custom",
+                    message="Legacy <context>",
+                    line=7,
+                    severity=SeverityLevel.LOW,
+                    context="UPDATE logs SET ...",
+                ),
+            ],
+        ),
+        CheckResult(Path("migrations/002.sql")),
+    ]
+
+
+def _render(output_format, results, stop_reason=None):
+    stream = io.StringIO()
+    reporter = get_reporter(output_format, stream)
+    reporter.start([TruncateCheck()])
+    for result in results:
+        reporter.report(result)
+    reporter.finish(RunSummary(len(results), 2, stop_reason))
+    return stream.getvalue()
+
+
+def test_jsonl_reporter(results):
+    """Test that JSON Lines output has one record per issue and a summary."""
+    lines = [json.loads(line) for line in _render(OutputFormat.JSONL, results).splitlines()]
+
+    assert len(lines) == 3
+    assert lines[0] == {
+        "file": "migrations/001.sql",
+        "line": 3,
+        "column": 5,
+        "check_id": "truncate",
+        "severity": "HIGH",
+        "message": "TRUNCATE operation on table 'logs'",
+        "suggestion": "Use DELETE instead",
+        "context": {"tables": ["logs"]},
+    }
+    assert lines[1]["context"] == {"detail": "UPDATE logs SET ..."}
+    assert lines[2] == {
+        "summary": {"files_checked": 2, "issue_count": 2, "partial": False, "stop_reason": None}
+    }
+
+
+def test_json_reporter(results):
+    """Test that JSON output is a single valid document."""
+    document = json.loads(_render(OutputFormat.JSON, results, stop_reason="interrupted"))
+
+    assert [issue["line"] for issue in document["issues"]] == [3, 7]
+    assert document["summary"]["partial"] is True
+
+
+def test_json_reporter_no_issues():
+    """Test that JSON output is valid when nothing was found."""
+    document = json.loads(_render(OutputFormat.JSON, [CheckResult(Path("a.sql"))]))
+    assert document["issues"] == []
+
+
+def test_sarif_reporter(results):
+    """Test that SARIF output has rules, results and locations."""
+    log = json.loads(_render(OutputFormat.SARIF, results))
+    run = log["runs"][0]
+
+    assert log["version"] == "2.1.0"
+    assert run["tool"]["driver"]["rules"][0]["id"] == "truncate"
+    assert [result["level"] for result in run["results"]] == ["error", "note"]
+    location = run["results"][0]["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == "migrations/001.sql"
+    assert location["region"] == {"startLine": 3, "startColumn": 5}
+    assert run["invocations"][0]["executionSuccessful"] is True
+
+
+def test_junit_reporter(results):
+    """Test that JUnit output has a suite per file and a failure per issue."""
+    root = ET.fromstring(_render(OutputFormat.JUNIT, results, stop_reason="interrupted"))
+    suites = root.findall("testsuite")
+
+    assert [suite.get("name") for suite in suites] == ["migrations/001.sql", "ddlcheck"]
+    assert len(suites[0].findall("testcase/failure")) == 2
+    assert suites[0].find("testcase/failure").get("type") == "HIGH"
+    assert suites[1].find("testcase").get("name") == "1 files without issues"
+    assert suites[1].find("testcase/error") is not None
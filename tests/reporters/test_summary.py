@@ -0,0 +1,63 @@
+"""Tests for the summary reporter."""
+
+import io
+from pathlib import Path
+
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.reporters import RunSummary, SummaryReporter
+from ddlcheck.reporters.summary import issue_tables
+
+
+def _issue(check_id, severity=SeverityLevel.HIGH, **context):
+    return Issue(
+        check_id=check_id,
+        message="message",
+        line=1,
+        severity=severity,
+        suggestion=f"Fix {check_id}",
+        context=context,
+    )
+
+
+def test_issue_tables():
+    """Test extracting table names from issue contexts."""
+    assert list(issue_tables(_issue("a", table_name="users"))) == ["users"]
+    assert list(issue_tables(_issue("a", tables=["a", "b"]))) == ["a", "b"]
+    assert list(issue_tables(Issue("a", "m", 1, SeverityLevel.LOW, context="text"))) == []
+
+
+def test_summary_reporter_aggregates():
+    """Test that counts are grouped by check, severity and table."""
+    reporter = SummaryReporter(stream=io.StringIO(), top=2)
+    for i in range(5):
+        issues = [_issue("truncate", tables=["logs"]) for _ in range(i)]
+        issues.append(_issue("create_index", SeverityLevel.MEDIUM, table_name="users"))
+        reporter.report(CheckResult(Path(f"{i}.sql"), issues))
+
+    assert reporter.by_check == {"truncate": 10, "create_index": 5}
+    assert reporter.by_severity == {SeverityLevel.HIGH: 10, SeverityLevel.MEDIUM: 5}
+    assert reporter.by_table == {"logs": 10, "users": 5}
+    assert reporter.worst_files() == [(Path("4.sql"), 5), (Path("3.sql"), 4)]
+    assert reporter.suggestions == {"truncate": "Fix truncate", "create_index": "Fix create_index"}
+
+
+def test_summary_reporter_prints_suggestion_once_per_check():
+    """Test that each check's suggestion is rendered once."""
+    stream = io.StringIO()
+    reporter = SummaryReporter(stream=stream)
+    reporter.report(CheckResult(Path("a.sql"), [_issue("truncate") for _ in range(3)]))
+    reporter.finish(RunSummary(files_checked=1, issue_count=3))
+
+    output = stream.getvalue()
+    assert output.count("Fix truncate") == 1
+    assert "3 issues in 1 of 1 files" in output
+
+
+def test_summary_reporter_no_issues():
+    """Test output when nothing was found."""
+    stream = io.StringIO()
+    reporter = SummaryReporter(stream=stream)
+    reporter.report(CheckResult(Path("a.sql")))
+    reporter.finish(RunSummary(files_checked=1))
+
+    assert "No issues found" in stream.getvalue()
@@ -0,0 +1,147 @@
+"""Tests for baselines of known issues."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ddlcheck.baseline import (
+    Baseline,
+    BaselineBuilder,
+    baseline_path,
+    issue_fingerprint,
+    statement_fingerprint,
+)
+from ddlcheck.checks import ALL_CHECKS, TruncateCheck
+from ddlcheck.core.archives import MemberPath
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+from ddlcheck.history import content_hash
+from ddlcheck.models import SeverityLevel
+
+SQL = "-- cleanup\nTRUNCATE logs;\nALTER TABLE users DROP COLUMN email;\n"
+
+
+def _create(tmp_path, sql=SQL, name="001.sql", path=None):
+    path = path or tmp_path / name
+    path.write_text(sql)
+    engine = Engine(
+        [check_class() for check_class in ALL_CHECKS],
+        fingerprint_issues=True,
+        baseline_root=tmp_path,
+    )
+    builder = BaselineBuilder(engine.fingerprint(), tmp_path)
+    list(Pipeline(engine, workers=1, store=builder).run([path]))
+    builder.save(tmp_path / "baseline.json")
+    return path, Baseline.load(tmp_path / "baseline.json")
+
+
+def test_statement_fingerprint_ignores_formatting():
+    """Statement fingerprints ignore whitespace, comments and literals."""
+    assert statement_fingerprint("TRUNCATE logs") == statement_fingerprint(
+        "truncate   /* old */ logs"
+    )
+    assert statement_fingerprint("TRUNCATE logs") != statement_fingerprint("TRUNCATE users")
+    assert statement_fingerprint("NOT  SQL") == "not sql"
+
+
+def test_issue_fingerprint_depends_on_check_and_path():
+    """Issue fingerprints differ by check and by file."""
+    base = issue_fingerprint("truncate", "abc", "a.sql")
+    assert base == issue_fingerprint("truncate", "abc", "a.sql")
+    assert base != issue_fingerprint("drop_table", "abc", "a.sql")
+    assert base != issue_fingerprint("truncate", "abc", "b.sql")
+
+
+def test_baseline_path_is_relative_to_root(tmp_path, monkeypatch):
+    """Recorded paths are relative to the baseline's directory, except archive members."""
+    monkeypatch.chdir(tmp_path)
+
+    assert baseline_path(tmp_path / "db" / "001.sql", tmp_path / "db") == "001.sql"
+    assert baseline_path(Path("db/001.sql"), tmp_path / "db") == "001.sql"
+    assert baseline_path(Path("001.sql"), tmp_path / "db") == "../001.sql"
+    assert baseline_path(Path("db/001.sql"), None) == "db/001.sql"
+    assert baseline_path(MemberPath("db/001.sql"), tmp_path / "other") == "db/001.sql"
+
+
+def test_baseline_round_trip(tmp_path):
+    """A created baseline records every issue and the file's hash."""
+    path, baseline = _create(tmp_path)
+
+    assert len(baseline) == 2
+    assert baseline.file_hashes == {"001.sql": content_hash(SQL)}
+    assert baseline.root == tmp_path
+
+
+def test_baseline_suppresses_moved_issues(tmp_path):
+    """Known issues are suppressed even when they move to another line."""
+    path, baseline = _create(tmp_path)
+    engine = Engine([check_class() for check_class in ALL_CHECKS], baseline=baseline)
+    moved = "\n\nALTER TABLE users DROP COLUMN email;\ntruncate   logs;\nTRUNCATE audit;\n"
+
+    result = engine.check_sql(moved, path)
+
+    assert [issue.message for issue in result.issues] == ["TRUNCATE operation on table 'audit'"]
+    assert result.issues[0].fingerprint is not None
+    assert engine.suppressed == 2
+
+
+def test_baseline_counts_repeated_statements(tmp_path):
+    """Another copy of a known statement is reported."""
+    path, baseline = _create(tmp_path, "TRUNCATE logs;\n")
+    engine = Engine([TruncateCheck()], baseline=baseline)
+
+    result = engine.check_sql("TRUNCATE logs;\nTRUNCATE logs;\n", path)
+
+    assert len(result.issues) == 1
+    assert engine.suppressed == 1
+
+
+def test_baseline_skips_unchanged_files(tmp_path):
+    """Unchanged files are not parsed when the engine matches the baseline."""
+    path, baseline = _create(tmp_path)
+    engine = Engine([check_class() for check_class in ALL_CHECKS], baseline=baseline)
+
+    with patch("ddlcheck.core.parsing.parse_sql") as mock_parse:
+        result = engine.check_sql(SQL, path)
+
+    mock_parse.assert_not_called()
+    assert not result.has_issues()
+
+
+def test_baseline_does_not_skip_with_other_checks(tmp_path):
+    """Files are checked again when the checks changed since the baseline."""
+    path, baseline = _create(tmp_path)
+    engine = Engine(
+        [check_class() for check_class in ALL_CHECKS], SeverityLevel.HIGH, baseline=baseline
+    )
+
+    result = engine.check_sql(SQL, path)
+
+    assert not result.has_issues()
+    assert engine.suppressed > 0
+
+
+def test_baseline_load_rejects_other_files(tmp_path):
+    """Loading something that is not a baseline fails clearly."""
+    path = tmp_path / "other.json"
+    path.write_text('{"issues": []}')
+
+    with pytest.raises(ValueError):
+        Baseline.load(path)
+
+
+def test_baseline_matches_relative_and_absolute_paths(tmp_path, monkeypatch):
+    """A baseline created with relative paths matches absolute paths, and vice versa."""
+    (tmp_path / "db").mkdir()
+    monkeypatch.chdir(tmp_path)
+    _, baseline = _create(tmp_path, path=Path("db/001.sql"))
+    engine = Engine([check_class() for check_class in ALL_CHECKS], baseline=baseline)
+
+    absolute = engine.check_sql(SQL + "TRUNCATE audit;\n", tmp_path / "db" / "001.sql")
+    monkeypatch.chdir(tmp_path / "db")
+    relative = engine.check_sql(SQL + "TRUNCATE audit;\n", Path("001.sql"))
+
+    assert [issue.message for issue in absolute.issues] == ["TRUNCATE operation on table 'audit'"]
+    assert [issue.message for issue in relative.issues] == ["TRUNCATE operation on table 'audit'"]
+    assert engine.suppressed == 4
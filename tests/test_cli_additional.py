@@ -1,6 +1,8 @@
 """Additional tests for the CLI functionality."""
 
+import json
 import os
+import zipfile
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 from unittest.mock import patch
@@ -8,8 +10,9 @@ from unittest.mock import patch
 import pytest
 from typer.testing import CliRunner
 
-from ddlcheck.cli import app, display_results, find_sql_files, format_severity
+from ddlcheck.cli import app, console, find_sql_files, format_severity
 from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.reporters import RunSummary, TextReporter
 
 
 @pytest.fixture
@@ -101,14 +104,25 @@ def test_find_sql_files_directory():
         assert file_names == {"file1.sql", "file2.sql", "nested.sql"}
 
 
-def test_display_results_no_issues():
-    """Test display_results with no issues."""
+def report_text(results):
+    """Report results as ``ddlcheck check`` prints them to the console."""
+    reporter = TextReporter(console=console)
+    summary = RunSummary()
+    for result in results:
+        summary.files_checked += 1
+        summary.issue_count += len(result.issues)
+        reporter.report(result)
+    reporter.finish(summary)
+
+
+def test_report_text_no_issues():
+    """Test text results with no issues."""
     # Create a check result with no issues
     result = CheckResult(Path("test.sql"))
 
     # Mock console.print
     with patch("ddlcheck.cli.console.print") as mock_print:
-        display_results([result])
+        report_text([result])
 
         # Should print "No issues found"
         mock_print.assert_called_once()
@@ -116,8 +130,8 @@ def test_display_results_no_issues():
         assert "No issues found" in args
 
 
-def test_display_results_with_issues():
-    """Test display_results with issues."""
+def test_report_text_with_issues():
+    """Test text results with issues."""
     # Create a check result with issues
     result = CheckResult(Path("test.sql"))
     issue = Issue(
@@ -130,7 +144,7 @@ def test_display_results_with_issues():
 
     # Mock console.print
     with patch("ddlcheck.cli.console.print") as mock_print:
-        display_results([result])
+        report_text([result])
 
         # Should print the table with issues
         assert mock_print.call_count >= 2
@@ -150,8 +164,8 @@ def test_display_results_with_issues():
         assert table_call
 
 
-def test_display_results_with_suggestion():
-    """Test display_results with suggestion."""
+def test_report_text_with_suggestion():
+    """Test text results with suggestion."""
     # Create a check result with an issue that has a suggestion
     result = CheckResult(Path("test.sql"))
     issue = Issue(
@@ -165,7 +179,7 @@ def test_display_results_with_suggestion():
 
     # Mock console.print
     with patch("ddlcheck.cli.console.print") as mock_print:
-        display_results([result])
+        report_text([result])
 
         # Should print suggestion panel
         panel_call = False
@@ -232,3 +246,225 @@ def test_cli_list_checks(runner):
     assert "add_column" in result.stdout
     assert "HIGH" in result.stdout  # Severity level
     assert "MEDIUM" in result.stdout  # Severity level
+
+
+def test_cli_check_fail_fast(runner):
+    """Test that --fail-fast stops after the first matching issue."""
+    with TemporaryDirectory() as temp_dir:
+        for i in range(20):
+            (Path(temp_dir) / f"{i:02d}.sql").write_text("TRUNCATE logs;")
+
+        result = runner.invoke(app, ["check", "--fail-fast", "--jobs", "1", temp_dir])
+
+    assert result.exit_code == 1
+    assert "Partial results" in result.stdout
+    assert "Found 20 issues" not in result.stdout
+
+
+def test_cli_check_fail_fast_fail_on_threshold(runner):
+    """Test that issues below the fail-fast severity do not stop the run."""
+    with TemporaryDirectory() as temp_dir:
+        for i in range(5):
+            (Path(temp_dir) / f"{i:02d}.sql").write_text("CREATE INDEX idx ON t (c);")
+
+        result = runner.invoke(app, ["check", "--fail-fast", "--fail-on", "HIGH", temp_dir])
+
+    assert result.exit_code == 0
+    assert "Partial results" not in result.stdout
+    assert "Found 5 issues below --fail-on HIGH" in result.stdout
+
+
+def test_cli_check_max_time(runner, risky_sql_file):
+    """Test that an exhausted time budget is reported as partial."""
+    result = runner.invoke(app, ["check", "--max-time", "0", str(risky_sql_file)])
+
+    assert "Partial results" in result.stdout
+    assert "time budget" in result.stdout
+
+
+def test_cli_check_keyboard_interrupt(runner, risky_sql_file):
+    """Test that Ctrl-C prints a partial report instead of a traceback."""
+    with patch("ddlcheck.cli.Pipeline.run", side_effect=KeyboardInterrupt):
+        result = runner.invoke(app, ["check", str(risky_sql_file)])
+
+    assert result.exit_code == 130
+    assert "Partial results" in result.stdout
+    assert "interrupted" in result.stdout
+
+
+def test_cli_check_min_severity(runner, risky_sql_file):
+    """Test that --min-severity hides lower severity issues."""
+    result = runner.invoke(app, ["check", "--min-severity", "HIGH", str(risky_sql_file)])
+
+    assert result.exit_code == 1
+    assert "truncate" in result.stdout
+    assert "create_index" not in result.stdout
+    assert "MEDIUM" not in result.stdout
+
+
+def test_cli_check_fail_on(runner):
+    """Test that --fail-on only fails for issues at or above the threshold."""
+    with NamedTemporaryFile(suffix=".sql", mode="w", delete=False) as temp_file:
+        temp_file.write("CREATE INDEX idx ON t (c);")
+        temp_path = Path(temp_file.name)
+
+    try:
+        passing = runner.invoke(app, ["check", "--fail-on", "HIGH", str(temp_path)])
+        failing = runner.invoke(app, ["check", "--fail-on", "MEDIUM", str(temp_path)])
+    finally:
+        os.unlink(temp_path)
+
+    assert passing.exit_code == 0
+    assert "create_index" in passing.stdout
+    assert failing.exit_code == 1
+
+
+def test_cli_check_jsonl_output_file(runner, risky_sql_file):
+    """Test writing JSON Lines results to a file."""
+    with TemporaryDirectory() as temp_dir:
+        output = Path(temp_dir) / "results.jsonl"
+        result = runner.invoke(
+            app, ["check", "--format", "jsonl", "--output", str(output), str(risky_sql_file)]
+        )
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert result.exit_code == 1
+    assert records[-1]["summary"]["issue_count"] == len(records) - 1
+    assert {"file", "line", "column", "check_id", "severity"} <= set(records[0])
+
+
+def test_cli_check_json_stdout(risky_sql_file):
+    """Test that machine-readable output on stdout is not mixed with status messages."""
+    result = CliRunner(mix_stderr=False).invoke(
+        app, ["check", "--format", "json", str(risky_sql_file)]
+    )
+
+    document = json.loads(result.stdout)
+    assert document["summary"]["issue_count"] == len(document["issues"])
+
+
+def test_cli_check_summary_format(runner, test_sql_dir):
+    """Test the summary output format."""
+    result = runner.invoke(app, ["check", "--format", "summary", "--top", "1", str(test_sql_dir)])
+
+    assert result.exit_code == 1
+    assert "Issues by check" in result.stdout
+    assert "Files with the most issues" in result.stdout
+    assert "risky_operations.sql" in result.stdout
+
+
+def test_cli_check_parquet_output_file(runner, risky_sql_file):
+    """Test writing Parquet results to a file."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    with TemporaryDirectory() as temp_dir:
+        output = Path(temp_dir) / "results.parquet"
+        result = runner.invoke(
+            app, ["check", "--format", "parquet", "--output", str(output), str(risky_sql_file)]
+        )
+        table = pq.read_table(output)
+
+    assert result.exit_code == 1
+    assert table.num_rows > 0
+    assert "check_id" in table.column_names
+
+
+def test_cli_check_history(runner, test_sql_dir):
+    """Test recording runs and querying the history."""
+    with TemporaryDirectory() as temp_dir:
+        database = Path(temp_dir) / "history.sqlite"
+        for _ in range(2):
+            result = runner.invoke(app, ["check", "--history", str(database), str(test_sql_dir)])
+            assert result.exit_code == 1
+
+        runs = runner.invoke(app, ["history", str(database)])
+        by_check = runner.invoke(app, ["history", str(database), "--by-check", "--regressions"])
+
+    assert runs.exit_code == 0
+    assert "Runs" in runs.stdout
+    assert "+0" in runs.stdout
+    assert by_check.exit_code == 0
+    assert "truncate" in by_check.stdout
+    assert "No new issues in run 2" in by_check.stdout
+
+
+def test_cli_baseline_create_and_check(runner):
+    """Test that a baseline hides existing issues but not new ones."""
+    with TemporaryDirectory() as temp_dir:
+        sql_file = Path(temp_dir) / "001.sql"
+        sql_file.write_text("TRUNCATE logs;\n")
+        baseline = Path(temp_dir) / "baseline.json"
+
+        created = runner.invoke(
+            app, ["baseline", "create", "--output", str(baseline), str(sql_file)]
+        )
+        clean = runner.invoke(app, ["check", "--baseline", str(baseline), str(sql_file)])
+        sql_file.write_text("TRUNCATE logs;\nTRUNCATE users;\n")
+        new = runner.invoke(app, ["check", "--baseline", str(baseline), str(sql_file)])
+
+    assert created.exit_code == 0
+    assert "Recorded 1 issues" in created.stdout
+    assert clean.exit_code == 0
+    assert new.exit_code == 1
+    assert "users" in new.stdout
+    assert "1 known issues suppressed" in new.stdout
+
+
+def test_cli_baseline_relative_and_absolute_paths(runner, tmp_path, monkeypatch):
+    """Test that a baseline created with relative paths applies to absolute ones."""
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "ci").mkdir()
+    sql_file = tmp_path / "migrations" / "001.sql"
+    sql_file.write_text("TRUNCATE logs;\n")
+    monkeypatch.chdir(tmp_path)
+
+    created = runner.invoke(
+        app, ["baseline", "create", "--output", "ci/baseline.json", "migrations"]
+    )
+    monkeypatch.chdir(tmp_path / "migrations")
+    checked = runner.invoke(
+        app, ["check", "--baseline", str(tmp_path / "ci" / "baseline.json"), str(sql_file)]
+    )
+
+    assert created.exit_code == 0
+    assert '"file": "../migrations/001.sql"' in (tmp_path / "ci" / "baseline.json").read_text()
+    assert checked.exit_code == 0
+
+
+def test_cli_check_psql_variables(runner):
+    """Test that --set defines psql variables for every script."""
+    with TemporaryDirectory() as temp_dir:
+        sql_file = Path(temp_dir) / "001.sql"
+        sql_file.write_text("TRUNCATE :table_name;\n")
+        result = runner.invoke(
+            app, ["check", "--format", "jsonl", "--set", "table_name=audit_logs", str(sql_file)]
+        )
+        invalid = runner.invoke(app, ["check", "--set", "=audit", str(sql_file)])
+
+    assert result.exit_code == 1
+    assert "audit_logs" in result.stdout
+    assert invalid.exit_code == 2
+
+
+def test_cli_check_python_migrations(runner):
+    """Test that --python checks the SQL of Python migrations."""
+    with TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / "0001.py").write_text('op.execute("TRUNCATE logs")\n')
+        without = runner.invoke(app, ["check", temp_dir])
+        result = runner.invoke(app, ["check", "--python", temp_dir])
+
+    assert without.exit_code == 1
+    assert "No SQL files found" in without.stdout
+    assert result.exit_code == 1
+    assert "truncate" in result.stdout
+
+
+def test_cli_check_archive(runner):
+    """Test that archives are checked without extracting them."""
+    with TemporaryDirectory() as temp_dir:
+        archive_path = Path(temp_dir) / "release.zip"
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("migrations/001.sql", "TRUNCATE logs;\n")
+        result = runner.invoke(app, ["check", "--format", "jsonl", str(archive_path)])
+
+    assert result.exit_code == 1
+    assert '"file": "migrations/001.sql"' in result.stdout
@@ -0,0 +1,144 @@
+"""Tests for the SQLite result history."""
+
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from ddlcheck.checks import ALL_CHECKS
+from ddlcheck.cli import app
+from ddlcheck.core.engine import Engine
+from ddlcheck.core.pipeline import Pipeline
+from ddlcheck.history import HistoryStore, content_hash, runs_table
+from ddlcheck.models import Config, Issue, SeverityLevel
+
+
+@pytest.fixture
+def engine():
+    """Engine with every check enabled."""
+    return Engine([check_class(Config()) for check_class in ALL_CHECKS])
+
+
+@pytest.fixture
+def sql_dir(tmp_path):
+    """Directory with a risky and a clean migration."""
+    (tmp_path / "risky.sql").write_text("TRUNCATE logs;\nALTER TABLE t DROP COLUMN c;\n")
+    (tmp_path / "clean.sql").write_text("SELECT 1;\n")
+    return tmp_path
+
+
+def _run(store, engine, sql_dir):
+    store.start_run(sql_dir, engine.fingerprint())
+    pipeline = Pipeline(engine, workers=2, store=store)
+    results = list(pipeline.run(sorted(sql_dir.glob("*.sql"))))
+    store.finish_run(pipeline.files_checked, sum(len(r.issues) for r in results))
+    return results
+
+
+def test_record_and_reuse(tmp_path, engine, sql_dir):
+    """A second run reuses stored results for unchanged files."""
+    database = tmp_path / "history.sqlite"
+    with HistoryStore(database, batch_size=1) as store:
+        first = _run(store, engine, sql_dir)
+        assert store.files_reused == 0
+
+    with HistoryStore(database) as store:
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(engine, "check_sql", pytest.fail)
+            second = _run(store, engine, sql_dir)
+        assert store.files_reused == 2
+        runs = store.runs()
+
+    assert [issue.to_dict() for issue in second[0].issues] == [
+        issue.to_dict() for issue in first[0].issues
+    ]
+    assert [run.files_checked for run in runs] == [2, 2]
+    assert [run.files_reused for run in runs] == [0, 2]
+    assert runs[0].issue_count == runs[1].issue_count == 2
+
+
+def test_changed_fingerprint_is_not_reused(tmp_path, engine, sql_dir):
+    """Results recorded with other checks or options are not reused."""
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        _run(store, engine, sql_dir)
+        _run(store, Engine(engine.checks, SeverityLevel.HIGH), sql_dir)
+        assert store.files_reused == 0
+
+
+def test_check_counts_and_new_issues(tmp_path):
+    """Trend queries count issues per check and find new issues."""
+    issue = Issue("truncate", "TRUNCATE operation on table 'logs'", 1, SeverityLevel.HIGH)
+    new = Issue("drop_column", "Column 'c' dropped", 2, SeverityLevel.HIGH)
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        first = store.start_run("migrations", "x")
+        store.record(Path("a.sql"), content_hash("a"), [issue])
+        store.finish_run(1, 1)
+        second = store.start_run("migrations", "x")
+        moved = Issue(issue.check_id, issue.message, 5, issue.severity)
+        store.record(Path("a.sql"), content_hash("b"), [moved, new])
+        store.finish_run(1, 2)
+
+        assert store.check_counts([first, second]) == {
+            "truncate": {first: 1, second: 1},
+            "drop_column": {second: 1},
+        }
+        assert store.new_issues(second, first) == [
+            ("a.sql", 2, "drop_column", "HIGH", "Column 'c' dropped")
+        ]
+        assert [run.id for run in store.runs(limit=1)] == [second]
+        assert store.runs(root="elsewhere") == []
+
+
+def test_record_requires_started_run(tmp_path):
+    """Recording before a run is started is an error."""
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        with pytest.raises(RuntimeError):
+            store.record(Path("a.sql"), "hash", [])
+
+
+def test_extracted_fragments_persist(tmp_path):
+    """SQL extracted from Python migrations is kept for later runs."""
+    from ddlcheck.core.migrations import SQLFragment
+
+    fragments = [SQLFragment("TRUNCATE logs", 3, 16, True)]
+    with HistoryStore(tmp_path / "history.db") as store:
+        assert store.get_fragments("abc") is None
+        store.put_fragments("abc", fragments)
+
+    with HistoryStore(tmp_path / "history.db") as store:
+        assert store.get_fragments("abc") == fragments
+
+
+def test_baseline_runs_do_not_share_results(tmp_path, sql_dir):
+    """Results filtered by a baseline are not reused without it, and vice versa."""
+    database = tmp_path / "history.sqlite"
+    baseline = tmp_path / "baseline.json"
+    runner = CliRunner()
+    runner.invoke(app, ["baseline", "create", str(sql_dir), "-o", str(baseline)])
+    (sql_dir / "new.sql").write_text("TRUNCATE events;\n")
+
+    def issues(*options):
+        output = tmp_path / "issues.jsonl"
+        runner.invoke(
+            app,
+            ["check", str(sql_dir), "--history", str(database), "-f", "jsonl", "-o", str(output)]
+            + list(options),
+        )
+        return sum('"check_id"' in line for line in output.read_text().splitlines())
+
+    assert issues("--baseline", str(baseline)) == 1
+    assert issues() == 3
+    assert issues("--baseline", str(baseline)) == 1
+
+
+def test_runs_table_shows_change_and_unfinished_runs(tmp_path, engine, sql_dir):
+    """The runs table shows the change in issues and dashes for an unfinished run."""
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        _run(store, engine, sql_dir)
+        _run(store, engine, sql_dir)
+        store.start_run(sql_dir, engine.fingerprint())
+        table = runs_table(store.runs())
+
+    columns = {column.header: list(column.cells) for column in table.columns}
+    assert columns["Issues"] == ["2", "2", "-"]
+    assert columns["Change"] == ["", "+0", ""]
@@ -1,13 +1,21 @@
 """Tests for the logger module."""
 
+import json
 import logging
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ddlcheck.logger import setup_logging
+from ddlcheck import logger as ddlcheck_logger
+from ddlcheck.logger import LogFormat, setup_logging, stop_logging
+
+
+def _listener_handlers():
+    return list(ddlcheck_logger._listener.handlers)
 
 
 def test_setup_logging_basic():
@@ -20,10 +28,13 @@ def test_setup_logging_basic():
     # Set up logging with default parameters
     setup_logging()
 
-    # Check that root logger has a handler
+    # Records are queued and written to the console by the listener
     assert len(root_logger.handlers) == 1
-    assert isinstance(root_logger.handlers[0], logging.StreamHandler)
+    assert isinstance(root_logger.handlers[0], QueueHandler)
+    (console,) = _listener_handlers()
+    assert isinstance(console, logging.StreamHandler)
     assert root_logger.level == logging.INFO
+    stop_logging()
 
 
 def test_setup_logging_debug_level():
@@ -61,14 +72,15 @@ def test_setup_logging_with_file():
         # Set up logging with a file
         setup_logging("INFO", log_file)
 
-        # Check that root logger has both handlers
-        assert len(root_logger.handlers) == 2
-        assert isinstance(root_logger.handlers[0], logging.StreamHandler)
-        assert isinstance(root_logger.handlers[1], logging.handlers.RotatingFileHandler)
+        # Check that the listener writes to both handlers
+        console, file_handler = _listener_handlers()
+        assert isinstance(console, logging.StreamHandler)
+        assert isinstance(file_handler, RotatingFileHandler)
 
-        # Test logging to file
+        # Test logging to file, which is written once the queue is drained
         test_message = "Test log message"
         logging.info(test_message)
+        stop_logging()
 
         # Check that the message was written to the file
         with open(log_file, "r") as f:
@@ -96,6 +108,7 @@ def test_setup_logging_nested_directory():
 
         # Log something to create the file
         logging.info("Test log message")
+        stop_logging()
 
         # Log file should exist
         assert log_file.exists()
@@ -123,3 +136,46 @@ def test_pglast_logger_level():
 
     # Check that pglast logger level was set to WARNING
     pglast_logger.setLevel.assert_called_once_with(logging.WARNING)
+
+
+def test_setup_logging_writes_off_the_logging_thread():
+    """Handlers run in the listener's thread, not in the thread that logs."""
+    written = []
+
+    class Recorder(logging.Handler):
+        def emit(self, record):
+            written.append((record.getMessage(), threading.current_thread()))
+
+    setup_logging()
+    ddlcheck_logger._listener.handlers = (Recorder(),)
+    logging.getLogger("ddlcheck.test").info("Checked %d files", 3)
+    stop_logging()
+
+    assert written == [("Checked 3 files", written[0][1])]
+    assert written[0][1] is not threading.current_thread()
+
+
+def test_setup_logging_json_lines():
+    """JSON log records carry their fields, extra fields and exceptions."""
+    with TemporaryDirectory() as temp_dir:
+        log_file = Path(temp_dir) / "test.log"
+        setup_logging("DEBUG", log_file, LogFormat.JSON)
+
+        test_logger = logging.getLogger("ddlcheck.test")
+        test_logger.info("Checked %s", "a.sql", extra={"file": "a.sql", "issues": 2})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            test_logger.exception("Failed")
+        stop_logging()
+
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+
+    checked = next(record for record in records if record["message"] == "Checked a.sql")
+    assert checked["level"] == "INFO"
+    assert checked["logger"] == "ddlcheck.test"
+    assert checked["file"] == "a.sql"
+    assert checked["issues"] == 2
+    assert "time" in checked and "thread" in checked
+    failed = next(record for record in records if record["message"] == "Failed")
+    assert "ValueError: boom" in failed["exception"]
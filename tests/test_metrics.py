@@ -0,0 +1,95 @@
+"""Tests for the Prometheus metrics textfile."""
+
+from typer.testing import CliRunner
+
+from ddlcheck.cli import app
+from ddlcheck.core.profiling import Timings
+from ddlcheck.metrics import RunMetrics, render, write_textfile
+
+
+def _metrics(**overrides):
+    values = dict(
+        files_checked=4,
+        statements_parsed=10,
+        characters_checked=300,
+        parse_errors=1,
+        duration_seconds=2.0,
+        workers=2,
+        partial=False,
+        issues={("truncate", "HIGH"): 3},
+        timestamp=1700000000.0,
+    )
+    values.update(overrides)
+    return RunMetrics(**values)
+
+
+def test_render_totals_and_issues():
+    """Totals are gauges and issues are labelled by check and severity."""
+    text = render(_metrics())
+
+    assert "# TYPE ddlcheck_files_checked gauge\nddlcheck_files_checked 4\n" in text
+    assert "ddlcheck_statements_parsed 10\n" in text
+    assert "ddlcheck_parse_errors 1\n" in text
+    assert 'ddlcheck_issues{check_id="truncate",severity="HIGH"} 3\n' in text
+    assert "ddlcheck_run_partial 0\n" in text
+    assert "ddlcheck_last_run_timestamp_seconds 1700000000\n" in text
+    # Without a history or timings there is no hit ratio, utilization or histogram
+    assert "history_hit_ratio" not in text
+    assert "worker_utilization" not in text
+    assert text.endswith("\n")
+
+
+def test_render_history_and_timings():
+    """The history hit ratio, worker utilization and histograms are included when known."""
+    timings = Timings()
+    timings.timer(timings.phases, "parse").add(20_000)  # 20µs
+    timings.timer(timings.phases, "parse").add(3 * 10**9)  # 3s
+    timings.file_time.add(10**9)
+
+    text = render(_metrics(files_reused=1, timings=timings))
+
+    assert "ddlcheck_history_hit_ratio 0.25\n" in text
+    assert "ddlcheck_worker_utilization 0.25\n" in text
+    assert 'ddlcheck_phase_duration_seconds_bucket{phase="parse",le="1e-05"} 0\n' in text
+    assert 'ddlcheck_phase_duration_seconds_bucket{phase="parse",le="2.5e-05"} 1\n' in text
+    assert 'ddlcheck_phase_duration_seconds_bucket{phase="parse",le="5.0"} 2\n' in text
+    assert 'ddlcheck_phase_duration_seconds_bucket{phase="parse",le="+Inf"} 2\n' in text
+    assert 'ddlcheck_phase_duration_seconds_sum{phase="parse"} 3.00002\n' in text
+    assert 'ddlcheck_phase_duration_seconds_count{phase="parse"} 2\n' in text
+    assert "ddlcheck_file_duration_seconds_count 1\n" in text
+
+
+def test_render_escapes_label_values():
+    """Quotes and backslashes in label values are escaped."""
+    text = render(_metrics(issues={('odd"check\\', "LOW"): 1}))
+
+    assert 'check_id="odd\\"check\\\\"' in text
+
+
+def test_write_textfile_replaces_atomically(tmp_path):
+    """The file is replaced as a whole and no temporary file is left behind."""
+    path = tmp_path / "ddlcheck.prom"
+    path.write_text("old\n")
+
+    write_textfile(path, "new\n")
+
+    assert path.read_text() == "new\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["ddlcheck.prom"]
+
+
+def test_cli_metrics_file(tmp_path):
+    """--metrics-file writes the run's metrics without printing a profile."""
+    (tmp_path / "a.sql").write_text("TRUNCATE logs;\nSELEC oops;\n")
+    metrics = tmp_path / "metrics" / "ddlcheck.prom"
+    metrics.parent.mkdir()
+
+    result = CliRunner().invoke(app, ["check", str(tmp_path), "--metrics-file", str(metrics)])
+
+    assert result.exit_code == 1
+    assert "Phase timings" not in result.stdout
+    text = metrics.read_text()
+    assert "ddlcheck_files_checked 1\n" in text
+    assert "ddlcheck_statements_parsed 1\n" in text
+    assert "ddlcheck_parse_errors 1\n" in text
+    assert 'ddlcheck_issues{check_id="truncate",severity="HIGH"} 1\n' in text
+    assert 'ddlcheck_phase_duration_seconds_count{phase="parse"} 1\n' in text
@@ -307,3 +307,14 @@ def test_check_result_repr():
     repr_str = repr(result)
     assert "test.sql" in repr_str
     assert "1" in repr_str  # Number of issues
+
+
+def test_severity_level_ordering():
+    """Test that severity levels compare from least to most severe."""
+    assert SeverityLevel.INFO < SeverityLevel.LOW < SeverityLevel.MEDIUM < SeverityLevel.HIGH
+    assert SeverityLevel.HIGH >= SeverityLevel.HIGH
+    assert max(SeverityLevel.LOW, SeverityLevel.MEDIUM) == SeverityLevel.MEDIUM
+    assert sorted([SeverityLevel.HIGH, SeverityLevel.INFO]) == [
+        SeverityLevel.INFO,
+        SeverityLevel.HIGH,
+    ]
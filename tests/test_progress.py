@@ -0,0 +1,104 @@
+"""Tests for run progress reporting."""
+
+import io
+
+from rich.console import Console
+from typer.testing import CliRunner
+
+from ddlcheck.cli import app
+from ddlcheck.models import CheckResult, Issue, SeverityLevel
+from ddlcheck.progress import RunProgress, format_duration
+
+
+def _console():
+    return Console(file=io.StringIO(), width=200)
+
+
+def _paths(tmp_path, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"{i}.sql"
+        path.write_text("x" * size)
+        paths.append(path)
+    return paths
+
+
+def test_format_duration():
+    """Durations are shown in the largest two units."""
+    assert format_duration(42.4) == "42s"
+    assert format_duration(185) == "3m05s"
+    assert format_duration(3720) == "1h02m"
+
+
+def test_line_and_eta(tmp_path):
+    """The line shows files, megabytes, throughput, ETA by bytes and issues by severity."""
+    paths = _paths(tmp_path, [1024 * 1024, 3 * 1024 * 1024])
+    progress = RunProgress(paths, _console(), live=False)
+    issues = [
+        Issue("truncate", "m", 1, SeverityLevel.HIGH),
+        Issue("add_column", "m", 2, SeverityLevel.MEDIUM),
+        Issue("truncate", "m", 3, SeverityLevel.HIGH),
+    ]
+    progress.advance(CheckResult(paths[0], issues))
+
+    line = progress.line(progress._started + 10)
+
+    # A quarter of the bytes took 10s, so the rest takes 30s
+    assert line == "1/2 files, 1.0/4.0 MB, 0 files/s, ETA 30s, 3 issues (2 high, 1 medium)"
+
+
+def test_updates_are_throttled(tmp_path):
+    """Plain lines are printed at most once per interval, plus a last one."""
+    paths = _paths(tmp_path, [10] * 50)
+    console = _console()
+    progress = RunProgress(paths, console, live=False, interval=3600)
+    progress.start()
+    for path in paths:
+        progress.advance(CheckResult(path))
+    progress.finish()
+
+    lines = console.file.getvalue().splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("50/50 files")
+    assert "ETA" not in lines[0]
+
+
+def test_progress_bar(tmp_path):
+    """On a terminal a progress bar is drawn and removed at the end."""
+    paths = _paths(tmp_path, [10] * 3)
+    console = Console(file=io.StringIO(), width=200, force_terminal=True)
+    progress = RunProgress(paths, console, live=True, interval=0)
+    progress.start()
+    for path in paths:
+        progress.advance(CheckResult(path))
+    progress.finish()
+
+    assert "3/3 files" in console.file.getvalue()
+
+
+def test_cli_progress_lines(tmp_path):
+    """--progress prints plain lines when not on a terminal."""
+    (tmp_path / "a.sql").write_text("TRUNCATE logs;\n")
+
+    result = CliRunner().invoke(app, ["check", str(tmp_path), "--progress"])
+    quiet = CliRunner().invoke(app, ["check", str(tmp_path)])
+
+    assert result.exit_code == 1
+    assert "1/1 files" in result.stdout
+    assert "1 issues (1 high)" in result.stdout
+    assert "1/1 files" not in quiet.stdout
+
+
+def test_cli_progress_counts_clean_files(tmp_path):
+    """Files without issues advance the progress too."""
+    (tmp_path / "a.sql").write_text("TRUNCATE logs;\n")
+    for i in range(50):
+        (tmp_path / f"clean_{i}.sql").write_text("SELECT 1;\n" * 2000)
+
+    result = CliRunner().invoke(app, ["check", str(tmp_path), "--progress"])
+
+    # A slow run also prints lines along the way; the last one is the final count
+    line = [line for line in result.stdout.splitlines() if " files, " in line][-1]
+    assert line.startswith("51/51 files, 1.0/1.0 MB")
+    assert "ETA" not in line
+    assert line.endswith("1 issues (1 high)")